@@ -1,4 +1,6 @@
 module.exports = {
+  // Serve with `node benchmark/serve.js`: it sends the COOP/COEP headers
+  // that parallel (SharedArrayBuffer) experiments depend on
   baseUrl: "http://localhost:5500",
 
   // Extended cooldown for stability
@@ -67,7 +69,7 @@ module.exports = {
       images: ["lena"],
       outputScale: [100],
       colors: [16],
-      pixelSize: [1, 2, 4, 6, 8, 12, 16],
+      pixelSize: [1, 1.5, 2, 2.5, 3, 4, 5, 6, 8, 10, 12, 16],
       dithering: ["floyd"],
       saveOutput: true
     },
@@ -96,7 +98,7 @@ module.exports = {
       outputScale: [100],
       colors: [16],
       pixelSize: [1],
-      dithering: ["none", "floyd", "atkinson", "ordered"],
+      dithering: ["none", "floyd", "atkinson", "ordered", "bluenoise"],
       saveOutput: true
     },
 
@@ -126,6 +128,213 @@ module.exports = {
       pixelSize: [1],
       dithering: ["floyd"],
       saveOutput: true
+    },
+
+    // 9. Palette lookup acceleration
+    {
+      name: "palette_lookup",
+      description: "RGB lookup table vs direct palette search per color count",
+      modes: ["heavy"],
+      resolutions: [2048, 4096],
+      images: ["lena", "mandrill"],
+      outputScale: [100],
+      colors: [8, 16, 32, 64, 128],
+      pixelSize: [1],
+      dithering: ["none", "floyd"],
+      paletteLookup: ["direct", "lut"],
+      paletteSearch: ["linear"],
+      saveOutput: false
+    },
+
+    // 10. Palette search structure
+    {
+      name: "palette_search",
+      description: "Linear vs neighbor-pruned nearest-centroid search at high color counts",
+      modes: ["heavy"],
+      resolutions: [2048, 4096],
+      images: ["lena", "peppers"],
+      outputScale: [100],
+      colors: [8, 16, 32, 64, 96, 128],
+      pixelSize: [1],
+      dithering: ["none"],
+      paletteLookup: ["direct"],
+      paletteSearch: ["linear", "pruned"],
+      saveOutput: false
+    },
+
+    // 11. Bound-accelerated k-means
+    {
+      name: "kmeans_acceleration",
+      description: "Lloyd vs Hamerly k-means at high color counts",
+      modes: ["heavy"],
+      resolutions: [2048, 4096],
+      images: ["lena", "mandrill"],
+      outputScale: [100],
+      colors: [32, 64, 96, 128],
+      pixelSize: [1],
+      dithering: ["none"],
+      paletteSearch: ["linear"],
+      kmeans: ["lloyd", "hamerly"],
+      saveOutput: false
+    },
+
+    // 12. K-means input: strided samples vs whole-image histogram
+    {
+      name: "palette_sampling",
+      description: "Strided 5000-pixel sampling vs weighted color histogram",
+      modes: ["heavy"],
+      resolutions: [1024, 2048, 4096],
+      images: ["lena", "mandrill"],
+      outputScale: [100],
+      colors: [16, 64],
+      pixelSize: [1],
+      dithering: ["floyd"],
+      sampling: ["strided", "histogram"],
+      saveOutput: true
+    },
+
+    // 13. K-means seeding and repeatability
+    {
+      name: "kmeans_seeding",
+      description: "Seeded random vs k-means++ initialization, repeated runs",
+      modes: ["heavy"],
+      resolutions: [1024, 2048],
+      images: ["lena", "mandrill", "peppers"],
+      outputScale: [100],
+      colors: [16, 64],
+      pixelSize: [1],
+      dithering: ["none"],
+      init: ["random", "kmeans++"],
+      repeats: 3,
+      saveOutput: false
+    },
+
+    // 14. Palette quality/time trade-off: full-resolution mini-batch k-means
+    {
+      name: "quality_tradeoff_minibatch",
+      description: "Mini-batch k-means over the full image at increasing time budgets",
+      modes: ["heavy"],
+      resolutions: [2048, 4096, 8192],
+      images: ["lena", "mandrill"],
+      outputScale: [100],
+      colors: [32],
+      pixelSize: [1],
+      dithering: ["none"],
+      kmeans: ["minibatch"],
+      minibatchBudget: [50, 100, 250, 500, 1000],
+      measureQuality: true,
+      saveOutput: false
+    },
+
+    // 15. Palette quality/time trade-off: batch k-means reference points
+    {
+      name: "quality_tradeoff_baseline",
+      description: "Sampled and histogram batch k-means as quality references",
+      modes: ["heavy"],
+      resolutions: [2048, 4096, 8192],
+      images: ["lena", "mandrill"],
+      outputScale: [100],
+      colors: [32],
+      pixelSize: [1],
+      dithering: ["none"],
+      kmeans: ["hamerly"],
+      sampling: ["strided", "histogram"],
+      measureQuality: true,
+      saveOutput: false
+    },
+
+    // 16. Quantizer engines: k-means vs single-pass median cut and octree
+    {
+      name: "quantizer_engines",
+      description: "K-means, median-cut and octree palettes: throughput and PSNR",
+      modes: ["heavy"],
+      resolutions: [1024, 2048, 4096],
+      images: ["lena", "mandrill", "peppers"],
+      outputScale: [100],
+      colors: [8, 32, 128],
+      pixelSize: [1],
+      dithering: ["none"],
+      quantizer: ["kmeans", "mediancut", "octree"],
+      measureQuality: true,
+      saveOutput: true
+    },
+
+    // 17. Worker output format: RGBA pixels vs palette indices
+    {
+      name: "output_format",
+      description: "Full RGBA result vs 1-byte palette indices expanded on draw",
+      modes: ["heavy"],
+      resolutions: [2048, 4096, 8192],
+      images: ["lena", "mandrill"],
+      outputScale: [100],
+      colors: [32],
+      pixelSize: [1],
+      dithering: ["none", "floyd"],
+      outputFormat: ["rgba", "indices"],
+      saveOutput: false
+    },
+
+    // 18. Parallel palette mapping: row bands across pool workers
+    {
+      name: "parallel_mapping",
+      description: "Undithered palette mapping split over 1-8 workers via SharedArrayBuffer",
+      modes: ["heavy"],
+      resolutions: [2048, 4096, 8192],
+      images: ["lena", "mandrill"],
+      outputScale: [100],
+      colors: [32],
+      pixelSize: [1],
+      dithering: ["none"],
+      workers: [1, 2, 4, 8],
+      saveOutput: false
+    },
+
+    // 19. Wavefront-parallel error diffusion
+    {
+      name: "parallel_diffusion",
+      description: "Error diffusion rows processed as a wavefront over 1-8 workers",
+      modes: ["heavy"],
+      resolutions: [2048, 4096, 8192],
+      images: ["lena", "mandrill"],
+      outputScale: [100],
+      colors: [32],
+      pixelSize: [1],
+      dithering: ["floyd", "jarvis", "stucki", "atkinson"],
+      workers: [1, 2, 4, 8],
+      saveOutput: false
+    },
+
+    // 20. Tiled streaming pipeline at extreme resolutions
+    {
+      name: "tiled_streaming",
+      description: "Whole-image vs strip-wise processing under a memory budget (MB)",
+      modes: ["heavy"],
+      resolutions: [4096, 8192, 16384],
+      images: ["lena"],
+      outputScale: [100],
+      colors: [16],
+      pixelSize: [1],
+      dithering: ["floyd"],
+      memoryBudget: ["off", 64, 256],
+      saveOutput: false
+    },
+
+    // 21. Latency-budget mode: predicted vs actual time, quality given up
+    {
+      name: "latency_budget",
+      description: "Fixed quality tiers vs parameters chosen to fit a target latency (ms)",
+      modes: ["heavy"],
+      resolutions: [1024, 2048, 4096, 8192],
+      images: ["lena", "mandrill"],
+      outputScale: [100],
+      colors: [64],
+      pixelSize: [1],
+      dithering: ["floyd"],
+      latencyBudget: ["off", 250, 500, 1000],
+      // Calibration persists across page loads: later repeats are calibrated
+      repeats: 3,
+      measureQuality: true,
+      saveOutput: false
     }
   ]
 };
\ No newline at end of file
@@ -416,6 +416,457 @@ if len(data) >= 10:
 else:
     print("  ⚠ Skipped (need at least 10 data points)")
 
+# ========== 9. PALETTE LOOKUP SPEEDUP ==========
+print("📊 Generating palette lookup analysis...")
+
+lookup_times = defaultdict(lambda: defaultdict(list))
+
+for d in data:
+    if d.get("experiment") == "palette_lookup" and d.get("paletteLookup"):
+        lookup_times[d["paletteLookup"]][d["colors"]].append(d["algorithmTime_ms"])
+
+lookup_colors = sorted(set(lookup_times["direct"].keys()) & set(lookup_times["lut"].keys()))
+
+if len(lookup_colors) >= 2:
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    direct_times = [np.mean(lookup_times["direct"][c]) for c in lookup_colors]
+    lut_times = [np.mean(lookup_times["lut"][c]) for c in lookup_colors]
+
+    ax1.plot(lookup_colors, direct_times, marker='o', label='Direct Linear Scan', linewidth=2)
+    ax1.plot(lookup_colors, lut_times, marker='s', label='RGB Lookup Table', linewidth=2)
+    ax1.set_xlabel("Number of Colors")
+    ax1.set_ylabel("Processing Time (ms)")
+    ax1.set_title("Palette Lookup Strategy vs Color Count")
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    speedup = [l / t if t > 0 else 0 for l, t in zip(direct_times, lut_times)]
+    ax2.bar([str(c) for c in lookup_colors], speedup, color='seagreen', alpha=0.7)
+    ax2.set_xlabel("Number of Colors")
+    ax2.set_ylabel("Speedup (direct / LUT)")
+    ax2.set_title("Lookup Table Speedup per Color Count")
+    ax2.grid(True, alpha=0.3, axis='y')
+    ax2.axhline(y=1, color='r', linestyle='--', alpha=0.5)
+
+    plt.tight_layout()
+    plt.savefig(f"{PLOT_DIR}/09_palette_lookup_speedup.png", bbox_inches='tight')
+    plt.close()
+    print("  ✓ Palette lookup speedup")
+else:
+    print("  ⚠ Skipped (need direct and LUT runs at 2+ color counts)")
+
+# ========== 10. PALETTE SEARCH STRUCTURE ==========
+print("📊 Generating palette search analysis...")
+
+search_times = defaultdict(lambda: defaultdict(list))
+
+for d in data:
+    if d.get("experiment") == "palette_search" and d.get("paletteSearch"):
+        search_times[d["paletteSearch"]][d["colors"]].append(d["algorithmTime_ms"])
+
+search_colors = sorted(set(search_times["linear"].keys()) & set(search_times["pruned"].keys()))
+
+if len(search_colors) >= 2:
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    linear_times = [np.mean(search_times["linear"][c]) for c in search_colors]
+    pruned_times = [np.mean(search_times["pruned"][c]) for c in search_colors]
+
+    ax1.plot(search_colors, linear_times, marker='o', label='Linear Scan', linewidth=2)
+    ax1.plot(search_colors, pruned_times, marker='s', label='Neighbor-Pruned', linewidth=2)
+    ax1.set_xlabel("Number of Colors")
+    ax1.set_ylabel("Processing Time (ms)")
+    ax1.set_title("Nearest-Centroid Search vs Color Count")
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    speedup = [l / p if p > 0 else 0 for l, p in zip(linear_times, pruned_times)]
+    ax2.bar([str(c) for c in search_colors], speedup, color='steelblue', alpha=0.7)
+    ax2.set_xlabel("Number of Colors")
+    ax2.set_ylabel("Speedup (linear / pruned)")
+    ax2.set_title("Search Structure Speedup per Color Count")
+    ax2.grid(True, alpha=0.3, axis='y')
+    ax2.axhline(y=1, color='r', linestyle='--', alpha=0.5)
+
+    plt.tight_layout()
+    plt.savefig(f"{PLOT_DIR}/10_palette_search_speedup.png", bbox_inches='tight')
+    plt.close()
+    print("  ✓ Palette search speedup")
+else:
+    print("  ⚠ Skipped (need linear and pruned runs at 2+ color counts)")
+
+# ========== 11. K-MEANS ACCELERATION ==========
+print("📊 Generating k-means acceleration analysis...")
+
+kmeans_times = defaultdict(lambda: defaultdict(list))
+
+for d in data:
+    if d.get("experiment") == "kmeans_acceleration" and d.get("kmeans"):
+        kmeans_times[d["kmeans"]][d["colors"]].append(d["algorithmTime_ms"])
+
+kmeans_colors = sorted(set(kmeans_times["lloyd"].keys()) & set(kmeans_times["hamerly"].keys()))
+
+if len(kmeans_colors) >= 2:
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    lloyd_times = [np.mean(kmeans_times["lloyd"][c]) for c in kmeans_colors]
+    hamerly_times = [np.mean(kmeans_times["hamerly"][c]) for c in kmeans_colors]
+
+    ax1.plot(kmeans_colors, lloyd_times, marker='o', label='Lloyd', linewidth=2)
+    ax1.plot(kmeans_colors, hamerly_times, marker='s', label='Hamerly', linewidth=2)
+    ax1.set_xlabel("Number of Colors")
+    ax1.set_ylabel("Processing Time (ms)")
+    ax1.set_title("K-means Variant vs Color Count")
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    speedup = [l / h if h > 0 else 0 for l, h in zip(lloyd_times, hamerly_times)]
+    ax2.bar([str(c) for c in kmeans_colors], speedup, color='darkorange', alpha=0.7)
+    ax2.set_xlabel("Number of Colors")
+    ax2.set_ylabel("Speedup (Lloyd / Hamerly)")
+    ax2.set_title("Bound Acceleration Speedup per Color Count")
+    ax2.grid(True, alpha=0.3, axis='y')
+    ax2.axhline(y=1, color='r', linestyle='--', alpha=0.5)
+
+    plt.tight_layout()
+    plt.savefig(f"{PLOT_DIR}/11_kmeans_acceleration.png", bbox_inches='tight')
+    plt.close()
+    print("  ✓ K-means acceleration")
+else:
+    print("  ⚠ Skipped (need Lloyd and Hamerly runs at 2+ color counts)")
+
+# ========== 12. PALETTE QUALITY / TIME TRADE-OFF ==========
+print("📊 Generating palette quality trade-off...")
+
+tradeoff = defaultdict(lambda: {"times": [], "psnr": []})
+
+for d in data:
+    if d.get("experiment", "").startswith("quality_tradeoff") and d.get("psnr") is not None:
+        if d.get("kmeans") == "minibatch":
+            label = f"mini-batch {d.get('minibatchBudget')}ms"
+        else:
+            label = f"{d.get('kmeans', 'lloyd')} / {d.get('sampling', 'strided')}"
+        tradeoff[label]["times"].append(d["algorithmTime_ms"])
+        tradeoff[label]["psnr"].append(d["psnr"])
+
+if len(tradeoff) >= 2:
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    minibatch_labels = sorted(
+        [l for l in tradeoff if l.startswith("mini-batch")],
+        key=lambda l: int(l.split()[1].rstrip("ms"))
+    )
+    if minibatch_labels:
+        ax.plot(
+            [np.mean(tradeoff[l]["times"]) for l in minibatch_labels],
+            [np.mean(tradeoff[l]["psnr"]) for l in minibatch_labels],
+            marker='o', linewidth=2, label='Mini-batch (by budget)'
+        )
+        for l in minibatch_labels:
+            ax.annotate(l.split()[1], (np.mean(tradeoff[l]["times"]), np.mean(tradeoff[l]["psnr"])),
+                        textcoords="offset points", xytext=(5, 5), fontsize=8)
+
+    for l in sorted(l for l in tradeoff if not l.startswith("mini-batch")):
+        ax.scatter(np.mean(tradeoff[l]["times"]), np.mean(tradeoff[l]["psnr"]), s=80, marker='s', label=l)
+
+    ax.set_xlabel("Processing Time (ms)")
+    ax.set_ylabel("Palette PSNR (dB)")
+    ax.set_title("Palette Quality vs Processing Time")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(f"{PLOT_DIR}/12_quality_time_tradeoff.png", bbox_inches='tight')
+    plt.close()
+    print("  ✓ Palette quality trade-off")
+else:
+    print("  ⚠ Skipped (need PSNR measurements for 2+ configurations)")
+
+# ========== 13. QUANTIZER ENGINES ==========
+print("📊 Generating quantizer engine comparison...")
+
+engine_throughput = defaultdict(lambda: defaultdict(list))
+engine_psnr = defaultdict(lambda: defaultdict(list))
+
+for d in data:
+    if d.get("experiment") == "quantizer_engines" and d.get("quantizer"):
+        if d.get("pixelsProcessed") and d["algorithmTime_ms"] > 0:
+            engine_throughput[d["quantizer"]][d["colors"]].append(d["pixelsProcessed"] / d["algorithmTime_ms"] / 1000)
+        if d.get("psnr") is not None:
+            engine_psnr[d["quantizer"]][d["colors"]].append(d["psnr"])
+
+engine_names = {"kmeans": "K-means", "mediancut": "Median Cut", "octree": "Octree"}
+engines = [q for q in engine_names if engine_throughput[q]]
+
+if len(engines) >= 2:
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    for q in engines:
+        colors_q = sorted(engine_throughput[q].keys())
+        ax1.plot(colors_q, [np.mean(engine_throughput[q][c]) for c in colors_q],
+                 marker='o', label=engine_names[q], linewidth=2)
+    ax1.set_xlabel("Number of Colors")
+    ax1.set_ylabel("Throughput (Mpx/s)")
+    ax1.set_title("Quantizer Throughput vs Color Count")
+    ax1.set_xscale('log', base=2)
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    for q in engines:
+        colors_q = sorted(engine_psnr[q].keys())
+        if colors_q:
+            ax2.plot(colors_q, [np.mean(engine_psnr[q][c]) for c in colors_q],
+                     marker='s', label=engine_names[q], linewidth=2)
+    ax2.set_xlabel("Number of Colors")
+    ax2.set_ylabel("Palette PSNR (dB)")
+    ax2.set_title("Quantizer Palette Quality vs Color Count")
+    ax2.set_xscale('log', base=2)
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(f"{PLOT_DIR}/13_quantizer_engines.png", bbox_inches='tight')
+    plt.close()
+    print("  ✓ Quantizer engine comparison")
+else:
+    print("  ⚠ Skipped (need runs from 2+ quantizer engines)")
+
+# ========== 14. WORKER OUTPUT FORMAT ==========
+print("📊 Generating output format analysis...")
+
+format_times = defaultdict(lambda: defaultdict(list))
+
+for d in data:
+    if d.get("experiment") == "output_format" and d.get("outputFormat"):
+        format_times[d["outputFormat"]][d["resolution"]].append(d["totalProcessingTime_ms"])
+
+format_res = sorted(set(format_times["rgba"].keys()) & set(format_times["indices"].keys()))
+
+if len(format_res) >= 2:
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    rgba_times = [np.mean(format_times["rgba"][r]) for r in format_res]
+    index_times = [np.mean(format_times["indices"][r]) for r in format_res]
+
+    ax1.plot(format_res, rgba_times, marker='o', label='RGBA pixels', linewidth=2)
+    ax1.plot(format_res, index_times, marker='s', label='Palette indices', linewidth=2)
+    ax1.set_xlabel("Resolution (px)")
+    ax1.set_ylabel("End-to-End Time (ms)")
+    ax1.set_title("Worker Output Format vs Resolution")
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    speedup = [r / i if i > 0 else 0 for r, i in zip(rgba_times, index_times)]
+    ax2.bar([str(r) for r in format_res], speedup, color='teal', alpha=0.7)
+    ax2.set_xlabel("Resolution (px)")
+    ax2.set_ylabel("Speedup (RGBA / Indices)")
+    ax2.set_title("Index Output Speedup per Resolution")
+    ax2.grid(True, alpha=0.3, axis='y')
+    ax2.axhline(y=1, color='r', linestyle='--', alpha=0.5)
+
+    plt.tight_layout()
+    plt.savefig(f"{PLOT_DIR}/14_output_format.png", bbox_inches='tight')
+    plt.close()
+    print("  ✓ Output format")
+else:
+    print("  ⚠ Skipped (need RGBA and index runs at 2+ resolutions)")
+
+# ========== 15. PARALLEL MAPPING SCALING ==========
+print("📊 Generating parallel mapping scaling...")
+
+# Runs without cross-origin isolation fall back to serial mapping
+parallel_times = defaultdict(lambda: defaultdict(list))
+
+for d in data:
+    if d.get("experiment") == "parallel_mapping" and d.get("workers") and d.get("crossOriginIsolated", True):
+        parallel_times[d["resolution"]][d["workers"]].append(d["algorithmTime_ms"])
+
+parallel_res = sorted(r for r in parallel_times if 1 in parallel_times[r] and len(parallel_times[r]) >= 2)
+
+if parallel_res:
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    for r in parallel_res:
+        counts = sorted(parallel_times[r].keys())
+        times = [np.mean(parallel_times[r][w]) for w in counts]
+        ax1.plot(counts, times, marker='o', label=f'{r}px', linewidth=2)
+        ax2.plot(counts, [times[0] / t if t > 0 else 0 for t in times], marker='o', label=f'{r}px', linewidth=2)
+
+    all_counts = sorted({w for r in parallel_res for w in parallel_times[r]})
+    ax1.set_xlabel("Workers")
+    ax1.set_ylabel("Processing Time (ms)")
+    ax1.set_title("Palette Mapping Time vs Worker Count")
+    ax1.set_xticks(all_counts)
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    ax2.plot(all_counts, all_counts, 'k--', alpha=0.4, label='Ideal')
+    ax2.set_xlabel("Workers")
+    ax2.set_ylabel("Speedup vs 1 Worker")
+    ax2.set_title("Parallel Mapping Scaling")
+    ax2.set_xticks(all_counts)
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(f"{PLOT_DIR}/15_parallel_mapping_scaling.png", bbox_inches='tight')
+    plt.close()
+    print("  ✓ Parallel mapping scaling")
+else:
+    print("  ⚠ Skipped (need isolated runs at 1 and 2+ worker counts)")
+
+# ========== 16. WAVEFRONT DIFFUSION SCALING ==========
+print("📊 Generating wavefront diffusion scaling...")
+
+wavefront_times = defaultdict(lambda: defaultdict(list))
+
+for d in data:
+    if d.get("experiment") == "parallel_diffusion" and d.get("workers") and d.get("crossOriginIsolated", True):
+        wavefront_times[d["dithering"]][d["workers"]].append(d["algorithmTime_ms"])
+
+wavefront_kernels = sorted(k for k in wavefront_times if 1 in wavefront_times[k] and len(wavefront_times[k]) >= 2)
+
+if wavefront_kernels:
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    for k in wavefront_kernels:
+        counts = sorted(wavefront_times[k].keys())
+        times = [np.mean(wavefront_times[k][w]) for w in counts]
+        ax1.plot(counts, times, marker='o', label=k.capitalize(), linewidth=2)
+        ax2.plot(counts, [times[0] / t if t > 0 else 0 for t in times], marker='o', label=k.capitalize(), linewidth=2)
+
+    all_counts = sorted({w for k in wavefront_kernels for w in wavefront_times[k]})
+    ax1.set_xlabel("Workers")
+    ax1.set_ylabel("Processing Time (ms)")
+    ax1.set_title("Error Diffusion Time vs Worker Count")
+    ax1.set_xticks(all_counts)
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    ax2.plot(all_counts, all_counts, 'k--', alpha=0.4, label='Ideal')
+    ax2.set_xlabel("Workers")
+    ax2.set_ylabel("Speedup vs 1 Worker")
+    ax2.set_title("Wavefront Diffusion Scaling by Kernel")
+    ax2.set_xticks(all_counts)
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(f"{PLOT_DIR}/16_wavefront_diffusion_scaling.png", bbox_inches='tight')
+    plt.close()
+    print("  ✓ Wavefront diffusion scaling")
+else:
+    print("  ⚠ Skipped (need isolated runs at 1 and 2+ worker counts)")
+
+# ========== 17. TILED STREAMING ==========
+print("📊 Generating tiled streaming comparison...")
+
+# Failed runs count too: whole-image runs at 16K are the ones that time out
+tiled_times = defaultdict(lambda: defaultdict(list))
+tiled_attempts = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+
+for d in raw_data["outputs"]:
+    if d.get("experiment") != "tiled_streaming":
+        continue
+    budget = str(d.get("memoryBudget", "off"))
+    tiled_attempts[budget][d["resolution"]][1] += 1
+    if d.get("success", True):
+        tiled_attempts[budget][d["resolution"]][0] += 1
+        tiled_times[budget][d["resolution"]].append(d["totalProcessingTime_ms"])
+
+tiled_budgets = sorted(tiled_attempts, key=lambda b: (b != "off", int(b) if b.isdigit() else 0))
+
+if len(tiled_budgets) >= 2:
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+    tiled_res = sorted({r for b in tiled_budgets for r in tiled_attempts[b]})
+    width = 0.8 / len(tiled_budgets)
+
+    for i, b in enumerate(tiled_budgets):
+        label = "Whole image" if b == "off" else f"{b} MB strips"
+        res = sorted(tiled_times[b])
+        ax1.plot(res, [np.mean(tiled_times[b][r]) for r in res], marker='o', label=label, linewidth=2)
+
+        rates = [tiled_attempts[b][r][0] / tiled_attempts[b][r][1] * 100 if tiled_attempts[b][r][1] else 0
+                 for r in tiled_res]
+        ax2.bar(np.arange(len(tiled_res)) + i * width, rates, width, label=label, alpha=0.8)
+
+    ax1.set_xlabel("Resolution (px)")
+    ax1.set_ylabel("End-to-end Time (ms)")
+    ax1.set_title("Whole-image vs Tiled Processing Time")
+    ax1.set_xscale('log', base=2)
+    ax1.set_yscale('log')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    ax2.set_xticks(np.arange(len(tiled_res)) + width * (len(tiled_budgets) - 1) / 2)
+    ax2.set_xticklabels([str(r) for r in tiled_res])
+    ax2.set_xlabel("Resolution (px)")
+    ax2.set_ylabel("Completed Runs (%)")
+    ax2.set_title("Run Completion by Memory Budget")
+    ax2.set_ylim(0, 105)
+    ax2.legend()
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    plt.tight_layout()
+    plt.savefig(f"{PLOT_DIR}/17_tiled_streaming.png", bbox_inches='tight')
+    plt.close()
+    print("  ✓ Tiled streaming")
+else:
+    print("  ⚠ Skipped (need whole-image and tiled runs)")
+
+# ========== 18. LATENCY BUDGET ==========
+print("📊 Generating latency budget analysis...")
+
+# Actual = the page's end-to-end time, which is what the model predicts
+latency_runs = defaultdict(list)
+for d in data:
+    if d.get("experiment") == "latency_budget" and d.get("predictedTime_ms"):
+        actual = d.get("uiTime_ms") or d["totalProcessingTime_ms"]
+        latency_runs[str(d.get("latencyBudget", "off"))].append((d["resolution"], d["predictedTime_ms"], actual))
+
+latency_budgets = sorted(latency_runs, key=lambda b: (b != "off", int(b) if b.isdigit() else 0))
+
+if any(b != "off" for b in latency_budgets):
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    for b in latency_budgets:
+        label = "Fixed tiers" if b == "off" else f"{b} ms target"
+        runs = latency_runs[b]
+        ax1.scatter([r[1] for r in runs], [r[2] for r in runs], label=label, alpha=0.7, s=40)
+
+        by_res = defaultdict(list)
+        for res, _, actual in runs:
+            by_res[res].append(actual)
+        res = sorted(by_res)
+        line = ax2.plot(res, [np.mean(by_res[r]) for r in res], marker='o', label=label, linewidth=2)
+        if b != "off":
+            ax2.axhline(int(b), color=line[0].get_color(), linestyle=':', alpha=0.6)
+
+    limit = max(max(r[1] for b in latency_budgets for r in latency_runs[b]),
+                max(r[2] for b in latency_budgets for r in latency_runs[b]))
+    ax1.plot([0, limit], [0, limit], 'k--', alpha=0.5, label="Perfect prediction")
+    ax1.set_xlabel("Predicted Time (ms)")
+    ax1.set_ylabel("Actual Time (ms)")
+    ax1.set_title("Latency Model: Predicted vs Actual")
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    ax2.set_xlabel("Resolution (px)")
+    ax2.set_ylabel("End-to-end Time (ms)")
+    ax2.set_title("Time by Target Latency (dotted: target)")
+    ax2.set_xscale('log', base=2)
+    ax2.set_yscale('log')
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(f"{PLOT_DIR}/18_latency_budget.png", bbox_inches='tight')
+    plt.close()
+    print("  ✓ Latency budget")
+else:
+    print("  ⚠ Skipped (need runs with a latency budget)")
+
 print()
 print("=" * 70)
 print(f"✓ Plot generation complete!")
@@ -64,6 +64,107 @@ if len(resolutions) >= 2:
 else:
     complexity_normal = 0
 
+# Palette lookup analysis (direct search vs RGB lookup table)
+lookup_analysis = defaultdict(lambda: {"direct": [], "lut": []})
+for d in data:
+    if d.get("experiment") == "palette_lookup" and d.get("paletteLookup") in ("direct", "lut"):
+        lookup_analysis[d["colors"]][d["paletteLookup"]].append(d["algorithmTime_ms"])
+
+# Palette search analysis (linear scan vs neighbor-pruned search)
+search_analysis = defaultdict(lambda: {"linear": [], "pruned": []})
+for d in data:
+    if d.get("experiment") == "palette_search" and d.get("paletteSearch") in ("linear", "pruned"):
+        search_analysis[d["colors"]][d["paletteSearch"]].append(d["algorithmTime_ms"])
+
+# K-means variant analysis (Lloyd vs Hamerly)
+kmeans_analysis = defaultdict(lambda: {"lloyd": [], "hamerly": []})
+for d in data:
+    if d.get("experiment") == "kmeans_acceleration" and d.get("kmeans") in ("lloyd", "hamerly"):
+        kmeans_analysis[d["colors"]][d["kmeans"]].append(d["algorithmTime_ms"])
+
+# K-means input analysis (strided samples vs weighted histogram)
+sampling_analysis = defaultdict(lambda: {"strided": [], "histogram": []})
+for d in data:
+    if d.get("experiment") == "palette_sampling" and d.get("sampling") in ("strided", "histogram"):
+        sampling_analysis[d["resolution"]][d["sampling"]].append(d["algorithmTime_ms"])
+
+# K-means seeding analysis (iterations and run-to-run spread)
+seeding_analysis = defaultdict(lambda: {"iterations": [], "times": [], "spread": []})
+seeding_runs = defaultdict(list)
+for d in data:
+    if d.get("experiment") == "kmeans_seeding" and d.get("init"):
+        seeding_analysis[d["init"]]["iterations"].append(d.get("iterations", 0))
+        seeding_analysis[d["init"]]["times"].append(d["algorithmTime_ms"])
+        config_key = (d["init"], d["imageName"], d["resolution"], d["colors"])
+        seeding_runs[config_key].append(d["algorithmTime_ms"])
+for (init, *_), times in seeding_runs.items():
+    if len(times) >= 2:
+        seeding_analysis[init]["spread"].append(np.std(times) / np.mean(times) * 100)
+
+# Palette quality/time trade-off (PSNR per quantizer configuration)
+tradeoff_analysis = defaultdict(lambda: {"times": [], "psnr": []})
+for d in data:
+    if d.get("experiment", "").startswith("quality_tradeoff") and d.get("psnr") is not None:
+        if d.get("kmeans") == "minibatch":
+            label = f"Mini-batch ({d.get('minibatchBudget')} ms budget)"
+        else:
+            label = f"{d.get('kmeans', 'lloyd').title()} / {d.get('sampling', 'strided')}"
+        tradeoff_analysis[label]["times"].append(d["algorithmTime_ms"])
+        tradeoff_analysis[label]["psnr"].append(d["psnr"])
+
+# Quantizer engine analysis (throughput and PSNR per engine)
+engine_analysis = defaultdict(lambda: {"times": [], "throughput": [], "psnr": []})
+for d in data:
+    if d.get("experiment") == "quantizer_engines" and d.get("quantizer"):
+        engine_analysis[d["quantizer"]]["times"].append(d["algorithmTime_ms"])
+        if d.get("pixelsProcessed") and d["algorithmTime_ms"] > 0:
+            engine_analysis[d["quantizer"]]["throughput"].append(d["pixelsProcessed"] / d["algorithmTime_ms"] / 1000)
+        if d.get("psnr") is not None:
+            engine_analysis[d["quantizer"]]["psnr"].append(d["psnr"])
+
+# Worker output format analysis (end-to-end time, RGBA vs indices)
+format_analysis = defaultdict(lambda: {"rgba": [], "indices": []})
+for d in data:
+    if d.get("experiment") == "output_format" and d.get("outputFormat"):
+        format_analysis[d["resolution"]][d["outputFormat"]].append(d["totalProcessingTime_ms"])
+
+# Parallel mapping analysis (time per worker count, isolated runs only)
+parallel_analysis = defaultdict(lambda: defaultdict(list))
+parallel_fallback_runs = 0
+for d in data:
+    if d.get("experiment") == "parallel_mapping" and d.get("workers"):
+        if d.get("crossOriginIsolated", True):
+            parallel_analysis[d["resolution"]][d["workers"]].append(d["algorithmTime_ms"])
+        else:
+            parallel_fallback_runs += 1
+
+# Wavefront diffusion analysis (time per kernel and worker count)
+wavefront_analysis = defaultdict(lambda: defaultdict(list))
+for d in data:
+    if d.get("experiment") == "parallel_diffusion" and d.get("workers") and d.get("crossOriginIsolated", True):
+        wavefront_analysis[d["dithering"]][d["workers"]].append(d["algorithmTime_ms"])
+
+# Tiled streaming analysis (end-to-end time and completion per budget,
+# failed runs included)
+tiled_analysis = defaultdict(lambda: defaultdict(lambda: {"times": [], "completed": 0, "attempted": 0}))
+for d in raw_data["outputs"]:
+    if d.get("experiment") == "tiled_streaming":
+        entry = tiled_analysis[d["resolution"]][str(d.get("memoryBudget", "off"))]
+        entry["attempted"] += 1
+        if d.get("success", True):
+            entry["completed"] += 1
+            entry["times"].append(d["totalProcessingTime_ms"])
+
+latency_analysis = defaultdict(lambda: {"predicted": [], "actual": [], "psnr": [], "pixels": []})
+for d in data:
+    if d.get("experiment") == "latency_budget" and d.get("predictedTime_ms"):
+        entry = latency_analysis[str(d.get("latencyBudget", "off"))]
+        entry["predicted"].append(d["predictedTime_ms"])
+        entry["actual"].append(d.get("uiTime_ms") or d["totalProcessingTime_ms"])
+        entry["pixels"].append(d["pixelsProcessed"])
+        if d.get("psnr") is not None:
+            entry["psnr"].append(d["psnr"])
+
 # Generate comprehensive report
 html = f"""
 <!DOCTYPE html>
@@ -438,7 +539,7 @@ html = f"""
                         <li>Color Depths: 4, 8, 16, 24, 32, 64, 96, 128 colors</li>
                         <li>Pixel Sizes: 1x, 2x, 4x, 6x, 8x, 12x, 16x</li>
                         <li>Output Scales: 20% to 100% in varying increments</li>
-                        <li>Dithering: None, Floyd-Steinberg, Atkinson, Ordered</li>
+                        <li>Dithering: None, Floyd-Steinberg, Atkinson, Ordered (Bayer, blue noise)</li>
                     </ul>
                 </div>
                 
@@ -608,7 +709,7 @@ html += f"""
                 <p>Different dithering algorithms exhibit distinct performance characteristics:</p>
                 <ul>
                     <li><strong>None:</strong> Fastest, no error diffusion overhead</li>
-                    <li><strong>Ordered Dithering:</strong> Fast, pattern-based approach with minimal computational cost</li>
+                    <li><strong>Ordered Dithering:</strong> Fast, pattern-based approach with minimal computational cost. A tiled threshold matrix (8×8 Bayer or 64×64 blue noise) offsets each pixel before lookup, so pixels stay independent and map in parallel row bands like undithered output</li>
                     <li><strong>Floyd-Steinberg:</strong> Moderate performance, excellent quality-to-performance ratio</li>
                     <li><strong>Atkinson:</strong> Similar to Floyd-Steinberg with slightly different error diffusion pattern</li>
                 </ul>
@@ -644,16 +745,472 @@ html += f"""
                 <p>The performance heatmap reveals complex interactions between resolution and color depth. High-resolution images with many colors represent the most computationally intensive scenario, while strategic parameter selection can achieve dramatic performance improvements.</p>
             </section>
             
+            <!-- Engine Optimizations -->
+            <section class="section">
+                <h2>10. Engine Optimization Experiments</h2>
+                
+                <h3>10.1 Palette Lookup Acceleration</h3>
+                <p>Mapping a pixel to its nearest palette color originally required a direct search over the whole palette. The RGB lookup table quantizes colors to 15 bits and resolves each 8×8×8 color cell lazily to the few palette entries that can be nearest inside it, so most pixels are mapped with a single table hit.</p>
+                
+                <div class="figure">
+                    <img src="{PLOT_PATH}/09_palette_lookup_speedup.png" alt="Palette Lookup Speedup">
+                    <div class="figure-caption">Figure 9: Direct linear palette scan vs RGB lookup table. Left: Processing time per color count. Right: Speedup of the lookup table.</div>
+                </div>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Colors</th>
+                            <th>Direct Scan (ms)</th>
+                            <th>Lookup Table (ms)</th>
+                            <th>Speedup</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for colors in sorted(lookup_analysis.keys()):
+    direct_avg = np.mean(lookup_analysis[colors]["direct"]) if lookup_analysis[colors]["direct"] else 0
+    lut_avg = np.mean(lookup_analysis[colors]["lut"]) if lookup_analysis[colors]["lut"] else 0
+    speedup = direct_avg / lut_avg if lut_avg > 0 else 0
+    
+    html += f"""
+                        <tr>
+                            <td>{colors}</td>
+                            <td>{direct_avg:.1f}</td>
+                            <td>{lut_avg:.1f}</td>
+                            <td>{speedup:.2f}x</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+                
+                <h3>10.2 Palette Search Structure</h3>
+                <p>K-means assignment and direct palette mapping both search for the nearest centroid. Above 16 colors the neighbor-pruned search precomputes each centroid's neighbors by distance, starts from the previous pixel's answer and stops as soon as the triangle inequality rules out the remaining centroids, returning exactly the same index as a linear scan.</p>
+                
+                <div class="figure">
+                    <img src="{PLOT_PATH}/10_palette_search_speedup.png" alt="Palette Search Speedup">
+                    <div class="figure-caption">Figure 10: Linear scan vs neighbor-pruned nearest-centroid search. Left: Processing time per color count. Right: Speedup of the pruned search.</div>
+                </div>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Colors</th>
+                            <th>Linear Scan (ms)</th>
+                            <th>Neighbor-Pruned (ms)</th>
+                            <th>Speedup</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for colors in sorted(search_analysis.keys()):
+    linear_avg = np.mean(search_analysis[colors]["linear"]) if search_analysis[colors]["linear"] else 0
+    pruned_avg = np.mean(search_analysis[colors]["pruned"]) if search_analysis[colors]["pruned"] else 0
+    speedup = linear_avg / pruned_avg if pruned_avg > 0 else 0
+    
+    html += f"""
+                        <tr>
+                            <td>{colors}</td>
+                            <td>{linear_avg:.1f}</td>
+                            <td>{pruned_avg:.1f}</td>
+                            <td>{speedup:.2f}x</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+                
+                <h3>10.3 Bound-Accelerated K-means</h3>
+                <p>The Hamerly variant keeps, for every sample, an upper bound on the distance to its own centroid and a lower bound on the distance to all others. Samples whose bounds prove they cannot change cluster skip their distance computations entirely. Assignments match Lloyd's algorithm exactly, so both variants produce the same palette.</p>
+                
+                <div class="figure">
+                    <img src="{PLOT_PATH}/11_kmeans_acceleration.png" alt="K-means Acceleration">
+                    <div class="figure-caption">Figure 11: Lloyd vs Hamerly k-means. Left: Processing time per color count. Right: Speedup of the bound-accelerated variant.</div>
+                </div>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Colors</th>
+                            <th>Lloyd (ms)</th>
+                            <th>Hamerly (ms)</th>
+                            <th>Speedup</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for colors in sorted(kmeans_analysis.keys()):
+    lloyd_avg = np.mean(kmeans_analysis[colors]["lloyd"]) if kmeans_analysis[colors]["lloyd"] else 0
+    hamerly_avg = np.mean(kmeans_analysis[colors]["hamerly"]) if kmeans_analysis[colors]["hamerly"] else 0
+    speedup = lloyd_avg / hamerly_avg if hamerly_avg > 0 else 0
+    
+    html += f"""
+                        <tr>
+                            <td>{colors}</td>
+                            <td>{lloyd_avg:.1f}</td>
+                            <td>{hamerly_avg:.1f}</td>
+                            <td>{speedup:.2f}x</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+                
+                <h3>10.4 Histogram-Weighted K-means</h3>
+                <p>Strided sampling feeds k-means at most 5,000 pixels taken at a fixed stride, which aliases on textured content. Histogram mode bins every pixel into a 5-bit-per-channel color histogram in one pass and clusters the occupied bins weighted by pixel count, so every pixel contributes to the palette and per-iteration cost depends on the number of distinct colors rather than the resolution.</p>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Resolution</th>
+                            <th>Strided (ms)</th>
+                            <th>Histogram (ms)</th>
+                            <th>Ratio</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for res in sorted(sampling_analysis.keys()):
+    strided_avg = np.mean(sampling_analysis[res]["strided"]) if sampling_analysis[res]["strided"] else 0
+    histogram_avg = np.mean(sampling_analysis[res]["histogram"]) if sampling_analysis[res]["histogram"] else 0
+    ratio = histogram_avg / strided_avg if strided_avg > 0 else 0
+    
+    html += f"""
+                        <tr>
+                            <td>{res}x{res}</td>
+                            <td>{strided_avg:.1f}</td>
+                            <td>{histogram_avg:.1f}</td>
+                            <td>{ratio:.2f}x</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+                
+                <h3>10.5 Deterministic K-means Seeding</h3>
+                <p>Centroids are seeded from a fixed-seed pseudo-random generator, either uniformly or with k-means++, and iteration stops once the average centroid shift drops below one color level. Identical inputs therefore produce identical palettes and iteration counts; the remaining run-to-run spread reflects only timing noise.</p>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Initialization</th>
+                            <th>Mean Iterations</th>
+                            <th>Mean Time (ms)</th>
+                            <th>Run-to-Run Spread (CV)</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for init in sorted(seeding_analysis.keys()):
+    stats = seeding_analysis[init]
+    spread = np.mean(stats["spread"]) if stats["spread"] else 0
+    
+    html += f"""
+                        <tr>
+                            <td>{init}</td>
+                            <td>{np.mean(stats["iterations"]):.1f}</td>
+                            <td>{np.mean(stats["times"]):.1f}</td>
+                            <td>{spread:.1f}%</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+                
+                <h3>10.6 Full-Resolution Mini-batch K-means</h3>
+                <p>Mini-batch k-means streams randomized 1,024-pixel batches drawn from the full pixel buffer instead of a 5,000-pixel sample, stopping when the smoothed centroid shift settles or the time budget runs out. Palette quality is measured as the PSNR of every pixel against its nearest palette color, excluded from the algorithm time.</p>
+                
+                <div class="figure">
+                    <img src="{PLOT_PATH}/12_quality_time_tradeoff.png" alt="Quality Time Trade-off">
+                    <div class="figure-caption">Figure 12: Palette quality (PSNR) vs processing time. The line traces mini-batch k-means across time budgets; squares mark batch k-means references.</div>
+                </div>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Configuration</th>
+                            <th>Mean Time (ms)</th>
+                            <th>Mean PSNR (dB)</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for label in sorted(tradeoff_analysis.keys()):
+    html += f"""
+                        <tr>
+                            <td>{label}</td>
+                            <td>{np.mean(tradeoff_analysis[label]["times"]):.1f}</td>
+                            <td>{np.mean(tradeoff_analysis[label]["psnr"]):.2f}</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+                
+                <h3>10.7 Single-Pass Quantizer Engines</h3>
+                <p>Median cut and octree build the palette from one histogram pass instead of iterating. Median cut repeatedly splits the box with the largest weighted spread at its weighted median; the octree folds its least populated branches until k leaves remain. Both feed the same palette-mapping stage as k-means.</p>
+                
+                <div class="figure">
+                    <img src="{PLOT_PATH}/13_quantizer_engines.png" alt="Quantizer Engines">
+                    <div class="figure-caption">Figure 13: Quantizer engines compared. Left: end-to-end throughput. Right: palette PSNR at each color count.</div>
+                </div>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Engine</th>
+                            <th>Mean Time (ms)</th>
+                            <th>Throughput (Mpx/s)</th>
+                            <th>Mean PSNR (dB)</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for engine in ["kmeans", "mediancut", "octree"]:
+    if not engine_analysis[engine]["times"]:
+        continue
+    throughput_avg = np.mean(engine_analysis[engine]["throughput"]) if engine_analysis[engine]["throughput"] else 0
+    psnr_text = f"{np.mean(engine_analysis[engine]['psnr']):.2f}" if engine_analysis[engine]["psnr"] else "N/A"
+    html += f"""
+                        <tr>
+                            <td>{engine}</td>
+                            <td>{np.mean(engine_analysis[engine]["times"]):.1f}</td>
+                            <td>{throughput_avg:.2f}</td>
+                            <td>{psnr_text}</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+                
+                <h3>10.8 Palette-Index Worker Output</h3>
+                <p>Every output pixel is one of at most 128 palette entries, so the worker can return one index byte per pixel plus the palette instead of four RGBA bytes. The page expands the indices when it draws. Timings below are end-to-end, since the saving is in transfer and memory rather than in the algorithm itself.</p>
+                
+                <div class="figure">
+                    <img src="{PLOT_PATH}/14_output_format.png" alt="Output Format">
+                    <div class="figure-caption">Figure 14: End-to-end time for RGBA and palette-index worker output. Right: speedup of index output per resolution.</div>
+                </div>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Resolution</th>
+                            <th>RGBA (ms)</th>
+                            <th>Indices (ms)</th>
+                            <th>Speedup</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for res in sorted(format_analysis.keys()):
+    rgba_avg = np.mean(format_analysis[res]["rgba"]) if format_analysis[res]["rgba"] else 0
+    index_avg = np.mean(format_analysis[res]["indices"]) if format_analysis[res]["indices"] else 0
+    speedup = rgba_avg / index_avg if index_avg > 0 else 0
+    html += f"""
+                        <tr>
+                            <td>{res}px</td>
+                            <td>{rgba_avg:.1f}</td>
+                            <td>{index_avg:.1f}</td>
+                            <td>{speedup:.2f}x</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+                
+                <h3>10.9 Parallel Palette Mapping</h3>
+                <p>Without dithering each pixel maps independently. The working image is copied into a SharedArrayBuffer and cut into row bands; pool workers claim bands from a shared atomic counter until none remain. This requires a cross-origin isolated page (served by <code>benchmark/serve.js</code>); elsewhere mapping falls back to a single worker. {parallel_fallback_runs} non-isolated runs were excluded.</p>
+                
+                <div class="figure">
+                    <img src="{PLOT_PATH}/15_parallel_mapping_scaling.png" alt="Parallel Mapping Scaling">
+                    <div class="figure-caption">Figure 15: Palette mapping with 1-8 workers. Left: processing time. Right: speedup over one worker against ideal linear scaling.</div>
+                </div>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Resolution</th>
+                            <th>Workers</th>
+                            <th>Mean Time (ms)</th>
+                            <th>Speedup</th>
+                            <th>Efficiency</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for res in sorted(parallel_analysis.keys()):
+    baseline = np.mean(parallel_analysis[res][1]) if parallel_analysis[res][1] else 0
+    for workers in sorted(w for w in parallel_analysis[res] if parallel_analysis[res][w]):
+        avg = np.mean(parallel_analysis[res][workers])
+        speedup = baseline / avg if baseline > 0 and avg > 0 else 0
+        html += f"""
+                        <tr>
+                            <td>{res}px</td>
+                            <td>{workers}</td>
+                            <td>{avg:.1f}</td>
+                            <td>{speedup:.2f}x</td>
+                            <td>{speedup / workers * 100:.0f}%</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+                
+                <h3>10.10 Wavefront-Parallel Error Diffusion</h3>
+                <p>Error diffusion is inherently ordered, but only locally: a pixel depends on neighbours within the kernel's reach R. Workers claim whole rows in order, and row y may process pixel x once row y-1 has finished x + 2R + 1 pixels (3 for Floyd-Steinberg, 5 for Jarvis, Stucki and Atkinson). Every pixel then receives its error terms in serial order, so output is bit-identical to the single-threaded path.</p>
+                
+                <div class="figure">
+                    <img src="{PLOT_PATH}/16_wavefront_diffusion_scaling.png" alt="Wavefront Diffusion Scaling">
+                    <div class="figure-caption">Figure 16: Wavefront error diffusion with 1-8 workers. Left: processing time per kernel. Right: speedup over one worker.</div>
+                </div>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Kernel</th>
+                            <th>Workers</th>
+                            <th>Mean Time (ms)</th>
+                            <th>Speedup</th>
+                            <th>Efficiency</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for kernel in sorted(wavefront_analysis.keys()):
+    baseline = np.mean(wavefront_analysis[kernel][1]) if wavefront_analysis[kernel][1] else 0
+    for workers in sorted(w for w in wavefront_analysis[kernel] if wavefront_analysis[kernel][w]):
+        avg = np.mean(wavefront_analysis[kernel][workers])
+        speedup = baseline / avg if baseline > 0 and avg > 0 else 0
+        html += f"""
+                        <tr>
+                            <td>{kernel}</td>
+                            <td>{workers}</td>
+                            <td>{avg:.1f}</td>
+                            <td>{speedup:.2f}x</td>
+                            <td>{speedup / workers * 100:.0f}%</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+                
+                <h3>10.11 Tiled Streaming Under a Memory Budget</h3>
+                <p>The whole-image path holds the full RGBA frame several times over: the page's readback canvas, the buffer handed to the worker and the upscaled preview. At 16384px that is 1 GB per copy. The tiled path keeps the decoded image as an ImageBitmap and reads it back in horizontal strips sized to the budget, twice: once to build the color histogram the palette is fitted to, once to map and dither. Diffusion error and ordered-dither phase carry across strip edges, so the result matches the whole-image path with histogram sampling. Times below are end-to-end and include failed runs in the completion column.</p>
+                
+                <div class="figure">
+                    <img src="{PLOT_PATH}/17_tiled_streaming.png" alt="Tiled Streaming">
+                    <div class="figure-caption">Figure 17: Whole-image vs strip-wise processing. Left: end-to-end time. Right: share of runs that completed within the timeout.</div>
+                </div>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Resolution</th>
+                            <th>Memory Budget</th>
+                            <th>Mean Time (ms)</th>
+                            <th>Completed</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for res in sorted(tiled_analysis.keys()):
+    for budget in sorted(tiled_analysis[res], key=lambda b: (b != "off", int(b) if b.isdigit() else 0)):
+        entry = tiled_analysis[res][budget]
+        mean_time = f"{np.mean(entry['times']):.1f}" if entry["times"] else "—"
+        html += f"""
+                        <tr>
+                            <td>{res}px</td>
+                            <td>{"Whole image" if budget == "off" else budget + " MB"}</td>
+                            <td>{mean_time}</td>
+                            <td>{entry["completed"]}/{entry["attempted"]}</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+                
+                <h3>10.12 Latency-Budget Mode</h3>
+                <p>With a target latency set, the fixed pixel-count tiers are replaced by a per-device cost model. Each stage (readback, preview, downscale, palette fit, mapping) costs a learned number of milliseconds per unit of work; the rates are refined after every run from the stage times the worker reports and persist in localStorage. The page then picks the finest pixel size and the most colors predicted to fit. Error is |predicted − actual| / actual; "within target" counts runs that finished inside the budget.</p>
+                
+                <div class="figure">
+                    <img src="{PLOT_PATH}/18_latency_budget.png" alt="Latency Budget">
+                    <div class="figure-caption">Figure 18: Left: predicted vs actual end-to-end time. Right: mean time per resolution for each target (dotted lines mark the targets).</div>
+                </div>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Target</th>
+                            <th>Runs</th>
+                            <th>Mean Predicted (ms)</th>
+                            <th>Mean Actual (ms)</th>
+                            <th>Mean Error</th>
+                            <th>Within Target</th>
+                            <th>Mean Pixels</th>
+                            <th>Mean PSNR (dB)</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+for budget in sorted(latency_analysis, key=lambda b: (b != "off", int(b) if b.isdigit() else 0)):
+    entry = latency_analysis[budget]
+    predicted = np.array(entry["predicted"])
+    actual = np.array(entry["actual"])
+    error = np.mean(np.abs(predicted - actual) / actual) * 100
+    within = f"{np.mean(actual <= int(budget)) * 100:.0f}%" if budget != "off" else "—"
+    psnr_text = f"{np.mean(entry['psnr']):.2f}" if entry["psnr"] else "N/A"
+    html += f"""
+                        <tr>
+                            <td>{"Fixed tiers" if budget == "off" else budget + " ms"}</td>
+                            <td>{len(actual)}</td>
+                            <td>{np.mean(predicted):.1f}</td>
+                            <td>{np.mean(actual):.1f}</td>
+                            <td>{error:.1f}%</td>
+                            <td>{within}</td>
+                            <td>{np.mean(entry["pixels"]):,.0f}</td>
+                            <td>{psnr_text}</td>
+                        </tr>
+"""
+
+html += f"""
+                    </tbody>
+                </table>
+            </section>
+            
             <!-- Summary Statistics -->
             <section class="section">
-                <h2>10. Statistical Summary</h2>
+                <h2>11. Statistical Summary</h2>
                 
                 <div class="figure">
                     <img src="{PLOT_PATH}/08_summary_statistics.png" alt="Summary Statistics">
                     <div class="figure-caption">Figure 8: Comprehensive statistical analysis. Top-left: Processing time distribution. Top-right: Mode comparison. Bottom-left: Computational complexity scatter. Bottom-right: Experimental coverage.</div>
                 </div>
                 
-                <h3>10.1 Distribution Analysis</h3>
+                <h3>11.1 Distribution Analysis</h3>
                 <p>Performance metrics exhibit the following statistical characteristics:</p>
                 
                 <div class="stats-grid">
@@ -678,7 +1235,7 @@ html += f"""
             
             <!-- Conclusions -->
             <section class="section">
-                <h2>11. Conclusions & Recommendations</h2>
+                <h2>12. Conclusions & Recommendations</h2>
                 
                 <div class="conclusion">
                     <h3>🎯 Primary Conclusions</h3>
@@ -691,7 +1248,7 @@ html += f"""
                     </ul>
                 </div>
                 
-                <h3>11.1 Performance Optimization Recommendations</h3>
+                <h3>12.1 Performance Optimization Recommendations</h3>
                 <ol>
                     <li><strong>Real-Time Applications:</strong> Use normal mode with output scaling (50-70%) for interactive experiences</li>
                     <li><strong>High-Quality Output:</strong> Heavy mode with full resolution recommended for final rendering</li>
@@ -700,7 +1257,7 @@ html += f"""
                     <li><strong>Adaptive Processing:</strong> Implement dynamic parameter adjustment based on target device capabilities</li>
                 </ol>
                 
-                <h3>11.2 Future Work</h3>
+                <h3>12.2 Future Work</h3>
                 <ul>
                     <li>GPU acceleration investigation for extreme resolutions (16K+)</li>
                     <li>Web Worker parallelization for multi-core utilization</li>
@@ -713,9 +1270,9 @@ html += f"""
             
             <!-- Technical Specifications -->
             <section class="section">
-                <h2>12. Technical Specifications</h2>
+                <h2>13. Technical Specifications</h2>
                 
-                <h3>12.1 Test Environment</h3>
+                <h3>13.1 Test Environment</h3>
                 <table>
                     <tr>
                         <td><strong>Browser Engine</strong></td>
@@ -739,7 +1296,7 @@ html += f"""
                     </tr>
                 </table>
                 
-                <h3>12.2 Benchmark Coverage</h3>
+                <h3>13.2 Benchmark Coverage</h3>
                 <table>
                     <tr>
                         <td><strong>Total Test Cases</strong></td>
@@ -770,12 +1327,12 @@ html += f"""
             
             <!-- Appendix -->
             <section class="section">
-                <h2>13. Appendix</h2>
+                <h2>14. Appendix</h2>
                 
-                <h3>13.1 Statistical Methods</h3>
+                <h3>14.1 Statistical Methods</h3>
                 <p>All performance metrics represent arithmetic means of repeated measurements under identical conditions. Standard deviations are calculated using Bessel's correction (n-1 denominator). Outlier detection was not applied; all successful test runs contribute to reported statistics.</p>
                 
-                <h3>13.2 Data Availability</h3>
+                <h3>14.2 Data Availability</h3>
                 <p>Complete benchmark data, output images, and analysis scripts are available in the benchmark directory structure:</p>
                 <ul>
                     <li><code>benchmark/inputs/</code> - Source test images at all resolutions</li>
@@ -784,7 +1341,7 @@ html += f"""
                     <li><code>benchmark/report/</code> - This comprehensive technical report</li>
                 </ul>
                 
-                <h3>13.3 Reproducibility</h3>
+                <h3>14.3 Reproducibility</h3>
                 <p>To reproduce these benchmarks:</p>
                 <ol>
                     <li>Execute <code>python prepare_dataset.py</code> to generate test images</li>
@@ -794,7 +1351,7 @@ html += f"""
                     <li>Create report with <code>python generate_report.py</code></li>
                 </ol>
                 
-                <h3>13.4 Performance Baselines</h3>
+                <h3>14.4 Performance Baselines</h3>
                 <p>These benchmarks establish baseline performance characteristics for the current implementation. Future optimizations should be evaluated against these metrics to quantify improvements.</p>
                 
                 <table>
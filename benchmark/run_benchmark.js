@@ -6,6 +6,22 @@ const config = require("./benchmark_config");
 const STATS_FILE = "benchmark/stats/benchmark.json";
 const OUTPUT_DIR = config.outputDir;
 
+// Optional engine dimensions: experiment key -> form control id.
+// Experiments that omit a key run with the page default for that control.
+const OPTION_DIMENSIONS = {
+  paletteLookup: "paletteLookup",
+  paletteSearch: "paletteSearch",
+  quantizer: "quantizer",
+  kmeans: "kmeansVariant",
+  sampling: "kmeansSampling",
+  init: "kmeansInit",
+  minibatchBudget: "minibatchBudget",
+  outputFormat: "outputFormat",
+  workers: "mapWorkers",
+  memoryBudget: "memoryBudget",
+  latencyBudget: "latencyBudget"
+};
+
 /* ---------- Helpers ---------- */
 
 function ensureOutputDir() {
@@ -34,44 +50,30 @@ async function saveOutputImage(page, metadata) {
   try {
     const filename = `${metadata.experiment}_${metadata.image}_${metadata.resolution}_` +
                      `${metadata.mode}_c${metadata.colors}_p${metadata.pixelSize}_` +
-                     `s${metadata.outputScale}_${metadata.dithering}.png`;
+                     `s${metadata.outputScale}_${metadata.dithering}` +
+                     Object.values(metadata.options || {}).map(v => `_${v}`).join("") + `.png`;
     
     const filepath = path.join(OUTPUT_DIR, filename);
     
-    // Trigger download and wait for file to be saved
-    await page.evaluate((filename) => {
-      // Use the existing downloadImage function but save to our benchmark directory
-      if (!processedImageData || !currentImage) {
+    // Encode in the page's worker pool: an indexed PNG straight from the
+    // palette and index buffer, several times smaller than RGBA
+    const dataURL = await page.evaluate(async () => {
+      if (!processedImage || !currentImage) {
         throw new Error("No processed image data available");
       }
-      
-      const outputScale = parseInt(document.getElementById('outputScale').value) / 100;
-      let baseWidth = Math.floor(currentImage.width * outputScale);
-      let baseHeight = Math.floor(currentImage.height * outputScale);
-      
-      // Create canvas at processed size
-      const processCanvas = document.createElement('canvas');
-      processCanvas.width = processedImageData.width;
-      processCanvas.height = processedImageData.height;
-      const processCtx = processCanvas.getContext('2d');
-      processCtx.putImageData(processedImageData, 0, 0);
-      
-      // Upscale to base resolution
-      const baseCanvas = document.createElement('canvas');
-      baseCanvas.width = baseWidth;
-      baseCanvas.height = baseHeight;
-      const baseCtx = baseCanvas.getContext('2d');
-      baseCtx.imageSmoothingEnabled = false;
-      baseCtx.drawImage(processCanvas, 0, 0, baseWidth, baseHeight);
-      
-      // Return base64 data
-      return baseCanvas.toDataURL('image/png');
-    }, filename).then(dataURL => {
-      // Convert data URL to buffer and save
-      const base64Data = dataURL.replace(/^data:image\/png;base64,/, '');
-      const buffer = Buffer.from(base64Data, 'base64');
-      fs.writeFileSync(filepath, buffer);
+
+      const result = await exportProcessedImage([1], "indexed");
+      return new Promise((resolve, reject) => {
+        const reader = new FileReader();
+        reader.onload = () => resolve(reader.result);
+        reader.onerror = () => reject(reader.error);
+        reader.readAsDataURL(result.files[0].blob);
+      });
     });
+
+    // Convert data URL to buffer and save
+    const base64Data = dataURL.replace(/^data:image\/png;base64,/, '');
+    fs.writeFileSync(filepath, Buffer.from(base64Data, 'base64'));
     
     return filename;
   } catch (error) {
@@ -80,6 +82,25 @@ async function saveOutputImage(page, metadata) {
   }
 }
 
+function expandOptions(exp) {
+  let combos = [{}];
+  for (const key of Object.keys(OPTION_DIMENSIONS)) {
+    if (!exp[key]) continue;
+    const next = [];
+    for (const combo of combos) {
+      for (const value of exp[key]) {
+        next.push({ ...combo, [key]: value });
+      }
+    }
+    combos = next;
+  }
+  return combos;
+}
+
+function formatOptions(options) {
+  return Object.entries(options).map(([key, value]) => ` | ${key}:${value}`).join("");
+}
+
 function formatTime(ms) {
   if (ms < 1000) return `${ms.toFixed(1)}ms`;
   return `${(ms / 1000).toFixed(2)}s`;
@@ -116,7 +137,8 @@ function formatTime(ms) {
     const dithering = exp.dithering || ["floyd"];
 
     totalTests += modes.length * resolutions.length * images.length * 
-                  scales.length * colors.length * pixelSizes.length * dithering.length;
+                  scales.length * colors.length * pixelSizes.length * dithering.length *
+                  expandOptions(exp).length * (exp.repeats || 1);
   }
 
   console.log(`📊 Total experiments: ${config.experiments.length}`);
@@ -142,6 +164,8 @@ function formatTime(ms) {
             for (const colors of exp.colors) {
               for (const pixelSize of exp.pixelSize) {
                 for (const dithering of exp.dithering) {
+                for (const options of expandOptions(exp)) {
+                for (let run = 1; run <= (exp.repeats || 1); run++) {
                   
                   completedTests++;
                   const progress = ((completedTests / totalTests) * 100).toFixed(1);
@@ -149,7 +173,9 @@ function formatTime(ms) {
                   console.log(
                     `[${completedTests}/${totalTests}] (${progress}%) ` +
                     `${imageName} | ${res}px | ${mode} | scale:${scale}% | ` +
-                    `colors:${colors} | pixel:${pixelSize}x | ${dithering}`
+                    `colors:${colors} | pixel:${pixelSize}x | ${dithering}` +
+                    formatOptions(options) +
+                    (exp.repeats ? ` | run:${run}/${exp.repeats}` : "")
                   );
 
                   try {
@@ -173,7 +199,7 @@ function formatTime(ms) {
 
                     // Set parameters with proper event dispatching
                     await page.evaluate(
-                      ({ scale, colors, pixelSize, dithering }) => {
+                      ({ scale, colors, pixelSize, dithering, options, optionIds, measureQuality }) => {
                         // Output scale
                         const outputScaleEl = document.getElementById("outputScale");
                         outputScaleEl.value = scale;
@@ -195,8 +221,28 @@ function formatTime(ms) {
 
                         // Dithering
                         document.getElementById("ditherAlgo").value = dithering;
+
+                        // Palette quality measurement (excluded from algorithm time)
+                        document.getElementById("measureQuality").checked = measureQuality;
+
+                        // Repeats must measure the pipeline, not a cache lookup
+                        document.getElementById("resultCache").checked = false;
+
+                        // The coarse preview pass would add to the UI time
+                        document.getElementById("progressivePreview").checked = false;
+
+                        // Engine options
+                        for (const [key, value] of Object.entries(options)) {
+                          const el = document.getElementById(optionIds[key]);
+                          el.value = value;
+                          el.dispatchEvent(new Event("change", { bubbles: true }));
+                        }
                       },
-                      { scale, colors, pixelSize, dithering }
+                      {
+                        scale, colors, pixelSize, dithering, options,
+                        optionIds: OPTION_DIMENSIONS,
+                        measureQuality: !!exp.measureQuality
+                      }
                     );
 
                     await page.waitForTimeout(300); // Let parameters settle
@@ -206,7 +252,7 @@ function formatTime(ms) {
                       heavyMode: document.getElementById("heavyProcessingMode").checked,
                       colorCount: parseInt(document.getElementById("colorCount").value),
                       colorMax: parseInt(document.getElementById("colorCount").max),
-                      pixelSize: parseInt(document.getElementById("pixelSize")?.value || 1),
+                      pixelSize: parseFloat(document.getElementById("pixelSize")?.value || 1),
                       outputScale: parseInt(document.getElementById("outputScale").value),
                       dithering: document.getElementById("ditherAlgo").value
                     }));
@@ -244,7 +290,15 @@ function formatTime(ms) {
                       pixelsProcessed: parseInt(
                         document.getElementById("statPixels")?.innerText.replace(/,/g, "") || "0"
                       ),
-                      dithering: document.getElementById("ditherAlgo")?.value || "unknown"
+                      psnr: parseFloat(
+                        document.getElementById("statPsnr")?.innerText.replace("dB", "").trim()
+                      ) || null,
+                      // "predicted / actual ms"
+                      predictedTime_ms: parseFloat(
+                        document.getElementById("statLatency")?.innerText.split("/")[0]
+                      ) || null,
+                      dithering: document.getElementById("ditherAlgo")?.value || "unknown",
+                      crossOriginIsolated: window.crossOriginIsolated === true
                     }));
 
                     // Save output image if requested
@@ -259,7 +313,8 @@ function formatTime(ms) {
                         outputScale: scale,
                         colors: actualParams.colorCount, // Use actual value set
                         pixelSize,
-                        dithering
+                        dithering,
+                        options
                       });
                     }
 
@@ -275,10 +330,16 @@ function formatTime(ms) {
                       colorMax: actualParams.colorMax,
                       pixelSize: actualParams.pixelSize,
                       dithering: actualParams.dithering,
+                      ...options,
+                      run,
                       algorithmTime_ms: stats.algorithmTime_ms,
                       totalProcessingTime_ms: totalTime,
+                      uiTime_ms: stats.totalTime_ms,
                       iterations: stats.iterations,
                       pixelsProcessed: stats.pixelsProcessed,
+                      psnr: stats.psnr,
+                      predictedTime_ms: stats.predictedTime_ms,
+                      crossOriginIsolated: stats.crossOriginIsolated,
                       outputImage: outputFilename,
                       timestamp: new Date().toISOString(),
                       success: true
@@ -305,6 +366,8 @@ function formatTime(ms) {
                       colors,
                       pixelSize,
                       dithering,
+                      ...options,
+                      run,
                       error: error.message,
                       timestamp: new Date().toISOString(),
                       success: false
@@ -313,6 +376,8 @@ function formatTime(ms) {
                     await page.waitForTimeout(2000);
                   }
                 }
+                }
+                }
               }
             }
           }
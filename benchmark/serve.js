@@ -0,0 +1,75 @@
+// Static server for the app and benchmark runs.
+// Sends the cross-origin isolation headers (COOP/COEP) the browser requires
+// before it exposes SharedArrayBuffer, which parallel palette mapping needs.
+//
+//   node benchmark/serve.js [port]
+const http = require("http");
+const fs = require("fs");
+const path = require("path");
+const config = require("./benchmark_config");
+
+const ROOT = path.resolve(__dirname, "..");
+const PORT = parseInt(process.argv[2]) || parseInt(new URL(config.baseUrl).port) || 5500;
+
+const MIME_TYPES = {
+  ".html": "text/html; charset=utf-8",
+  ".js": "application/javascript; charset=utf-8",
+  ".css": "text/css; charset=utf-8",
+  ".json": "application/json; charset=utf-8",
+  ".png": "image/png",
+  ".jpg": "image/jpeg",
+  ".jpeg": "image/jpeg",
+  ".gif": "image/gif",
+  ".svg": "image/svg+xml",
+  ".ico": "image/x-icon"
+};
+
+const ISOLATION_HEADERS = {
+  "Cross-Origin-Opener-Policy": "same-origin",
+  "Cross-Origin-Embedder-Policy": "require-corp",
+  "Cross-Origin-Resource-Policy": "same-origin"
+};
+
+const server = http.createServer((req, res) => {
+  let urlPath;
+  try {
+    urlPath = decodeURIComponent(new URL(req.url, "http://localhost").pathname);
+  } catch (err) {
+    res.writeHead(400, ISOLATION_HEADERS);
+    res.end("Bad request");
+    return;
+  }
+  let filePath = path.join(ROOT, urlPath);
+
+  // Refuse anything that escapes the repository root. A plain prefix check
+  // would also admit siblings such as ROOT + "-x"
+  const relative = path.relative(ROOT, filePath);
+  if (relative.startsWith("..") || path.isAbsolute(relative)) {
+    res.writeHead(403, ISOLATION_HEADERS);
+    res.end("Forbidden");
+    return;
+  }
+
+  if (fs.existsSync(filePath) && fs.statSync(filePath).isDirectory()) {
+    filePath = path.join(filePath, "index.html");
+  }
+
+  fs.readFile(filePath, (err, content) => {
+    if (err) {
+      res.writeHead(404, ISOLATION_HEADERS);
+      res.end("Not found");
+      return;
+    }
+
+    res.writeHead(200, {
+      ...ISOLATION_HEADERS,
+      "Content-Type": MIME_TYPES[path.extname(filePath).toLowerCase()] || "application/octet-stream",
+      "Cache-Control": "no-store"
+    });
+    res.end(content);
+  });
+});
+
+server.listen(PORT, () => {
+  console.log(`Serving ${ROOT} at http://localhost:${PORT} (cross-origin isolated)`);
+});
@@ -1,8 +1,129 @@
 // Web Worker code for image processing algorithms - OPTIMIZED VERSION
 function createWorkerCode() {
     return `
+        // Workers are long-lived (see WorkerPool); every message echoes the
+        // job id so the pool can route it back to the right caller.
+        let currentJobId = null;
+
+        function postJobMessage(message, transfer = []) {
+            message.jobId = currentJobId;
+            self.postMessage(message, transfer);
+        }
+
+        // Cooperative cancellation: when the page supersedes a job the pool
+        // raises its shared flag, and long-running loops check it between
+        // units of work (stages, k-means iterations, strips, row bands).
+        // Helpers share their parent's flag. The pool has already settled
+        // the job; a cancelled job stops and acknowledges with 'cancelled'
+        // so the pool can hand this worker the next job.
+        let cancelFlag = null;
+
+        class JobCancelled extends Error {}
+
+        // Rows mapped between two checks
+        const CANCEL_CHECK_ROWS = 64;
+
+        function checkCancelled() {
+            if (cancelFlag !== null && Atomics.load(cancelFlag, 0) !== 0) {
+                throw new JobCancelled('Job cancelled');
+            }
+        }
+
         self.onmessage = function (e) {
-            const { imageData, numColors, blockSize, dithering } = e.data;
+            // Not a job: the pool keeps one cached source across workers
+            if (e.data.evictSource) {
+                cachedSource = null;
+                return;
+            }
+
+            currentJobId = e.data.jobId;
+            cancelFlag = e.data.cancelFlag || null;
+            try {
+                if (e.data.task) {
+                    runSharedTask(e.data);
+                    postJobMessage({ type: 'complete' });
+                } else if (e.data.exportScales) {
+                    // Asynchronous: deflate runs on a CompressionStream
+                    exportImages(e.data).catch(err => {
+                        postJobMessage({ type: 'error', message: err.message });
+                    });
+                } else if (e.data.hashPixels) {
+                    hashImagePixels(e.data);
+                } else if (e.data.memoryBudget) {
+                    processTiledJob(e.data);
+                } else {
+                    processImageJob(e.data);
+                }
+            } catch (err) {
+                // A job that stopped early has not closed its bitmap yet;
+                // closing an already closed one is harmless
+                if (e.data.source) e.data.source.close();
+                // The source may be cached even though the job stopped
+                const sourceCached = cachedSource ? cachedSource.key : null;
+                if (err instanceof JobCancelled) {
+                    postJobMessage({ type: 'cancelled', sourceCached });
+                    return;
+                }
+                postJobMessage({ type: 'error', name: err.name, message: err.message, sourceCached });
+            }
+        };
+
+        // 🚀 Incremental reprocessing: the last source read back, keyed by
+        // the page's image id and processing size. A rerun that only changes
+        // later stages (pixel size, colors, dithering) skips the readback.
+        // Every complete, cancelled or error message reports the key held
+        // here; the pool keeps it in one worker only and sends reruns there
+        // without a bitmap.
+        const SOURCE_CACHE_BYTES = 256 * 1024 * 1024;
+        let cachedSource = null;
+
+        // A rerun sent without a bitmap to a worker that no longer holds
+        // the source; the page retries with one
+        class SourceMissing extends Error {
+            constructor() {
+                super('Cached source is gone');
+                this.name = 'SourceMissing';
+            }
+        }
+
+        function processImageJob(job) {
+            const {
+                source, width, height, numColors, blockSize, dithering,
+                paletteLookup = 'lut', paletteSearch = 'auto', kmeans = 'lloyd',
+                sampling = 'strided', init = 'kmeans++', seed, budgetMs,
+                measureQuality = false, quantizer = 'kmeans', outputFormat = 'rgba',
+                workers = 1, sourceKey = null, palette = null, initialPalette = null
+            } = job;
+
+            // Milliseconds per stage, for the stages this run actually executed
+            const stages = {};
+            const reused = [];
+
+            // A decoded bitmap is resized to the processing size and read
+            // back here rather than on the page's thread
+            let imageData = job.imageData;
+            if (!imageData && sourceKey && cachedSource && cachedSource.key === sourceKey) {
+                if (source) source.close();
+                imageData = cachedSource.imageData;
+                reused.push('source');
+            } else if (!imageData && !source) {
+                throw new SourceMissing();
+            } else if (!imageData) {
+                const readStart = Date.now();
+                imageData = readSourceImage(source, width, height);
+                stages.readback = Date.now() - readStart;
+                cachedSource = sourceKey && width * height * 4 <= SOURCE_CACHE_BYTES
+                    ? { key: sourceKey, imageData: imageData }
+                    : null;
+            }
+            checkCancelled();
+
+            // Kept outside the algorithm time, like the readback
+            if (job.preview) {
+                const previewStart = Date.now();
+                if (postPreview(imageData, job)) stages.preview = Date.now() - previewStart;
+                checkCancelled();
+            }
 
             // ===== START ALGORITHM TIMER (ROBUST) =====
             const algoStart = Date.now();
@@ -10,265 +131,2464 @@ function createWorkerCode() {
             let workingData = imageData;
 
             if (blockSize > 1) {
-                self.postMessage({ type: 'progress', progress: 5, text: 'Downscaling image...' });
+                postJobMessage({ type: 'progress', progress: 5, text: 'Downscaling image...' });
                 workingData = downscaleImage(imageData, blockSize);
+                stages.downscale = Date.now() - algoStart;
+                checkCancelled();
+            } else if (cachedSource && imageData === cachedSource.imageData) {
+                // Mapping writes in place: keep the cached source intact
+                workingData = new ImageData(new Uint8ClampedArray(imageData.data), imageData.width, imageData.height);
             }
 
-            self.postMessage({ type: 'progress', progress: 10, text: 'Running K-means clustering...' });
-            const result = kMeansQuantization(workingData, numColors);
+            const paletteStart = Date.now();
+            let result;
+            if (palette) {
+                // Only mapping settings changed: the previous palette still holds
+                result = { palette: palette, iterations: 0 };
+                reused.push('palette');
+            } else if (quantizer === 'mediancut') {
+                postJobMessage({ type: 'progress', progress: 10, text: 'Running median cut...' });
+                result = medianCutQuantization(workingData, numColors);
+            } else if (quantizer === 'octree') {
+                postJobMessage({ type: 'progress', progress: 10, text: 'Building color octree...' });
+                result = octreeQuantization(workingData, numColors);
+            } else {
+                postJobMessage({ type: 'progress', progress: 10, text: 'Running K-means clustering...' });
+                result = kMeansQuantization(workingData, numColors, 15, {
+                    paletteSearch, kmeans, sampling, init, seed, budgetMs, initialPalette
+                });
+                if (initialPalette) reused.push('warm start');
+            }
+            if (!palette) stages.palette = Date.now() - paletteStart;
+            checkCancelled();
 
-            self.postMessage({
+            postJobMessage({
                 type: 'palette',
                 palette: result.palette,
-                iterations: result.iterations
+                iterations: result.iterations,
+                converged: result.converged
             });
 
-            self.postMessage({
+            // Quality measurement is excluded from the algorithm time
+            let psnr = null;
+            let qualityTime = 0;
+            if (measureQuality) {
+                const qualityStart = Date.now();
+                psnr = measurePalettePSNR(workingData, result.palette);
+                qualityTime = Date.now() - qualityStart;
+            }
+
+            postJobMessage({
                 type: 'progress',
                 progress: 70,
                 text: 'Applying ' + dithering + ' dithering...'
             });
 
-            const processedData = applyPalette(
-                workingData,
-                result.palette,
-                dithering
-            );
+            // Index output: one byte per pixel instead of four
+            const indices = outputFormat === 'indices'
+                ? new Uint8Array(workingData.width * workingData.height)
+                : null;
+
+            // Split palette application across pool workers when shared
+            // memory is available (row bands, or a wavefront when diffusing)
+            const parallelWorkers = canRunParallel(dithering) && canShareMemory()
+                ? resolveWorkerCount(workers)
+                : 1;
+
+            // workingData is the transferred input, a fresh downscale or a
+            // copy of the cached source: nothing reads it again, so map it
+            // in place
+            const mappingStart = Date.now();
+            const processedData = parallelWorkers > 1
+                ? applyPaletteParallel(
+                    workingData,
+                    result.palette,
+                    dithering,
+                    paletteLookup,
+                    paletteSearch,
+                    indices,
+                    parallelWorkers
+                )
+                : applyPalette(
+                    workingData,
+                    result.palette,
+                    dithering,
+                    paletteLookup,
+                    paletteSearch,
+                    true,
+                    indices
+                );
 
             // ===== END ALGORITHM TIMER =====
             const algoEnd = Date.now();
+            stages.mapping = algoEnd - mappingStart;
+
+            postJobMessage({ type: 'progress', progress: 100, text: 'Complete!' });
 
-            self.postMessage({ type: 'progress', progress: 100, text: 'Complete!' });
+            // Undithered index output leaves the RGBA data unmapped
+            if (indices) expandIndicesInto(processedData.data, indices, result.palette);
 
-            self.postMessage({
+            const complete = {
                 type: 'complete',
-                imageData: processedData,
                 palette: result.palette,
                 iterations: result.iterations,
-                algorithmTime: algoEnd - algoStart
+                converged: result.converged,
+                psnr: psnr,
+                workers: parallelWorkers,
+                width: processedData.width,
+                height: processedData.height,
+                algorithmTime: algoEnd - algoStart - qualityTime,
+                stages: stages,
+                reused: reused,
+                sourceCached: cachedSource ? cachedSource.key : null
+            };
+
+            // The small result goes back as a bitmap the page can draw
+            // once, scaled, without putImageData or readback
+            const transfer = [];
+            if (typeof OffscreenCanvas !== 'undefined') {
+                complete.bitmap = createResultBitmap(processedData);
+                transfer.push(complete.bitmap);
+            } else {
+                complete.imageData = processedData;
+                transfer.push(processedData.data.buffer);
+            }
+
+            if (indices) {
+                complete.indices = indices;
+                transfer.push(indices.buffer);
+            }
+
+            postJobMessage(complete, transfer);
+        }
+
+        // 🚀 Progressive preview
+        // Large jobs first post a coarse result so the page has something to
+        // show while the full-quality run continues: the source shrunk to
+        // about PREVIEW_PIXELS, a short k-means fit (or the reused palette)
+        // and the requested dithering. Returns false for jobs small enough
+        // that the full result is nearly as quick.
+        const PREVIEW_PIXELS = 64 * 1024;
+        const PREVIEW_MIN_PIXELS = 1024 * 1024;
+
+        function postPreview(imageData, job) {
+            const { blockSize, numColors, dithering, palette, init, seed } = job;
+            const pixels = imageData.width * imageData.height;
+            if (pixels / (blockSize * blockSize) < PREVIEW_MIN_PIXELS) return false;
+
+            // Whole factors take downscaleImage's integer fast path
+            const factor = Math.ceil(Math.sqrt(pixels / PREVIEW_PIXELS));
+            const small = downscaleImage(imageData, factor);
+            const previewPalette = palette || kMeansQuantization(small, numColors, 4, {
+                kmeans: 'lloyd', sampling: 'strided', init, seed
+            }).palette;
+            const mapped = applyPalette(small, previewPalette, dithering, 'direct', 'auto', true, null);
+
+            const preview = { type: 'preview', width: mapped.width, height: mapped.height };
+            if (typeof OffscreenCanvas !== 'undefined') {
+                preview.bitmap = createResultBitmap(mapped);
+                postJobMessage(preview, [preview.bitmap]);
+            } else {
+                preview.imageData = mapped;
+                postJobMessage(preview, [mapped.data.buffer]);
+            }
+            return true;
+        }
+
+        function createResultBitmap(imageData) {
+            const canvas = new OffscreenCanvas(imageData.width, imageData.height);
+            canvas.getContext('2d').putImageData(imageData, 0, 0);
+            return canvas.transferToImageBitmap();
+        }
+
+        // Pack each entry once so the loop is a single 32-bit store per pixel
+        function expandIndicesInto(data, indices, palette) {
+            const packed = new Uint32Array(palette.length);
+            const bytes = new Uint8Array(packed.buffer);
+            palette.forEach((color, i) => {
+                bytes[i * 4] = color[0];
+                bytes[i * 4 + 1] = color[1];
+                bytes[i * 4 + 2] = color[2];
+                bytes[i * 4 + 3] = 255;
             });
-        };
 
+            const pixels = new Uint32Array(data.buffer, data.byteOffset, indices.length);
+            for (let i = 0; i < indices.length; i++) {
+                pixels[i] = packed[indices[i]];
+            }
+        }
+
+        // 🚀 Tiled streaming pipeline
+        // For images too large to hold as one pixel buffer. The source stays
+        // an ImageBitmap and is read back in horizontal strips through a
+        // small OffscreenCanvas, in two passes: the first only bins colors
+        // into the histogram the palette is fitted to, the second maps and
+        // dithers. Each finished strip is posted as soon as it is done and
+        // the page assembles the output, so the worker's working set is set
+        // by memoryBudget (MB) rather than by the image size.
+        function processTiledJob(job) {
+            const {
+                source, width, height, memoryBudget, numColors, blockSize, dithering,
+                paletteLookup = 'lut', paletteSearch = 'auto', kmeans = 'lloyd',
+                init = 'kmeans++', seed, measureQuality = false, quantizer = 'kmeans',
+                outputFormat = 'rgba', initialPalette = null
+            } = job;
+
+            const algoStart = Date.now();
+            const stages = {};
+            const reused = [];
+
+            const outWidth = Math.floor(width / blockSize);
+            const outHeight = Math.floor(height / blockSize);
+            const stripRows = planStripRows(width, outWidth, blockSize, memoryBudget);
+            const strips = Math.ceil(outHeight / stripRows);
+            const readRows = createStripReader(source, width, height);
+
+            // Strips start on whole source rows (see planStripRows), so a
+            // downscaled strip is exactly that band of the whole downscale
+            const readStrip = (y, rows) => {
+                const pixels = readRows(Math.round(y * blockSize), Math.round(rows * blockSize));
+                return blockSize > 1 ? downscaleImage(pixels, blockSize) : pixels;
+            };
+
+            // A reused palette skips the whole first pass
+            let result;
+            if (job.palette) {
+                result = { palette: job.palette, iterations: 0 };
+                reused.push('palette');
+            } else {
+                const histogram = createColorHistogram();
+                for (let y = 0, strip = 1; y < outHeight; y += stripRows, strip++) {
+                    postJobMessage({
+                        type: 'progress',
+                        progress: 5 + Math.round(25 * strip / strips),
+                        text: 'Reading strip ' + strip + '/' + strips + '...'
+                    });
+                    addToColorHistogram(histogram, readStrip(y, Math.min(stripRows, outHeight - y)).data);
+                    checkCancelled();
+                }
+                const samples = summarizeColorHistogram(histogram);
+
+                if (quantizer === 'mediancut') {
+                    postJobMessage({ type: 'progress', progress: 35, text: 'Running median cut...' });
+                    result = medianCutQuantization(null, numColors, samples);
+                } else if (quantizer === 'octree') {
+                    postJobMessage({ type: 'progress', progress: 35, text: 'Building color octree...' });
+                    result = octreeQuantization(null, numColors, samples);
+                } else {
+                    postJobMessage({ type: 'progress', progress: 35, text: 'Running K-means clustering...' });
+                    result = kMeansQuantization(null, numColors, 15, {
+                        paletteSearch, kmeans, init, seed, histogram: samples, initialPalette
+                    });
+                    if (initialPalette) reused.push('warm start');
+                }
+                stages.palette = Date.now() - algoStart;
+            }
+
+            const palette = result.palette;
+            postJobMessage({
+                type: 'palette',
+                palette: palette,
+                iterations: result.iterations,
+                converged: result.converged
+            });
+
+            const lookup = createLookup(palette, paletteLookup, paletteSearch);
+            const kernel = getKernel(dithering);
+            const pattern = isOrderedDither(dithering) ? createOrderedPattern(dithering, palette) : null;
+            const errors = kernel ? createErrorRows(outWidth, kernel) : null;
+            const qualityLookup = measureQuality ? createPaletteLUT(palette) : null;
+
+            let squaredError = 0;
+            let qualityTime = 0;
+            const mappingStart = Date.now();
+
+            for (let y = 0, strip = 1; y < outHeight; y += stripRows, strip++) {
+                postJobMessage({
+                    type: 'progress',
+                    progress: 40 + Math.round(60 * strip / strips),
+                    text: 'Applying ' + dithering + ' dithering, strip ' + strip + '/' + strips + '...'
+                });
+
+                const rows = Math.min(stripRows, outHeight - y);
+                const pixels = readStrip(y, rows);
+
+                if (measureQuality) {
+                    const qualityStart = Date.now();
+                    squaredError += sumPaletteError(pixels.data, palette, qualityLookup);
+                    qualityTime += Date.now() - qualityStart;
+                }
+
+                const indices = outputFormat === 'indices' ? new Uint8Array(outWidth * rows) : null;
+                mapRows(pixels.data, indices, outWidth, rows, y, palette, lookup, kernel, pattern, errors);
+
+                const message = { type: 'strip', y: y, width: outWidth, height: rows };
+                if (indices) {
+                    message.indices = indices;
+                    postJobMessage(message, [indices.buffer]);
+                } else {
+                    message.imageData = pixels;
+                    postJobMessage(message, [pixels.data.buffer]);
+                }
+                checkCancelled();
+            }
+
+            source.close();
+            stages.mapping = Date.now() - mappingStart - qualityTime;
+
+            postJobMessage({
+                type: 'complete',
+                palette: palette,
+                iterations: result.iterations,
+                converged: result.converged,
+                psnr: measureQuality ? paletteErrorToPSNR(squaredError, outWidth * outHeight) : null,
+                workers: 1,
+                tiles: strips,
+                stripRows: stripRows,
+                width: outWidth,
+                height: outHeight,
+                algorithmTime: Date.now() - algoStart - qualityTime,
+                stages: stages,
+                reused: reused
+            });
+        }
+
+        // 🚀 Content hash of the decoded pixels (the page's result cache key)
+        // Read in strips to stay within a small budget at any resolution.
+        // Two independent 32-bit lanes (Murmur3 and FNV-1a over RGBA words)
+        // make a 64-bit hash; the size is appended.
+        const HASH_STRIP_BYTES = 32 * 1024 * 1024;
+
+        function hashImagePixels(job) {
+            const { source, width, height } = job;
+            const stripRows = Math.max(1, Math.floor(HASH_STRIP_BYTES / (width * 4)));
+            const readRows = createStripReader(source, width, height);
+            let h1 = 0x9747b28c;
+            let h2 = 0x811c9dc5;
+
+            for (let y = 0; y < height; y += stripRows) {
+                const words = new Uint32Array(readRows(y, Math.min(stripRows, height - y)).data.buffer);
+                for (let i = 0; i < words.length; i++) {
+                    const word = words[i];
+                    let k = Math.imul(word, 0xcc9e2d51);
+                    k = Math.imul((k << 15) | (k >>> 17), 0x1b873593);
+                    h1 ^= k;
+                    h1 = (Math.imul((h1 << 13) | (h1 >>> 19), 5) + 0xe6546b64) | 0;
+                    h2 = Math.imul(h2 ^ word, 0x01000193);
+                }
+            }
+            source.close();
+
+            const hex = h => (h >>> 0).toString(16).padStart(8, '0');
+            postJobMessage({
+                type: 'complete',
+                hash: hex(finalizeHash(h1)) + hex(finalizeHash(h2)) + '-' + width + 'x' + height
+            });
+        }
+
+        // Murmur3 finalizer: spreads every input bit over the output
+        function finalizeHash(h) {
+            h ^= h >>> 16;
+            h = Math.imul(h, 0x85ebca6b);
+            h ^= h >>> 13;
+            h = Math.imul(h, 0xc2b2ae35);
+            return h ^ (h >>> 16);
+        }
+
+        function readSourceImage(source, width, height) {
+            const imageData = createStripReader(source, width, height)(0, height);
+            source.close();
+            return imageData;
+        }
+
+        // Output rows per strip so that one strip's buffers fit the budget:
+        // canvas backing store and readback (4 + 4 bytes per source pixel)
+        // plus the downscaled strip and its indices (5 bytes per output
+        // pixel). Fractional block sizes round down to whole periods so every
+        // strip starts on a source row boundary.
+        function planStripRows(width, outWidth, blockSize, memoryBudget) {
+            const period = getBlockPeriod(blockSize);
+            const rowBytes = blockSize * width * 8 + outWidth * 5;
+            const rows = Math.floor(memoryBudget * 1024 * 1024 / rowBytes);
+            return Math.max(period, rows - rows % period);
+        }
+
+        // Smallest number of output rows spanning a whole number of source rows
+        function getBlockPeriod(blockSize) {
+            for (let period = 1; period <= 64; period++) {
+                const span = period * blockSize;
+                if (Math.abs(span - Math.round(span)) < 1e-9) return period;
+            }
+            throw new Error('Tiled processing needs a block size in steps of 1/64');
+        }
+
+        // Reads rows [y, y + rows) of the image at processing size; the
+        // source is scaled on the fly, so it is never resized as a whole
+        function createStripReader(source, width, height) {
+            const scaleX = source.width / width;
+            const scaleY = source.height / height;
+            let canvas = null;
+            let ctx = null;
+
+            return function readRows(y, rows) {
+                if (!canvas || canvas.height !== rows) {
+                    canvas = new OffscreenCanvas(width, rows);
+                    ctx = canvas.getContext('2d', { willReadFrequently: true });
+                }
+                ctx.clearRect(0, 0, width, rows);
+                ctx.drawImage(source, 0, y * scaleY, width * scaleX, rows * scaleY, 0, 0, width, rows);
+                return ctx.getImageData(0, 0, width, rows);
+            };
+        }
+
+        // 🚀 Separable box downscale
+        // Each source row is read once: it is reduced horizontally into a
+        // row of block sums, which is then added into the one or two output
+        // rows it overlaps. Block sizes may be fractional (>= 1): a source
+        // pixel straddling a block edge is split by area between the two
+        // blocks, so every output pixel is the exact area average of its
+        // blockSize x blockSize window. Integer sizes give plain block means.
         function downscaleImage(imageData, blockSize) {
-            const width = imageData.width;
-            const height = imageData.height;
+            const { width, height, data } = imageData;
             const newWidth = Math.floor(width / blockSize);
             const newHeight = Math.floor(height / blockSize);
             const newData = new Uint8ClampedArray(newWidth * newHeight * 4);
+            const area = blockSize * blockSize;
+
+            if (Number.isInteger(blockSize)) {
+                downscaleIntegerBlocks(data, width, newData, newWidth, newHeight, blockSize);
+                return new ImageData(newData, newWidth, newHeight);
+            }
+
+            const cols = createBoxSpans(width, blockSize);
+            const rows = createBoxSpans(height, blockSize);
+
+            const rowSums = new Float64Array(newWidth * 3);
+            let current = new Float64Array(newWidth * 3);
+            let next = new Float64Array(newWidth * 3);
+            let outY = 0;
+
+            for (let sy = 0; sy < height && outY < newHeight; sy++) {
+                const ty = rows.target[sy];
+                if (ty >= newHeight) break;
+
+                // Finish output rows that no later source row touches
+                while (outY < ty) {
+                    writeBoxRow(newData, current, newWidth, outY, area);
+                    [current, next] = [next, current];
+                    next.fill(0);
+                    outY++;
+                }
+
+                rowSums.fill(0);
+                let src = sy * width * 4;
+                for (let sx = 0; sx < width; sx++, src += 4) {
+                    const tx = cols.target[sx];
+                    if (tx >= newWidth) break;
+
+                    const w = cols.weight[sx];
+                    const r = data[src], g = data[src + 1], b = data[src + 2];
+                    const o = tx * 3;
+                    rowSums[o] += r * w;
+                    rowSums[o + 1] += g * w;
+                    rowSums[o + 2] += b * w;
+
+                    if (w < 1 && tx + 1 < newWidth) {
+                        const rest = 1 - w;
+                        rowSums[o + 3] += r * rest;
+                        rowSums[o + 4] += g * rest;
+                        rowSums[o + 5] += b * rest;
+                    }
+                }
+
+                const wy = rows.weight[sy];
+                for (let i = 0; i < rowSums.length; i++) {
+                    current[i] += rowSums[i] * wy;
+                }
+                if (wy < 1 && ty + 1 < newHeight) {
+                    const rest = 1 - wy;
+                    for (let i = 0; i < rowSums.length; i++) {
+                        next[i] += rowSums[i] * rest;
+                    }
+                }
+            }
+
+            while (outY < newHeight) {
+                writeBoxRow(newData, current, newWidth, outY, area);
+                [current, next] = [next, current];
+                next.fill(0);
+                outY++;
+            }
+
+            return new ImageData(newData, newWidth, newHeight);
+        }
+
+        // Integer blocks never straddle: sum runs of blockSize pixels per
+        // source row straight into integer block sums
+        function downscaleIntegerBlocks(data, width, newData, newWidth, newHeight, blockSize) {
+            const sums = new Uint32Array(newWidth * 3);
+            const area = blockSize * blockSize;
 
             for (let y = 0; y < newHeight; y++) {
-                for (let x = 0; x < newWidth; x++) {
-                    let r = 0, g = 0, b = 0, count = 0;
-
-                    for (let by = 0; by < blockSize; by++) {
-                        for (let bx = 0; bx < blockSize; bx++) {
-                            const srcX = x * blockSize + bx;
-                            const srcY = y * blockSize + by;
-
-                            if (srcX < width && srcY < height) {
-                                const srcIdx = (srcY * width + srcX) * 4;
-                                r += imageData.data[srcIdx];
-                                g += imageData.data[srcIdx + 1];
-                                b += imageData.data[srcIdx + 2];
-                                count++;
-                            }
+                sums.fill(0);
+
+                for (let sy = y * blockSize; sy < (y + 1) * blockSize; sy++) {
+                    let src = sy * width * 4;
+                    for (let o = 0; o < sums.length; o += 3) {
+                        let r = 0, g = 0, b = 0;
+                        for (let k = 0; k < blockSize; k++, src += 4) {
+                            r += data[src];
+                            g += data[src + 1];
+                            b += data[src + 2];
                         }
+                        sums[o] += r;
+                        sums[o + 1] += g;
+                        sums[o + 2] += b;
                     }
+                }
+
+                writeBoxRow(newData, sums, newWidth, y, area);
+            }
+        }
+
+        // For each source index along one axis: the first output block it
+        // falls in and the share of it inside that block (the remainder
+        // belongs to the following block)
+        function createBoxSpans(length, blockSize) {
+            const target = new Int32Array(length);
+            const weight = new Float64Array(length);
+            for (let i = 0; i < length; i++) {
+                const block = Math.floor(i / blockSize);
+                target[i] = block;
+                weight[i] = Math.min(1, (block + 1) * blockSize - i);
+            }
+            return { target, weight };
+        }
+
+        function writeBoxRow(newData, sums, newWidth, y, area) {
+            let idx = y * newWidth * 4;
+            for (let x = 0; x < newWidth; x++, idx += 4) {
+                newData[idx] = sums[x * 3] / area;
+                newData[idx + 1] = sums[x * 3 + 1] / area;
+                newData[idx + 2] = sums[x * 3 + 2] / area;
+                newData[idx + 3] = 255;
+            }
+        }
+
+        // K-means stops once centroids moved less than one level on average
+        // during an iteration (summed shift <= tolerance × k), or at maxIterations
+        const KMEANS_TOLERANCE = 1;
+        const DEFAULT_SEED = 0x9e3779b9;
+
+        function kMeansQuantization(imageData, k, maxIterations = 15, options = {}) {
+            const {
+                paletteSearch = 'auto', kmeans = 'lloyd', sampling = 'strided',
+                init = 'kmeans++', seed = DEFAULT_SEED,
+                budgetMs = MINIBATCH_DEFAULT_BUDGET_MS, histogram = null,
+                initialPalette = null
+            } = options;
+
+            // Mini-batch mode streams pixels from the full buffer instead.
+            // A prebuilt histogram (tiled runs: there is no full buffer)
+            // always goes through batch k-means.
+            if (kmeans === 'minibatch' && !histogram) {
+                return runMiniBatch(imageData.data, k, init, createRandom(seed), budgetMs, initialPalette);
+            }
+
+            // Samples and centroids live in flat RGB buffers; each sample
+            // carries a weight (1 for strided pixels, pixel count for bins)
+            const { samples, weights } = histogram
+                ? histogram
+                : sampling === 'histogram'
+                    ? buildColorHistogram(imageData.data)
+                    : sampleStrided(imageData.data);
+
+            // Seeded initialization keeps palettes and iteration counts
+            // reproducible for identical inputs
+            const random = createRandom(seed);
+            const centroids = initialPalette
+                ? seedFromPalette(samples, weights, k, random, initialPalette)
+                : init === 'random'
+                    ? seedRandom(samples, weights, k, random)
+                    : seedKMeansPlusPlus(samples, weights, k, random);
+
+            const tolerance = KMEANS_TOLERANCE * k;
+            const iterations = kmeans === 'hamerly'
+                ? runHamerly(samples, weights, centroids, k, maxIterations, tolerance)
+                : runLloyd(samples, weights, centroids, k, maxIterations, tolerance, paletteSearch);
+
+            return { palette: toPalette(centroids, k), iterations };
+        }
+
+        // Mulberry32: small, fast and fully determined by its seed
+        function createRandom(seed) {
+            let state = seed >>> 0;
+            return function random() {
+                state = (state + 0x6d2b79f5) >>> 0;
+                let t = state;
+                t = Math.imul(t ^ (t >>> 15), t | 1);
+                t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+                return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+            };
+        }
+
+        function seedRandom(samples, weights, k, random) {
+            const n = weights.length;
+            const centroids = new Float32Array(k * 3);
+            for (let i = 0; i < k; i++) {
+                const p = Math.floor(random() * n) * 3;
+                centroids[i * 3]     = samples[p];
+                centroids[i * 3 + 1] = samples[p + 1];
+                centroids[i * 3 + 2] = samples[p + 2];
+            }
+            return centroids;
+        }
+
+        // k-means++: each new centroid is drawn with probability proportional
+        // to weight × squared distance from the nearest centroid chosen so far
+        function seedKMeansPlusPlus(samples, weights, k, random) {
+            const n = weights.length;
+            const centroids = new Float32Array(k * 3);
+            const nearestDist = new Float64Array(n).fill(Infinity);
+
+            let total = 0;
+            for (let x = 0; x < n; x++) total += weights[x];
+            let chosen = pickWeighted(weights, null, total, random);
+
+            for (let i = 0; i < k; i++) {
+                const p = chosen * 3;
+                const cr = samples[p], cg = samples[p + 1], cb = samples[p + 2];
+                centroids[i * 3]     = cr;
+                centroids[i * 3 + 1] = cg;
+                centroids[i * 3 + 2] = cb;
+
+                if (i === k - 1) break;
 
-                    const idx = (y * newWidth + x) * 4;
-                    newData[idx]     = r / count;
-                    newData[idx + 1] = g / count;
-                    newData[idx + 2] = b / count;
-                    newData[idx + 3] = 255;
+                total = 0;
+                for (let x = 0, j = 0; x < n; x++, j += 3) {
+                    const dr = samples[j] - cr;
+                    const dg = samples[j + 1] - cg;
+                    const db = samples[j + 2] - cb;
+                    const d = dr*dr + dg*dg + db*db;
+                    if (d < nearestDist[x]) nearestDist[x] = d;
+                    total += weights[x] * nearestDist[x];
                 }
+
+                // Fewer distinct colors than k: remaining centroids duplicate
+                if (total > 0) chosen = pickWeighted(weights, nearestDist, total, random);
             }
 
-            return new ImageData(newData, newWidth, newHeight);
+            return centroids;
         }
 
-        function kMeansQuantization(imageData, k, maxIterations = 15) {
-            const data = imageData.data;
+        // Warm start from the previous palette after a color-count change.
+        // Fewer colors keep a spread-out subset (farthest-first from the
+        // first entry); more colors keep every old centroid and add the rest
+        // k-means++ style where the old palette fits worst.
+        function seedFromPalette(samples, weights, k, random, previous) {
+            const n = weights.length;
+            const centroids = new Float32Array(k * 3);
+            const kept = Math.min(k, previous.length);
+
+            const spread = new Float64Array(previous.length).fill(Infinity);
+            let next = 0;
+            for (let i = 0; i < kept; i++) {
+                const [cr, cg, cb] = previous[next];
+                centroids[i * 3]     = cr;
+                centroids[i * 3 + 1] = cg;
+                centroids[i * 3 + 2] = cb;
+                spread[next] = -1;
+
+                let farthest = -1;
+                for (let j = 0; j < previous.length; j++) {
+                    if (spread[j] < 0) continue;
+                    const dr = previous[j][0] - cr;
+                    const dg = previous[j][1] - cg;
+                    const db = previous[j][2] - cb;
+                    spread[j] = Math.min(spread[j], dr*dr + dg*dg + db*db);
+                    if (farthest < 0 || spread[j] > spread[farthest]) farthest = j;
+                }
+                next = farthest;
+            }
+
+            if (kept === k) return centroids;
+
+            const nearestDist = new Float64Array(n).fill(Infinity);
+            let total = 0;
+            for (let x = 0, j = 0; x < n; x++, j += 3) {
+                for (let i = 0; i < kept; i++) {
+                    const dr = samples[j] - centroids[i * 3];
+                    const dg = samples[j + 1] - centroids[i * 3 + 1];
+                    const db = samples[j + 2] - centroids[i * 3 + 2];
+                    const d = dr*dr + dg*dg + db*db;
+                    if (d < nearestDist[x]) nearestDist[x] = d;
+                }
+                total += weights[x] * nearestDist[x];
+            }
+
+            for (let i = kept; i < k; i++) {
+                // Every sample already matched exactly: duplicate the last one
+                const p = total > 0
+                    ? pickWeighted(weights, nearestDist, total, random) * 3
+                    : -1;
+                const cr = p >= 0 ? samples[p] : centroids[(i - 1) * 3];
+                const cg = p >= 0 ? samples[p + 1] : centroids[(i - 1) * 3 + 1];
+                const cb = p >= 0 ? samples[p + 2] : centroids[(i - 1) * 3 + 2];
+                centroids[i * 3]     = cr;
+                centroids[i * 3 + 1] = cg;
+                centroids[i * 3 + 2] = cb;
+
+                total = 0;
+                for (let x = 0, j = 0; x < n; x++, j += 3) {
+                    const dr = samples[j] - cr;
+                    const dg = samples[j + 1] - cg;
+                    const db = samples[j + 2] - cb;
+                    const d = dr*dr + dg*dg + db*db;
+                    if (d < nearestDist[x]) nearestDist[x] = d;
+                    total += weights[x] * nearestDist[x];
+                }
+            }
+
+            return centroids;
+        }
+
+        function pickWeighted(weights, dist, total, random) {
+            let target = random() * total;
+            for (let x = 0; x < weights.length; x++) {
+                target -= dist ? weights[x] * dist[x] : weights[x];
+                if (target < 0) return x;
+            }
+            return weights.length - 1;
+        }
+
+        function sampleStrided(data) {
             const totalPixels = data.length / 4;
 
             // 🚀 GUARANTEED OPTIMIZATION 1: Much more aggressive sampling
             // Sample only what we need - quality loss is minimal with good sampling
             const maxSamples = Math.min(totalPixels, 5000);
             const step = Math.max(1, Math.floor(totalPixels / maxSamples));
-            
-            const pixels = [];
-            for (let i = 0; i < data.length; i += 4 * step) {
-                pixels.push([data[i], data[i + 1], data[i + 2]]);
+
+            const n = Math.ceil(totalPixels / step);
+            const samples = new Uint8Array(n * 3);
+            for (let i = 0, j = 0; i < data.length; i += 4 * step, j += 3) {
+                samples[j]     = data[i];
+                samples[j + 1] = data[i + 1];
+                samples[j + 2] = data[i + 2];
             }
 
-            // Simple random initialization
-            let centroids = [];
-            for (let i = 0; i < k; i++) {
-                const p = pixels[Math.floor(Math.random() * pixels.length)];
-                centroids.push([p[0], p[1], p[2]]);
+            return { samples, weights: new Uint32Array(n).fill(1) };
+        }
+
+        // 🚀 Whole-image color histogram
+        // One pass bins every pixel into a 5-bit-per-channel RGB histogram.
+        // Each occupied bin becomes a sample at the mean color of its pixels,
+        // weighted by their count, so k-means cost depends on the number of
+        // distinct colors rather than the resolution.
+        const HISTOGRAM_BITS = 5;
+
+        function buildColorHistogram(data) {
+            const histogram = createColorHistogram();
+            addToColorHistogram(histogram, data);
+            return summarizeColorHistogram(histogram);
+        }
+
+        // Histograms accumulate, so a tiled run can bin one strip at a time
+        function createColorHistogram() {
+            const binCount = 1 << (3 * HISTOGRAM_BITS);
+            return {
+                counts: new Uint32Array(binCount),
+                sums: new Float64Array(binCount * 3)
+            };
+        }
+
+        function addToColorHistogram(histogram, data) {
+            const shift = 8 - HISTOGRAM_BITS;
+            const { counts, sums } = histogram;
+
+            for (let i = 0; i < data.length; i += 4) {
+                const r = data[i], g = data[i + 1], b = data[i + 2];
+                const bin = ((r >> shift) << (2 * HISTOGRAM_BITS)) |
+                            ((g >> shift) << HISTOGRAM_BITS) |
+                            (b >> shift);
+                counts[bin]++;
+                sums[bin * 3]     += r;
+                sums[bin * 3 + 1] += g;
+                sums[bin * 3 + 2] += b;
+            }
+        }
+
+        function summarizeColorHistogram(histogram) {
+            const { counts, sums } = histogram;
+            const binCount = counts.length;
+
+            let occupied = 0;
+            for (let bin = 0; bin < binCount; bin++) {
+                if (counts[bin] > 0) occupied++;
+            }
+
+            const samples = new Uint8Array(occupied * 3);
+            const weights = new Uint32Array(occupied);
+            for (let bin = 0, j = 0; bin < binCount; bin++) {
+                const count = counts[bin];
+                if (count === 0) continue;
+
+                samples[j * 3]     = Math.round(sums[bin * 3] / count);
+                samples[j * 3 + 1] = Math.round(sums[bin * 3 + 1] / count);
+                samples[j * 3 + 2] = Math.round(sums[bin * 3 + 2] / count);
+                weights[j++] = count;
             }
 
-            // 🚀 GUARANTEED OPTIMIZATION 2: Reduce iterations drastically
-            // K-means converges fast with good sampling
-            const maxIter = Math.min(maxIterations, 8);
+            return { samples, weights };
+        }
+
+        function runLloyd(samples, weights, centroids, k, maxIter, tolerance, paletteSearch) {
+            // Accumulators are reused across iterations
+            const sums = new Float64Array(k * 3);
+            const counts = new Uint32Array(k);
+            const moved = new Float64Array(k);
             let iterations = 0;
 
             for (let iter = 0; iter < maxIter; iter++) {
+                checkCancelled();
                 iterations++;
-                const clusters = Array.from({ length: k }, () => []);
-                const sums = Array.from({ length: k }, () => [0, 0, 0]);
-                const counts = Array(k).fill(0);
+                sums.fill(0);
+                counts.fill(0);
 
                 // 🚀 GUARANTEED OPTIMIZATION 3: Minimize distance calculations
-                // Cache centroid lookups and use simple assignment
-                for (const pixel of pixels) {
-                    let minDist = Infinity;
-                    let closest = 0;
-
-                    for (let i = 0; i < k; i++) {
-                        const c = centroids[i];
-                        const dr = pixel[0] - c[0];
-                        const dg = pixel[1] - c[1];
-                        const db = pixel[2] - c[2];
-                        const d = dr*dr + dg*dg + db*db; // Skip sqrt for comparison
-                        
-                        if (d < minDist) {
-                            minDist = d;
-                            closest = i;
+                // Palette search structure picks linear or pruned by k
+                const nearest = createPaletteSearch(centroids, k, paletteSearch);
+
+                for (let x = 0, j = 0; x < weights.length; x++, j += 3) {
+                    const r = samples[j];
+                    const g = samples[j + 1];
+                    const b = samples[j + 2];
+                    const w = weights[x];
+                    const closest = nearest(r, g, b);
+                    const c = closest * 3;
+
+                    sums[c]     += w * r;
+                    sums[c + 1] += w * g;
+                    sums[c + 2] += w * b;
+                    counts[closest] += w;
+                }
+
+                const shift = updateCentroids(centroids, sums, counts, k, moved);
+                reportKMeansProgress(iter, maxIter);
+
+                if (shift <= tolerance) break;
+            }
+
+            return iterations;
+        }
+
+        // 🚀 Bound-accelerated k-means (Hamerly)
+        // Each sample keeps an upper bound on the distance to its own centroid
+        // and a lower bound on the distance to every other one. While the upper
+        // bound stays below both the lower bound and half the gap to the nearest
+        // other centroid the sample cannot switch clusters, so its distances are
+        // skipped. Assignments, and therefore the palette, match Lloyd exactly.
+        const BOUND_EPSILON = 1e-9;
+
+        function runHamerly(samples, weights, centroids, k, maxIter, tolerance) {
+            const n = samples.length / 3;
+            const assign = new Uint16Array(n);
+            const upper = new Float64Array(n);
+            const lower = new Float64Array(n);
+            const sums = new Float64Array(k * 3);
+            const counts = new Uint32Array(k);
+            const moved = new Float64Array(k);
+            const halfGap = new Float64Array(k);
+            let iterations = 0;
+
+            for (let iter = 0; iter < maxIter; iter++) {
+                checkCancelled();
+                iterations++;
+
+                if (iter === 0) {
+                    for (let x = 0; x < n; x++) {
+                        assignNearestTwo(samples, x, centroids, k, assign, upper, lower);
+                        addSample(samples, weights, x, assign[x], sums, counts, 1);
+                    }
+                } else {
+                    computeHalfGaps(centroids, k, halfGap);
+
+                    for (let x = 0; x < n; x++) {
+                        const a = assign[x];
+                        const bound = Math.max(halfGap[a], lower[x]);
+                        if (upper[x] + BOUND_EPSILON < bound) continue;
+
+                        // Tighten the upper bound before paying for a full scan
+                        const j = x * 3;
+                        const dr = samples[j]     - centroids[a * 3];
+                        const dg = samples[j + 1] - centroids[a * 3 + 1];
+                        const db = samples[j + 2] - centroids[a * 3 + 2];
+                        upper[x] = Math.sqrt(dr*dr + dg*dg + db*db);
+                        if (upper[x] + BOUND_EPSILON < bound) continue;
+
+                        assignNearestTwo(samples, x, centroids, k, assign, upper, lower);
+                        if (assign[x] !== a) {
+                            addSample(samples, weights, x, a, sums, counts, -1);
+                            addSample(samples, weights, x, assign[x], sums, counts, 1);
                         }
                     }
-                    
-                    sums[closest][0] += pixel[0];
-                    sums[closest][1] += pixel[1];
-                    sums[closest][2] += pixel[2];
-                    counts[closest]++;
                 }
 
-                // Update centroids
-                let changed = false;
+                const shift = updateCentroids(centroids, sums, counts, k, moved);
+
+                // Centroid drift loosens every bound
+                let maxMoved = 0, secondMoved = 0, maxIndex = -1;
                 for (let i = 0; i < k; i++) {
-                    if (counts[i] === 0) continue;
-
-                    const newC = [
-                        Math.round(sums[i][0] / counts[i]),
-                        Math.round(sums[i][1] / counts[i]),
-                        Math.round(sums[i][2] / counts[i])
-                    ];
-
-                    if (Math.abs(centroids[i][0] - newC[0]) > 1 ||
-                        Math.abs(centroids[i][1] - newC[1]) > 1 ||
-                        Math.abs(centroids[i][2] - newC[2]) > 1) {
-                        changed = true;
+                    if (moved[i] > maxMoved) {
+                        secondMoved = maxMoved;
+                        maxMoved = moved[i];
+                        maxIndex = i;
+                    } else if (moved[i] > secondMoved) {
+                        secondMoved = moved[i];
                     }
-
-                    centroids[i] = newC;
+                }
+                for (let x = 0; x < n; x++) {
+                    const a = assign[x];
+                    upper[x] += moved[a];
+                    lower[x] -= a === maxIndex ? secondMoved : maxMoved;
                 }
 
-                self.postMessage({
-                    type: 'progress',
-                    progress: 10 + (iter / maxIter) * 60,
-                    text: 'K-means iteration ' + (iter + 1) + '/' + maxIter
-                });
+                reportKMeansProgress(iter, maxIter);
 
-                if (!changed) break;
+                if (shift <= tolerance) break;
             }
 
-            return { palette: centroids, iterations };
+            return iterations;
         }
 
-        function colorDistance(a, b) {
-            const dr = a[0] - b[0];
-            const dg = a[1] - b[1];
-            const db = a[2] - b[2];
-            return dr*dr + dg*dg + db*db; // Return squared distance (skip sqrt)
-        }
+        // 🚀 Mini-batch k-means (Sculley)
+        // Streams randomized batches drawn from the full pixel buffer and moves
+        // each centroid towards its assigned pixels with a per-centroid learning
+        // rate of 1/count. Stops once the smoothed per-batch centroid shift
+        // settles, or when the batch or time budget runs out.
+        const MINIBATCH_SIZE = 1024;
+        const MINIBATCH_INIT_SAMPLES = 4096;
+        const MINIBATCH_MAX_BATCHES = 2000;
+        const MINIBATCH_DEFAULT_BUDGET_MS = 250;
+        const MINIBATCH_TOLERANCE = 0.02;
+        const MINIBATCH_SMOOTHING = 0.1;
 
-        function findNearestColor(color, palette) {
-            let min = Infinity;
-            let nearest = palette[0];
+        function runMiniBatch(data, k, init, random, budgetMs, initialPalette = null) {
+            const start = Date.now();
+            const totalPixels = data.length / 4;
 
-            for (const p of palette) {
-                const dr = color[0] - p[0];
-                const dg = color[1] - p[1];
-                const db = color[2] - p[2];
-                const d = dr*dr + dg*dg + db*db; // Skip sqrt
-                
-                if (d < min) {
-                    min = d;
-                    nearest = p;
-                }
-            }
-            return nearest;
-        }
+            const initCount = Math.min(MINIBATCH_INIT_SAMPLES, totalPixels);
+            const initSamples = drawRandomPixels(data, initCount, random, new Uint8Array(initCount * 3));
+            const initWeights = new Uint32Array(initCount).fill(1);
+            const centroids = initialPalette
+                ? seedFromPalette(initSamples, initWeights, k, random, initialPalette)
+                : init === 'random'
+                    ? seedRandom(initSamples, initWeights, k, random)
+                    : seedKMeansPlusPlus(initSamples, initWeights, k, random);
 
-        function applyPalette(imageData, palette, dithering) {
-            const width = imageData.width;
-            const height = imageData.height;
-            const data = new Uint8ClampedArray(imageData.data);
+            const counts = new Float64Array(k);
+            const previous = new Float32Array(k * 3);
+            const batch = new Uint8Array(MINIBATCH_SIZE * 3);
+            const assign = new Uint16Array(MINIBATCH_SIZE);
+            const nearest = createPaletteSearch(centroids, k, 'linear');
+            const tolerance = MINIBATCH_TOLERANCE * k;
 
-            if (dithering === 'none') {
-                for (let i = 0; i < data.length; i += 4) {
-                    const n = findNearestColor([data[i], data[i+1], data[i+2]], palette);
-                    data[i] = n[0];
-                    data[i+1] = n[1];
-                    data[i+2] = n[2];
+            let smoothedShift = Infinity;
+            let batches = 0;
+            let converged = false;
+
+            while (batches < MINIBATCH_MAX_BATCHES && Date.now() - start < budgetMs) {
+                checkCancelled();
+                drawRandomPixels(data, MINIBATCH_SIZE, random, batch);
+                previous.set(centroids);
+
+                // Assign the whole batch against the same centroids first
+                for (let x = 0, j = 0; x < MINIBATCH_SIZE; x++, j += 3) {
+                    assign[x] = nearest(batch[j], batch[j + 1], batch[j + 2]);
                 }
-            } else {
-                const kernel = getKernel(dithering);
 
-                for (let y = 0; y < height; y++) {
-                    for (let x = 0; x < width; x++) {
-                        const idx = (y * width + x) * 4;
+                for (let x = 0, j = 0; x < MINIBATCH_SIZE; x++, j += 3) {
+                    const i = assign[x];
+                    const c = i * 3;
+                    const rate = 1 / ++counts[i];
+                    centroids[c]     += (batch[j]     - centroids[c])     * rate;
+                    centroids[c + 1] += (batch[j + 1] - centroids[c + 1]) * rate;
+                    centroids[c + 2] += (batch[j + 2] - centroids[c + 2]) * rate;
+                }
 
-                        const oldC = [data[idx], data[idx+1], data[idx+2]];
-                        const newC = findNearestColor(oldC, palette);
+                let shift = 0;
+                for (let c = 0; c < k * 3; c += 3) {
+                    const dr = centroids[c] - previous[c];
+                    const dg = centroids[c + 1] - previous[c + 1];
+                    const db = centroids[c + 2] - previous[c + 2];
+                    shift += Math.sqrt(dr*dr + dg*dg + db*db);
+                }
 
-                        data[idx] = newC[0];
-                        data[idx+1] = newC[1];
-                        data[idx+2] = newC[2];
+                smoothedShift = batches === 0
+                    ? shift
+                    : smoothedShift + MINIBATCH_SMOOTHING * (shift - smoothedShift);
+                batches++;
 
-                        const er = oldC[0] - newC[0];
-                        const eg = oldC[1] - newC[1];
-                        const eb = oldC[2] - newC[2];
+                if (smoothedShift <= tolerance) {
+                    converged = true;
+                    break;
+                }
 
-                        for (const [dx, dy, f] of kernel) {
-                            distributeError(data, width, height, x+dx, y+dy, er, eg, eb, f);
-                        }
-                    }
+                if (batches % 16 === 0) {
+                    postJobMessage({
+                        type: 'progress',
+                        progress: 10 + Math.min(1, (Date.now() - start) / budgetMs) * 60,
+                        text: 'Mini-batch ' + batches + ' (shift ' + smoothedShift.toFixed(2) + ')'
+                    });
                 }
             }
 
-            return new ImageData(data, width, height);
+            return { palette: toPalette(centroids, k), iterations: batches, converged };
         }
 
-        function getKernel(type) {
-            if (type === 'floyd') {
-                return [[1,0,7/16],[-1,1,3/16],[0,1,5/16],[1,1,1/16]];
-            } else if (type === 'jarvis') {
-                return [
-                    [1,0,7/48],[2,0,5/48],
-                    [-2,1,3/48],[-1,1,5/48],[0,1,7/48],[1,1,5/48],[2,1,3/48],
-                    [-2,2,1/48],[-1,2,3/48],[0,2,5/48],[1,2,3/48],[2,2,1/48]
-                ];
+        function drawRandomPixels(data, count, random, out) {
+            const totalPixels = data.length / 4;
+            for (let x = 0, j = 0; x < count; x++, j += 3) {
+                const i = Math.floor(random() * totalPixels) * 4;
+                out[j]     = data[i];
+                out[j + 1] = data[i + 1];
+                out[j + 2] = data[i + 2];
+            }
+            return out;
+        }
+
+        function assignNearestTwo(samples, x, centroids, k, assign, upper, lower) {
+            const j = x * 3;
+            const r = samples[j], g = samples[j + 1], b = samples[j + 2];
+            let best = Infinity, second = Infinity, nearest = 0;
+
+            for (let i = 0; i < k; i++) {
+                const dr = r - centroids[i * 3];
+                const dg = g - centroids[i * 3 + 1];
+                const db = b - centroids[i * 3 + 2];
+                const d = dr*dr + dg*dg + db*db;
+
+                if (d < best) {
+                    second = best;
+                    best = d;
+                    nearest = i;
+                } else if (d < second) {
+                    second = d;
+                }
+            }
+
+            assign[x] = nearest;
+            upper[x] = Math.sqrt(best);
+            lower[x] = Math.sqrt(second);
+        }
+
+        function computeHalfGaps(centroids, k, halfGap) {
+            halfGap.fill(Infinity);
+            for (let i = 0; i < k; i++) {
+                for (let j = i + 1; j < k; j++) {
+                    const dr = centroids[i * 3]     - centroids[j * 3];
+                    const dg = centroids[i * 3 + 1] - centroids[j * 3 + 1];
+                    const db = centroids[i * 3 + 2] - centroids[j * 3 + 2];
+                    const half = Math.sqrt(dr*dr + dg*dg + db*db) / 2;
+                    if (half < halfGap[i]) halfGap[i] = half;
+                    if (half < halfGap[j]) halfGap[j] = half;
+                }
+            }
+        }
+
+        function addSample(samples, weights, x, cluster, sums, counts, sign) {
+            const j = x * 3;
+            const c = cluster * 3;
+            const w = sign * weights[x];
+            sums[c]     += w * samples[j];
+            sums[c + 1] += w * samples[j + 1];
+            sums[c + 2] += w * samples[j + 2];
+            counts[cluster] += w;
+        }
+
+        // Move each centroid to the mean of its cluster; empty clusters stay put.
+        // Records each centroid's shift in moved and returns their total.
+        function updateCentroids(centroids, sums, counts, k, moved) {
+            let total = 0;
+
+            for (let i = 0; i < k; i++) {
+                moved[i] = 0;
+                if (counts[i] === 0) continue;
+
+                const c = i * 3;
+                const nr = Math.round(sums[c] / counts[i]);
+                const ng = Math.round(sums[c + 1] / counts[i]);
+                const nb = Math.round(sums[c + 2] / counts[i]);
+
+                const dr = centroids[c] - nr;
+                const dg = centroids[c + 1] - ng;
+                const db = centroids[c + 2] - nb;
+                moved[i] = Math.sqrt(dr*dr + dg*dg + db*db);
+                total += moved[i];
+
+                centroids[c]     = nr;
+                centroids[c + 1] = ng;
+                centroids[c + 2] = nb;
+            }
+
+            return total;
+        }
+
+        function reportKMeansProgress(iter, maxIter) {
+            postJobMessage({
+                type: 'progress',
+                progress: 10 + (iter / maxIter) * 60,
+                text: 'K-means iteration ' + (iter + 1) + '/' + maxIter
+            });
+        }
+
+        function toPalette(centroids, k) {
+            const palette = [];
+            for (let i = 0; i < k; i++) {
+                palette.push([
+                    Math.round(centroids[i * 3]),
+                    Math.round(centroids[i * 3 + 1]),
+                    Math.round(centroids[i * 3 + 2])
+                ]);
+            }
+            return palette;
+        }
+
+        function colorDistance(a, b) {
+            const dr = a[0] - b[0];
+            const dg = a[1] - b[1];
+            const db = a[2] - b[2];
+            return dr*dr + dg*dg + db*db; // Return squared distance (skip sqrt)
+        }
+
+        // 🚀 Palette search structure
+        // Small palettes use a plain linear scan. Larger ones precompute, for
+        // every entry, the other entries ordered by distance. A query starts
+        // from the previous answer (neighbouring pixels are similar) and walks
+        // that list until the triangle inequality rules out everything left.
+        // Ties resolve to the lowest palette index in both variants.
+        const PRUNED_SEARCH_MIN_K = 16;
+
+        function flattenPalette(palette) {
+            const flat = new Float64Array(palette.length * 3);
+            for (let i = 0; i < palette.length; i++) {
+                flat[i * 3]     = palette[i][0];
+                flat[i * 3 + 1] = palette[i][1];
+                flat[i * 3 + 2] = palette[i][2];
+            }
+            return flat;
+        }
+
+        function createPaletteSearch(centroids, k, mode = 'auto') {
+            const pruned = mode === 'pruned' || (mode === 'auto' && k >= PRUNED_SEARCH_MIN_K);
+
+            if (!pruned) {
+                return function nearestLinear(r, g, b) {
+                    let min = Infinity;
+                    let nearest = 0;
+
+                    for (let i = 0, j = 0; i < k; i++, j += 3) {
+                        const dr = r - centroids[j];
+                        const dg = g - centroids[j + 1];
+                        const db = b - centroids[j + 2];
+                        const d = dr*dr + dg*dg + db*db; // Skip sqrt
+
+                        if (d < min) {
+                            min = d;
+                            nearest = i;
+                        }
+                    }
+                    return nearest;
+                };
+            }
+
+            // Row i lists every entry by increasing distance from entry i
+            const neighbors = new Int32Array(k * k);
+            const neighborDist = new Float64Array(k * k);
+            const row = new Float64Array(k);
+            const order = Array.from({ length: k }, (_, j) => j);
+
+            for (let i = 0; i < k; i++) {
+                for (let j = 0; j < k; j++) {
+                    const dr = centroids[i * 3]     - centroids[j * 3];
+                    const dg = centroids[i * 3 + 1] - centroids[j * 3 + 1];
+                    const db = centroids[i * 3 + 2] - centroids[j * 3 + 2];
+                    row[j] = Math.sqrt(dr*dr + dg*dg + db*db);
+                }
+                order.sort((a, b) => row[a] - row[b] || a - b);
+                for (let j = 0; j < k; j++) {
+                    neighbors[i * k + j] = order[j];
+                    neighborDist[i * k + j] = row[order[j]];
+                }
+            }
+
+            let last = 0;
+
+            return function nearestPruned(r, g, b) {
+                const guess = last;
+                let dr = r - centroids[guess * 3];
+                let dg = g - centroids[guess * 3 + 1];
+                let db = b - centroids[guess * 3 + 2];
+                let min = dr*dr + dg*dg + db*db;
+                let nearest = guess;
+
+                // |q - c| >= |guess - c| - |q - guess|, so once an entry is more
+                // than |q - guess| + best away from the guess it cannot win
+                const toGuess = Math.sqrt(min);
+                let limit = toGuess + toGuess;
+                const base = guess * k;
+
+                for (let j = 1; j < k; j++) {
+                    if (neighborDist[base + j] > limit) break;
+
+                    const i = neighbors[base + j];
+                    dr = r - centroids[i * 3];
+                    dg = g - centroids[i * 3 + 1];
+                    db = b - centroids[i * 3 + 2];
+                    const d = dr*dr + dg*dg + db*db;
+
+                    if (d < min || (d === min && i < nearest)) {
+                        min = d;
+                        nearest = i;
+                        limit = toGuess + Math.sqrt(min);
+                    }
+                }
+
+                last = nearest;
+                return nearest;
+            };
+        }
+
+        // 🚀 RGB → palette index lookup table
+        // 15-bit quantized RGB (5 bits per channel) addresses 8×8×8 color cells.
+        // Cells are resolved lazily on first hit: each keeps only the palette
+        // entries that can be nearest to some color inside it, so most lookups
+        // are a single table hit and cells on a Voronoi boundary fall back to an
+        // exact scan over a handful of candidates.
+        const LUT_BITS = 5;
+        const LUT_SHIFT = 8 - LUT_BITS;
+        const LUT_CELL_RADIUS = Math.sqrt(3) * ((1 << LUT_SHIFT) - 1) / 2;
+
+        function createPaletteLUT(palette) {
+            const k = palette.length;
+            const cellTotal = 1 << (3 * LUT_BITS);
+            const cellStart = new Int32Array(cellTotal).fill(-1);
+            const cellSize = new Uint16Array(cellTotal);
+            const dist = new Float64Array(k);
+            let candidates = new Uint8Array(cellTotal);
+            let used = 0;
+
+            function buildCell(cell) {
+                const half = ((1 << LUT_SHIFT) - 1) / 2;
+                const cr = ((cell >> (2 * LUT_BITS)) << LUT_SHIFT) + half;
+                const cg = (((cell >> LUT_BITS) & ((1 << LUT_BITS) - 1)) << LUT_SHIFT) + half;
+                const cb = ((cell & ((1 << LUT_BITS) - 1)) << LUT_SHIFT) + half;
+
+                let min = Infinity;
+                for (let i = 0; i < k; i++) {
+                    const p = palette[i];
+                    const dr = cr - p[0];
+                    const dg = cg - p[1];
+                    const db = cb - p[2];
+                    dist[i] = Math.sqrt(dr*dr + dg*dg + db*db);
+                    if (dist[i] < min) min = dist[i];
+                }
+
+                // Triangle inequality: an entry farther than min + 2·radius from
+                // the cell center can never win for a color inside the cell
+                const limit = min + 2 * LUT_CELL_RADIUS;
+
+                if (used + k > candidates.length) {
+                    const grown = new Uint8Array(Math.max(candidates.length * 2, used + k));
+                    grown.set(candidates);
+                    candidates = grown;
+                }
+
+                const start = used;
+                for (let i = 0; i < k; i++) {
+                    if (dist[i] <= limit) candidates[used++] = i;
+                }
+
+                cellStart[cell] = start;
+                cellSize[cell] = used - start;
+                return start;
+            }
+
+            return function lookup(r, g, b) {
+                const cell = ((r >> LUT_SHIFT) << (2 * LUT_BITS)) |
+                             ((g >> LUT_SHIFT) << LUT_BITS) |
+                             (b >> LUT_SHIFT);
+
+                let start = cellStart[cell];
+                if (start < 0) start = buildCell(cell);
+
+                const end = start + cellSize[cell];
+                if (end - start === 1) return candidates[start];
+
+                // Exact refinement; candidates are in palette order so ties
+                // resolve exactly like the linear scan
+                let min = Infinity;
+                let nearest = candidates[start];
+                for (let j = start; j < end; j++) {
+                    const i = candidates[j];
+                    const p = palette[i];
+                    const dr = r - p[0];
+                    const dg = g - p[1];
+                    const db = b - p[2];
+                    const d = dr*dr + dg*dg + db*db;
+
+                    if (d < min) {
+                        min = d;
+                        nearest = i;
+                    }
+                }
+                return nearest;
+            };
+        }
+
+        // 🚀 Median-cut quantizer
+        // One histogram pass, then the box holding the most weighted spread
+        // is repeatedly split at the weighted median of its widest channel
+        // until there are k boxes. Each box contributes its mean color.
+        function medianCutQuantization(imageData, k, histogram = buildColorHistogram(imageData.data)) {
+            const { samples, weights } = histogram;
+            const order = new Uint32Array(weights.length);
+            for (let x = 0; x < order.length; x++) order[x] = x;
+
+            const boxes = [describeBox(samples, weights, order, 0, order.length)];
+
+            while (boxes.length < k) {
+                let target = -1;
+                let bestScore = 0;
+                for (let b = 0; b < boxes.length; b++) {
+                    const box = boxes[b];
+                    if (box.end - box.start < 2) continue;
+                    const score = box.range * box.weight;
+                    if (score > bestScore) {
+                        bestScore = score;
+                        target = b;
+                    }
+                }
+                if (target < 0) break;
+
+                const box = boxes[target];
+                const channel = box.channel;
+                const slice = order.subarray(box.start, box.end)
+                    .sort((a, b) => samples[a * 3 + channel] - samples[b * 3 + channel]);
+
+                // Weighted median, keeping at least one bin on each side
+                let acc = 0;
+                let split = box.start + 1;
+                for (let j = 0; j < slice.length - 1; j++) {
+                    acc += weights[slice[j]];
+                    if (acc * 2 >= box.weight) {
+                        split = box.start + j + 1;
+                        break;
+                    }
+                }
+
+                boxes[target] = describeBox(samples, weights, order, box.start, split);
+                boxes.push(describeBox(samples, weights, order, split, box.end));
+            }
+
+            const palette = boxes.map(box => box.color);
+            return { palette, iterations: boxes.length - 1 };
+        }
+
+        function describeBox(samples, weights, order, start, end) {
+            const lo = [255, 255, 255];
+            const hi = [0, 0, 0];
+            const sum = [0, 0, 0];
+            let weight = 0;
+
+            for (let j = start; j < end; j++) {
+                const x = order[j];
+                const w = weights[x];
+                for (let c = 0; c < 3; c++) {
+                    const v = samples[x * 3 + c];
+                    if (v < lo[c]) lo[c] = v;
+                    if (v > hi[c]) hi[c] = v;
+                    sum[c] += w * v;
+                }
+                weight += w;
+            }
+
+            let channel = 0;
+            for (let c = 1; c < 3; c++) {
+                if (hi[c] - lo[c] > hi[channel] - lo[channel]) channel = c;
+            }
+
+            return {
+                start, end, weight, channel,
+                range: hi[channel] - lo[channel],
+                color: sum.map(v => Math.round(v / weight))
+            };
+        }
+
+        // 🚀 Octree quantizer
+        // Histogram bins are inserted into an 8-level RGB octree in one pass.
+        // The deepest, least populated branches are then folded into their
+        // parents until at most k leaves remain; leaves give the palette.
+        const OCTREE_DEPTH = 8;
+
+        function octreeQuantization(imageData, k, histogram = buildColorHistogram(imageData.data)) {
+            const { samples, weights } = histogram;
+            const root = createOctreeNode();
+            const levels = Array.from({ length: OCTREE_DEPTH }, () => []);
+            let leafCount = 0;
+
+            for (let x = 0; x < weights.length; x++) {
+                const r = samples[x * 3], g = samples[x * 3 + 1], b = samples[x * 3 + 2];
+                const w = weights[x];
+                let node = root;
+
+                for (let level = 0; level < OCTREE_DEPTH; level++) {
+                    const bit = 7 - level;
+                    const child = (((r >> bit) & 1) << 2) | (((g >> bit) & 1) << 1) | ((b >> bit) & 1);
+                    if (!node.children[child]) {
+                        node.children[child] = createOctreeNode();
+                        if (level + 1 === OCTREE_DEPTH) leafCount++;
+                        else levels[level + 1].push(node.children[child]);
+                    }
+                    node = node.children[child];
+                }
+
+                node.count += w;
+                node.r += w * r;
+                node.g += w * g;
+                node.b += w * b;
+            }
+
+            // Fold the deepest level first, least populated branches first
+            let passes = 0;
+            for (let level = OCTREE_DEPTH - 1; level > 0 && leafCount > k; level--) {
+                passes++;
+                const nodes = levels[level];
+                for (const node of nodes) accumulateOctreeNode(node);
+                nodes.sort((a, b) => a.count - b.count);
+
+                for (const node of nodes) {
+                    if (leafCount <= k) break;
+                    let children = 0;
+                    for (let c = 0; c < 8; c++) {
+                        if (node.children[c]) children++;
+                    }
+                    node.children.fill(null);
+                    leafCount -= children - 1;
+                }
+            }
+
+            // Folding stops at the root's children, so k < 8 keeps the
+            // most populated leaves
+            const leaves = [];
+            collectOctreeLeaves(root, leaves);
+            leaves.sort((a, b) => b.count - a.count);
+
+            const palette = leaves.slice(0, k).map(leaf => [
+                Math.round(leaf.r / leaf.count),
+                Math.round(leaf.g / leaf.count),
+                Math.round(leaf.b / leaf.count)
+            ]);
+            return { palette, iterations: Math.max(1, passes) };
+        }
+
+        function createOctreeNode() {
+            return { children: new Array(8).fill(null), count: 0, r: 0, g: 0, b: 0 };
+        }
+
+        function accumulateOctreeNode(node) {
+            node.count = node.r = node.g = node.b = 0;
+            for (const child of node.children) {
+                if (!child) continue;
+                node.count += child.count;
+                node.r += child.r;
+                node.g += child.g;
+                node.b += child.b;
+            }
+        }
+
+        function collectOctreeLeaves(node, leaves) {
+            let isLeaf = true;
+            for (const child of node.children) {
+                if (!child) continue;
+                isLeaf = false;
+                collectOctreeLeaves(child, leaves);
+            }
+            if (isLeaf && node.count > 0) leaves.push(node);
+        }
+
+        // Palette fit quality: PSNR (dB) of every pixel against its nearest
+        // palette color, independent of the dithering applied afterwards
+        function measurePalettePSNR(imageData, palette) {
+            const data = imageData.data;
+            const sum = sumPaletteError(data, palette, createPaletteLUT(palette));
+            return paletteErrorToPSNR(sum, data.length / 4);
+        }
+
+        // Summed squared error, so tiled runs can accumulate it per strip
+        function sumPaletteError(data, palette, lookup) {
+            let sum = 0;
+            for (let i = 0; i < data.length; i += 4) {
+                const p = palette[lookup(data[i], data[i + 1], data[i + 2])];
+                const dr = data[i] - p[0];
+                const dg = data[i + 1] - p[1];
+                const db = data[i + 2] - p[2];
+                sum += dr*dr + dg*dg + db*db;
+            }
+            return sum;
+        }
+
+        function paletteErrorToPSNR(sum, pixels) {
+            const mse = sum / (pixels * 3);
+            return mse > 0 ? 10 * Math.log10(255 * 255 / mse) : 99;
+        }
+
+        // When indices is given, each pixel's palette index is also written
+        // there; with dithering 'none' the RGBA data is then left untouched.
+        function applyPalette(imageData, palette, dithering, paletteLookup = 'lut', paletteSearch = 'auto', inPlace = false, indices = null) {
+            const width = imageData.width;
+            const height = imageData.height;
+            const data = inPlace ? imageData.data : new Uint8ClampedArray(imageData.data);
+            const lookup = createLookup(palette, paletteLookup, paletteSearch);
+
+            const kernel = getKernel(dithering);
+            const pattern = isOrderedDither(dithering) ? createOrderedPattern(dithering, palette) : null;
+            const errors = kernel ? createErrorRows(width, kernel) : null;
+
+            mapRows(data, indices, width, height, 0, palette, lookup, kernel, pattern, errors);
+
+            return inPlace ? imageData : new ImageData(data, width, height);
+        }
+
+        // Map a whole image, or one strip of it starting at row originY.
+        // Ordered thresholds and the diffusion error ring are indexed by
+        // the global row, so consecutive strips continue seamlessly. Rows go
+        // in bands of CANCEL_CHECK_ROWS with a cancellation check before each.
+        function mapRows(data, indices, width, height, originY, palette, lookup, kernel, pattern, errors) {
+            if (kernel) errors.origin = originY;
+
+            for (let rowStart = 0; rowStart < height; rowStart += CANCEL_CHECK_ROWS) {
+                checkCancelled();
+                const rowEnd = Math.min(height, rowStart + CANCEL_CHECK_ROWS);
+                if (pattern) {
+                    ditherOrderedRows(data, indices, width, rowStart, rowEnd, palette, lookup, pattern, originY);
+                } else if (!kernel) {
+                    mapPixels(data, indices, rowStart * width * 4, rowEnd * width * 4, palette, lookup);
+                } else {
+                    for (let y = rowStart; y < rowEnd; y++) {
+                        diffuseRow(data, indices, errors, width, y, 0, width, palette, lookup, kernel);
+                    }
+                }
+            }
+        }
+
+        // 🚀 Fixed-point error diffusion
+        // Error lives in a ring of depth + 1 padded Int16 rows (RGB
+        // interleaved) rather than in the pixel data. Taps add error * weight
+        // as integers, so nothing is clamped or rounded until a pixel is
+        // read: value = clamp(source + round(sum / divisor)). The padding is
+        // the kernel's reach on each side, so taps need no bounds checks;
+        // taps past the last row land in ring rows that are never read again.
+        // |sum| <= 255 * divisor, which fits Int16 for every kernel.
+        function createErrorRows(width, kernel, shared = null) {
+            const pad = kernel.reach;
+            const stride = (width + 2 * pad) * 3;
+            const rows = kernel.depth + 1;
+            return {
+                pad, stride, rows,
+                // Global row of local row 0 (see mapRows)
+                origin: 0,
+                buffer: shared ? new Int16Array(shared) : new Int16Array(stride * rows)
+            };
+        }
+
+        function errorRowsByteLength(width, kernel) {
+            return (width + 2 * kernel.reach) * 3 * (kernel.depth + 1) * 2;
+        }
+
+        // Quantize pixels [x0, x1) of row y, pushing each pixel's error onto
+        // its not-yet-visited neighbours
+        function diffuseRow(data, indices, errors, width, y, x0, x1, palette, lookup, kernel) {
+            const { buffer, stride, rows, pad, origin } = errors;
+            const { dxs, dys, weights, recip, offsets } = kernel;
+            const taps = weights.length;
+            const ring = origin + y;
+
+            for (let t = 0; t < taps; t++) {
+                offsets[t] = ((ring + dys[t]) % rows) * stride + (pad + dxs[t]) * 3;
+            }
+            const own = (ring % rows) * stride + pad * 3;
+
+            for (let x = x0; x < x1; x++) {
+                const idx = (y * width + x) * 4;
+                const e = own + x * 3;
+
+                // Q16 reciprocal, rounded: (sum * 65536 / divisor + 0.5) >> 16
+                let r = data[idx] + ((buffer[e] * recip + 32768) >> 16);
+                let g = data[idx+1] + ((buffer[e+1] * recip + 32768) >> 16);
+                let b = data[idx+2] + ((buffer[e+2] * recip + 32768) >> 16);
+                r = r < 0 ? 0 : r > 255 ? 255 : r;
+                g = g < 0 ? 0 : g > 255 ? 255 : g;
+                b = b < 0 ? 0 : b > 255 ? 255 : b;
+                buffer[e] = buffer[e+1] = buffer[e+2] = 0;
+
+                const index = lookup(r, g, b);
+                const newC = palette[index];
+                if (indices) indices[y * width + x] = index;
+
+                data[idx] = newC[0];
+                data[idx+1] = newC[1];
+                data[idx+2] = newC[2];
+
+                const er = r - newC[0];
+                const eg = g - newC[1];
+                const eb = b - newC[2];
+
+                const column = x * 3;
+                for (let t = 0; t < taps; t++) {
+                    const o = offsets[t] + column;
+                    const w = weights[t];
+                    buffer[o] += er * w;
+                    buffer[o+1] += eg * w;
+                    buffer[o+2] += eb * w;
+                }
+            }
+        }
+
+        function createLookup(palette, paletteLookup, paletteSearch) {
+            return paletteLookup === 'direct'
+                ? createPaletteSearch(flattenPalette(palette), palette.length, paletteSearch)
+                : createPaletteLUT(palette);
+        }
+
+        // Map data[start, end) (byte offsets) to the palette, writing either
+        // indices or RGBA
+        function mapPixels(data, indices, start, end, palette, lookup) {
+            for (let i = start; i < end; i += 4) {
+                const index = lookup(data[i], data[i+1], data[i+2]);
+                if (indices) {
+                    indices[i >> 2] = index;
+                    continue;
+                }
+                const n = palette[index];
+                data[i] = n[0];
+                data[i+1] = n[1];
+                data[i+2] = n[2];
+            }
+        }
+
+        // 🚀 Parallel palette application over a SharedArrayBuffer
+        // The pixels are copied into shared memory and helper tasks are
+        // spawned on other pool workers. Every participant, this worker
+        // included, claims work from a shared counter until none is left. A
+        // helper that starts late simply finds nothing to do, so this worker
+        // never waits on work nobody has claimed.
+        //
+        // Without dithering, or with ordered dithering, the work units are
+        // independent row bands. With error diffusion they are single rows
+        // processed as a wavefront: see diffuseClaimedRows.
+        const BANDS_PER_WORKER = 4;
+        const WAVEFRONT_STEP = 64;
+        // A worker that stops on cancellation leaves its claimed rows
+        // unfinished, so waits on other workers' progress time out this
+        // often to look at the flag again
+        const CANCEL_POLL_MS = 20;
+
+        function canShareMemory() {
+            return typeof SharedArrayBuffer !== 'undefined' && self.crossOriginIsolated === true;
+        }
+
+        function resolveWorkerCount(workers) {
+            if (workers === 'auto') {
+                return Math.max(1, (self.navigator && self.navigator.hardwareConcurrency) || 1);
+            }
+            return Math.max(1, workers | 0);
+        }
+
+        function canRunParallel(dithering) {
+            return dithering === 'none' || isOrderedDither(dithering) || getKernel(dithering) !== null;
+        }
+
+        function applyPaletteParallel(imageData, palette, dithering, paletteLookup, paletteSearch, indices, workers) {
+            const { width, height } = imageData;
+            const pixels = new SharedArrayBuffer(imageData.data.length);
+            const data = new Uint8ClampedArray(pixels);
+            data.set(imageData.data);
+
+            const sharedIndices = indices ? new SharedArrayBuffer(indices.length) : null;
+            // control[0] = next unclaimed unit, control[1] = finished units
+            const control = new SharedArrayBuffer(8);
+
+            const task = {
+                pixels, indices: sharedIndices, control,
+                width, height, palette, paletteLookup, paletteSearch
+            };
+            let units;
+            if (dithering === 'none' || isOrderedDither(dithering)) {
+                task.task = 'mapBands';
+                task.pattern = isOrderedDither(dithering) ? createOrderedPattern(dithering, palette) : null;
+                task.bandRows = Math.max(1, Math.ceil(height / (workers * BANDS_PER_WORKER)));
+                units = Math.ceil(height / task.bandRows);
+            } else {
+                task.task = 'diffuseRows';
+                task.dithering = dithering;
+                // progress[y] = pixels of row y already diffused
+                task.progress = new SharedArrayBuffer(height * 4);
+                task.errors = new SharedArrayBuffer(errorRowsByteLength(width, getKernel(dithering)));
+                units = height;
+            }
+
+            postJobMessage({ type: 'spawn', tasks: new Array(workers - 1).fill(task) });
+            runSharedTask(task);
+
+            const counters = new Int32Array(control);
+            let done;
+            while ((done = Atomics.load(counters, 1)) < units) {
+                Atomics.wait(counters, 1, done, CANCEL_POLL_MS);
+                checkCancelled();
+            }
+
+            if (indices) {
+                indices.set(new Uint8Array(sharedIndices));
+            }
+            if (!indices || task.task === 'diffuseRows') {
+                imageData.data.set(data);
+            }
+            return imageData;
+        }
+
+        // Entry point for this worker and for spawned helpers alike
+        function runSharedTask(task) {
+            const { width, height, palette } = task;
+            const data = new Uint8ClampedArray(task.pixels);
+            const indices = task.indices ? new Uint8Array(task.indices) : null;
+            const counters = new Int32Array(task.control);
+            const lookup = createLookup(palette, task.paletteLookup, task.paletteSearch);
+
+            if (task.task === 'diffuseRows') {
+                const kernel = getKernel(task.dithering);
+                diffuseClaimedRows(
+                    data, indices, counters, new Int32Array(task.progress),
+                    createErrorRows(width, kernel, task.errors),
+                    width, height, palette, lookup, kernel
+                );
+            } else {
+                mapClaimedBands(data, indices, counters, width, height, task.bandRows, palette, lookup, task.pattern);
+            }
+        }
+
+        function mapClaimedBands(data, indices, counters, width, height, bandRows, palette, lookup, pattern) {
+            const bandCount = Math.ceil(height / bandRows);
+
+            for (;;) {
+                checkCancelled();
+                const band = Atomics.add(counters, 0, 1);
+                if (band >= bandCount) break;
+
+                const rowStart = band * bandRows;
+                const rowEnd = Math.min(height, rowStart + bandRows);
+                if (pattern) {
+                    ditherOrderedRows(data, indices, width, rowStart, rowEnd, palette, lookup, pattern);
+                } else {
+                    mapPixels(data, indices, rowStart * width * 4, rowEnd * width * 4, palette, lookup);
+                }
+
+                Atomics.add(counters, 1, 1);
+                Atomics.notify(counters, 1);
+            }
+        }
+
+        // Wavefront error diffusion. Rows are claimed in order and pixel x of
+        // row y is only processed once row y-1 has finished x + 2R + 1 pixels,
+        // where R is the kernel's horizontal reach. By then every tap that
+        // feeds pixel x has landed, and the rows above are writing error at
+        // least R + 1 columns beyond anything row y touches, so no two
+        // workers update the same error cell at once. The shared error ring
+        // is safe to reuse for the same reason: row y has read and cleared a
+        // column before row y+1 can write into it for row y + depth + 1.
+        // Integer error sums make the output bit-identical to applyPalette.
+        function diffuseClaimedRows(data, indices, counters, progress, errors, width, height, palette, lookup, kernel) {
+            const lag = 2 * kernel.reach + 1;
+
+            for (;;) {
+                checkCancelled();
+                const y = Atomics.add(counters, 0, 1);
+                if (y >= height) break;
+
+                for (let x0 = 0; x0 < width; x0 += WAVEFRONT_STEP) {
+                    const x1 = Math.min(width, x0 + WAVEFRONT_STEP);
+
+                    if (y > 0) {
+                        const needed = Math.min(width, x1 - 1 + lag);
+                        let done;
+                        while ((done = Atomics.load(progress, y - 1)) < needed) {
+                            Atomics.wait(progress, y - 1, done, CANCEL_POLL_MS);
+                            checkCancelled();
+                        }
+                    }
+
+                    diffuseRow(data, indices, errors, width, y, x0, x1, palette, lookup, kernel);
+
+                    Atomics.store(progress, y, x1);
+                    Atomics.notify(progress, y);
+                }
+
+                Atomics.add(counters, 1, 1);
+                Atomics.notify(counters, 1);
+            }
+        }
+
+        // 🚀 Ordered dithering
+        // A tiled threshold matrix offsets each pixel before the palette
+        // lookup. No state flows between pixels, so it maps like 'none'
+        // (including the parallel row bands) at nearly the same cost.
+        // 'ordered' tiles an 8x8 Bayer matrix; 'bluenoise' tiles a 64x64
+        // void-and-cluster matrix, which avoids Bayer's cross-hatch texture.
+        const BAYER_SIZE = 8;
+        const BLUE_NOISE_SIZE = 64;
+        const BLUE_NOISE_SEED = 0x2545f491;
+        const thresholdMatrices = {};
+
+        function isOrderedDither(dithering) {
+            return dithering === 'ordered' || dithering === 'bluenoise';
+        }
+
+        // Thresholds in [-0.5, 0.5), one per matrix cell (row-major)
+        function getThresholdMatrix(dithering) {
+            if (!thresholdMatrices[dithering]) {
+                const ranks = dithering === 'bluenoise'
+                    ? createBlueNoiseRanks(BLUE_NOISE_SIZE)
+                    : createBayerRanks(BAYER_SIZE);
+                const n = ranks.length;
+                const thresholds = new Float32Array(n);
+                for (let i = 0; i < n; i++) {
+                    thresholds[i] = (ranks[i] + 0.5) / n - 0.5;
+                }
+                thresholdMatrices[dithering] = {
+                    size: Math.round(Math.sqrt(n)),
+                    thresholds
+                };
+            }
+            return thresholdMatrices[dithering];
+        }
+
+        // Recursive Bayer construction: M(2n) = [[4M, 4M+2], [4M+3, 4M+1]]
+        function createBayerRanks(size) {
+            let ranks = new Uint16Array([0]);
+            for (let n = 1; n < size; n *= 2) {
+                const next = new Uint16Array(4 * n * n);
+                for (let y = 0; y < n; y++) {
+                    for (let x = 0; x < n; x++) {
+                        const v = 4 * ranks[y * n + x];
+                        next[y * 2 * n + x] = v;
+                        next[y * 2 * n + x + n] = v + 2;
+                        next[(y + n) * 2 * n + x] = v + 3;
+                        next[(y + n) * 2 * n + x + n] = v + 1;
+                    }
+                }
+                ranks = next;
+            }
+            return ranks;
+        }
+
+        // Void-and-cluster (Ulichney): points are ranked by repeatedly
+        // removing the tightest cluster and filling the largest void of a
+        // Gaussian-filtered toroidal pattern. Seeded, so every worker builds
+        // the same matrix.
+        function createBlueNoiseRanks(size) {
+            const n = size * size;
+            const sigma = 1.5;
+            const radius = 4;
+            const pattern = new Uint8Array(n);
+            const energy = new Float64Array(n);
+            const ranks = new Uint16Array(n);
+            const random = createRandom(BLUE_NOISE_SEED);
+
+            const weights = [];
+            for (let dy = -radius; dy <= radius; dy++) {
+                for (let dx = -radius; dx <= radius; dx++) {
+                    weights.push([dx, dy, Math.exp(-(dx * dx + dy * dy) / (2 * sigma * sigma))]);
+                }
+            }
+
+            function toggle(p, sign) {
+                pattern[p] = sign > 0 ? 1 : 0;
+                const px = p % size;
+                const py = (p - px) / size;
+                for (const [dx, dy, w] of weights) {
+                    const q = ((py + dy + size) % size) * size + (px + dx + size) % size;
+                    energy[q] += sign * w;
+                }
+            }
+
+            function tightestCluster() {
+                let best = -1;
+                for (let p = 0; p < n; p++) {
+                    if (pattern[p] && (best < 0 || energy[p] > energy[best])) best = p;
+                }
+                return best;
+            }
+
+            function largestVoid() {
+                let best = -1;
+                for (let p = 0; p < n; p++) {
+                    if (!pattern[p] && (best < 0 || energy[p] < energy[best])) best = p;
+                }
+                return best;
+            }
+
+            // Initial pattern: ~10% random points, relaxed until moving the
+            // tightest cluster point no longer changes anything
+            const initialOnes = Math.floor(n / 10);
+            for (let ones = 0; ones < initialOnes;) {
+                const p = Math.floor(random() * n);
+                if (pattern[p]) continue;
+                toggle(p, 1);
+                ones++;
+            }
+            for (let iter = 0; iter < n; iter++) {
+                const cluster = tightestCluster();
+                toggle(cluster, -1);
+                const gap = largestVoid();
+                toggle(gap, 1);
+                if (gap === cluster) break;
+            }
+
+            const prototype = pattern.slice();
+            const prototypeEnergy = energy.slice();
+
+            for (let rank = initialOnes - 1; rank >= 0; rank--) {
+                const cluster = tightestCluster();
+                toggle(cluster, -1);
+                ranks[cluster] = rank;
+            }
+
+            pattern.set(prototype);
+            energy.set(prototypeEnergy);
+            for (let rank = initialOnes; rank < n; rank++) {
+                const gap = largestVoid();
+                toggle(gap, 1);
+                ranks[gap] = rank;
+            }
+
+            return ranks;
+        }
+
+        // Threshold offsets scaled to the palette's typical color gap (mean
+        // distance from each entry to its nearest neighbour). The offset is
+        // added to all three channels, moving the color sqrt(3) times as far,
+        // hence the division.
+        function createOrderedPattern(dithering, palette) {
+            const { size, thresholds } = getThresholdMatrix(dithering);
+
+            let gapSum = 0;
+            for (let i = 0; i < palette.length; i++) {
+                let nearest = Infinity;
+                for (let j = 0; j < palette.length; j++) {
+                    if (i === j) continue;
+                    const dr = palette[i][0] - palette[j][0];
+                    const dg = palette[i][1] - palette[j][1];
+                    const db = palette[i][2] - palette[j][2];
+                    nearest = Math.min(nearest, dr * dr + dg * dg + db * db);
+                }
+                if (nearest !== Infinity) gapSum += Math.sqrt(nearest);
+            }
+            const spread = palette.length > 1 ? gapSum / palette.length / Math.sqrt(3) : 0;
+
+            const offsets = new Int16Array(thresholds.length);
+            for (let i = 0; i < thresholds.length; i++) {
+                offsets[i] = Math.round(thresholds[i] * spread);
+            }
+            return { size, offsets };
+        }
+
+        function ditherOrderedRows(data, indices, width, rowStart, rowEnd, palette, lookup, pattern, originY = 0) {
+            const { size, offsets } = pattern;
+            const mask = size - 1;
+
+            for (let y = rowStart; y < rowEnd; y++) {
+                const row = ((y + originY) & mask) * size;
+                for (let x = 0; x < width; x++) {
+                    const p = y * width + x;
+                    const i = p * 4;
+                    const t = offsets[row + (x & mask)];
+
+                    let r = data[i] + t;
+                    let g = data[i+1] + t;
+                    let b = data[i+2] + t;
+                    r = r < 0 ? 0 : r > 255 ? 255 : r;
+                    g = g < 0 ? 0 : g > 255 ? 255 : g;
+                    b = b < 0 ? 0 : b > 255 ? 255 : b;
+
+                    const index = lookup(r, g, b);
+                    if (indices) {
+                        indices[p] = index;
+                        continue;
+                    }
+                    const n = palette[index];
+                    data[i] = n[0];
+                    data[i+1] = n[1];
+                    data[i+2] = n[2];
+                }
+            }
+        }
+
+        // Integer kernel weights over a common divisor: [dx, dy, weight]
+        function getKernel(type) {
+            if (type === 'floyd') {
+                return createKernel(16, [[1,0,7],[-1,1,3],[0,1,5],[1,1,1]]);
+            } else if (type === 'jarvis') {
+                return createKernel(48, [
+                    [1,0,7],[2,0,5],
+                    [-2,1,3],[-1,1,5],[0,1,7],[1,1,5],[2,1,3],
+                    [-2,2,1],[-1,2,3],[0,2,5],[1,2,3],[2,2,1]
+                ]);
+            } else if (type === 'atkinson') {
+                // Spreads 6/8 of the error; the rest is dropped, which keeps
+                // contrast high in highlights and shadows
+                return createKernel(8, [
+                    [1,0,1],[2,0,1],
+                    [-1,1,1],[0,1,1],[1,1,1],
+                    [0,2,1]
+                ]);
             } else if (type === 'stucki') {
-                return [
-                    [1,0,8/42],[2,0,4/42],
-                    [-2,1,2/42],[-1,1,4/42],[0,1,8/42],[1,1,4/42],[2,1,2/42],
-                    [-2,2,1/42],[-1,2,2/42],[0,2,4/42],[1,2,2/42],[2,2,1/42]
-                ];
+                return createKernel(42, [
+                    [1,0,8],[2,0,4],
+                    [-2,1,2],[-1,1,4],[0,1,8],[1,1,4],[2,1,2],
+                    [-2,2,1],[-1,2,2],[0,2,4],[1,2,2],[2,2,1]
+                ]);
             }
-            return [];
+            return null;
         }
 
-        function distributeError(data, width, height, x, y, er, eg, eb, f) {
-            if (x < 0 || x >= width || y < 0 || y >= height) return;
-            const idx = (y * width + x) * 4;
-            data[idx]     = clamp(data[idx]     + er * f);
-            data[idx + 1] = clamp(data[idx + 1] + eg * f);
-            data[idx + 2] = clamp(data[idx + 2] + eb * f);
+        function createKernel(divisor, taps) {
+            return {
+                divisor,
+                recip: Math.round(65536 / divisor),
+                dxs: Int32Array.from(taps, tap => tap[0]),
+                dys: Int32Array.from(taps, tap => tap[1]),
+                weights: Int32Array.from(taps, tap => tap[2]),
+                reach: Math.max(...taps.map(tap => Math.abs(tap[0]))),
+                depth: Math.max(...taps.map(tap => tap[1])),
+                // Per-row scratch: ring offset of each tap
+                offsets: new Int32Array(taps.length)
+            };
         }
 
-        function clamp(v) {
-            return Math.max(0, Math.min(255, Math.round(v)));
+        // 🚀 Streaming image export
+        // Scaled exports are expanded row by row while they are encoded, so
+        // an 8x export of a 4K result never exists as a canvas or a buffer.
+        // Every requested scale is encoded in the same pass over the rows.
+        //
+        // Formats: 'png' (truecolor), 'indexed' (PNG with a PLTE chunk at 1,
+        // 2, 4 or 8 bits per pixel) and 'gif'. A job with an index buffer
+        // is expanded through its palette for every format; otherwise the
+        // result bitmap is read back and, for the indexed formats, pixels
+        // are matched back to their palette entries.
+        const PNG_SIGNATURE = new Uint8Array([137, 80, 78, 71, 13, 10, 26, 10]);
+        const PNG_FILTER_NONE = 0;
+        const PNG_FILTER_SUB = 1;
+        const PNG_FILTER_UP = 2;
+        const IDAT_CHUNK_BYTES = 1 << 16;
+
+        async function exportImages(job) {
+            const {
+                source, indices, palette, width, height,
+                exportWidth, exportHeight, exportScales, exportFormat = 'png'
+            } = job;
+            const start = Date.now();
+            const indexed = exportFormat !== 'png';
+            const pixels = indices ? null : readSourceImage(source, width, height).data;
+            if (source && !pixels) source.close();
+
+            // Nearest source column of each base column (pixel centres)
+            const sourceX = new Int32Array(exportWidth);
+            for (let x = 0; x < exportWidth; x++) {
+                sourceX[x] = Math.floor((x + 0.5) * width / exportWidth);
+            }
+
+            const encoders = exportScales.map(scale => exportFormat === 'gif'
+                ? createGIFEncoder(exportWidth, exportHeight, scale, palette)
+                : createPNGEncoder(exportWidth, exportHeight, scale, indexed ? palette : null));
+            const baseRow = new Uint8Array(exportWidth * (indexed ? 1 : 3));
+            const matchColor = indexed && !indices ? createColorMatcher(palette) : null;
+
+            for (let y = 0; y < exportHeight; y++) {
+                const sy = Math.floor((y + 0.5) * height / exportHeight);
+
+                if (!indexed && indices) {
+                    for (let x = 0, o = 0; x < exportWidth; x++, o += 3) {
+                        const color = palette[indices[sy * width + sourceX[x]]];
+                        baseRow[o] = color[0];
+                        baseRow[o + 1] = color[1];
+                        baseRow[o + 2] = color[2];
+                    }
+                } else if (!indexed) {
+                    for (let x = 0, o = 0; x < exportWidth; x++, o += 3) {
+                        const i = (sy * width + sourceX[x]) * 4;
+                        baseRow[o] = pixels[i];
+                        baseRow[o + 1] = pixels[i + 1];
+                        baseRow[o + 2] = pixels[i + 2];
+                    }
+                } else if (indices) {
+                    for (let x = 0; x < exportWidth; x++) {
+                        baseRow[x] = indices[sy * width + sourceX[x]];
+                    }
+                } else {
+                    for (let x = 0; x < exportWidth; x++) {
+                        const i = (sy * width + sourceX[x]) * 4;
+                        baseRow[x] = matchColor(pixels[i], pixels[i + 1], pixels[i + 2]);
+                    }
+                }
+
+                for (const encoder of encoders) {
+                    await encoder.writeRow(baseRow);
+                }
+            }
+
+            const files = [];
+            for (const encoder of encoders) {
+                files.push({
+                    scale: encoder.scale,
+                    width: encoder.width,
+                    height: encoder.height,
+                    blob: await encoder.finish()
+                });
+            }
+
+            postJobMessage({ type: 'complete', files, exportTime: Date.now() - start });
+        }
+
+        // Results only contain palette colors; anything else (which would be
+        // a bug upstream) falls back to the nearest entry
+        function createColorMatcher(palette) {
+            const known = new Map();
+            palette.forEach((color, i) => {
+                const key = (color[0] << 16) | (color[1] << 8) | color[2];
+                if (!known.has(key)) known.set(key, i);
+            });
+
+            return function matchColor(r, g, b) {
+                const key = (r << 16) | (g << 8) | b;
+                let index = known.get(key);
+                if (index === undefined) {
+                    index = 0;
+                    for (let i = 1; i < palette.length; i++) {
+                        if (colorDistance([r, g, b], palette[i]) < colorDistance([r, g, b], palette[index])) index = i;
+                    }
+                    known.set(key, index);
+                }
+                return index;
+            };
+        }
+
+        // With a palette: color type 3 at the smallest bit depth that holds
+        // it, rows unfiltered. Without: 8-bit truecolor, no alpha (results
+        // are always opaque), and the first copy of each row uses the Sub
+        // filter so repeated pixels become zeros. The scale - 1 copies that
+        // follow use Up and are all zeros either way.
+        function createPNGEncoder(baseWidth, baseHeight, scale, palette = null) {
+            const width = baseWidth * scale;
+            const height = baseHeight * scale;
+            const bitDepth = palette ? getIndexBitDepth(palette.length) : 8;
+            const rowBytes = Math.ceil(width * (palette ? bitDepth : 24) / 8) + 1;
+
+            const header = new Uint8Array(13);
+            const view = new DataView(header.buffer);
+            view.setUint32(0, width);
+            view.setUint32(4, height);
+            header[8] = bitDepth;
+            header[9] = palette ? 3 : 2;
+
+            const parts = [PNG_SIGNATURE, createPNGChunk('IHDR', header)];
+            if (palette) {
+                const entries = new Uint8Array(palette.length * 3);
+                palette.forEach((color, i) => entries.set(color, i * 3));
+                parts.push(createPNGChunk('PLTE', entries));
+            }
+
+            let repeat = null;
+            if (scale > 1) {
+                repeat = new Uint8Array(rowBytes * (scale - 1));
+                for (let r = 0; r < scale - 1; r++) repeat[r * rowBytes] = PNG_FILTER_UP;
+            }
+
+            const stream = new CompressionStream('deflate');
+            const writer = stream.writable.getWriter();
+            const collected = collectPNGData(stream.readable, parts);
+
+            return {
+                scale, width, height,
+
+                // The stream may still hold earlier rows: every write gets a
+                // fresh buffer (the repeat rows are shared but never change)
+                async writeRow(baseRow) {
+                    await writer.ready;
+                    writer.write(palette
+                        ? packIndexedRow(baseRow, scale, bitDepth, rowBytes)
+                        : expandPNGRow(baseRow, scale));
+                    if (repeat) writer.write(repeat);
+                },
+
+                async finish() {
+                    await writer.close();
+                    await collected;
+                    parts.push(createPNGChunk('IEND', new Uint8Array(0)));
+                    return new Blob(parts, { type: 'image/png' });
+                }
+            };
+        }
+
+        function getIndexBitDepth(colors) {
+            return colors <= 2 ? 1 : colors <= 4 ? 2 : colors <= 16 ? 4 : 8;
+        }
+
+        // Sub-filtered row: only the first copy of each pixel is non-zero
+        function expandPNGRow(baseRow, scale) {
+            const out = new Uint8Array(1 + baseRow.length * scale);
+            out[0] = PNG_FILTER_SUB;
+
+            let r = 0, g = 0, b = 0;
+            for (let i = 0, o = 1; i < baseRow.length; i += 3, o += 3 * scale) {
+                out[o] = baseRow[i] - r;
+                out[o + 1] = baseRow[i + 1] - g;
+                out[o + 2] = baseRow[i + 2] - b;
+                r = baseRow[i];
+                g = baseRow[i + 1];
+                b = baseRow[i + 2];
+            }
+            return out;
+        }
+
+        // Indices packed most significant bits first, as PNG requires
+        function packIndexedRow(baseRow, scale, bitDepth, rowBytes) {
+            const out = new Uint8Array(rowBytes);
+            out[0] = PNG_FILTER_NONE;
+
+            if (bitDepth === 8) {
+                for (let x = 0, o = 1; x < baseRow.length; x++) {
+                    const index = baseRow[x];
+                    for (let k = 0; k < scale; k++) out[o++] = index;
+                }
+                return out;
+            }
+
+            // perByte is 2, 4 or 8: pixel p lands in byte p >> perByteBits
+            const perByteBits = 3 - Math.log2(bitDepth);
+            const slotMask = (1 << perByteBits) - 1;
+            let p = 0;
+            for (let x = 0; x < baseRow.length; x++) {
+                const index = baseRow[x];
+                for (let k = 0; k < scale; k++, p++) {
+                    out[1 + (p >> perByteBits)] |= index << (8 - bitDepth * ((p & slotMask) + 1));
+                }
+            }
+            return out;
+        }
+
+        // Compressed output is gathered into IDAT chunks of about 64 KB
+        async function collectPNGData(readable, parts) {
+            const reader = readable.getReader();
+            let pending = [];
+            let size = 0;
+
+            for (;;) {
+                const { value, done } = await reader.read();
+                if (value) {
+                    pending.push(value);
+                    size += value.length;
+                }
+                if (size > 0 && (done || size >= IDAT_CHUNK_BYTES)) {
+                    parts.push(createPNGChunk('IDAT', concatBytes(pending, size)));
+                    pending = [];
+                    size = 0;
+                }
+                if (done) return;
+            }
+        }
+
+        function concatBytes(chunks, size) {
+            const data = new Uint8Array(size);
+            let offset = 0;
+            for (const chunk of chunks) {
+                data.set(chunk, offset);
+                offset += chunk.length;
+            }
+            return data;
+        }
+
+        // 🚀 GIF89a encoder
+        // One frame with a global color table, compressed with variable-width
+        // LZW as rows arrive. The code table is a flat (prefix, index) array
+        // stamped with a generation counter, so the reset every 4096 codes is
+        // a counter bump rather than a clear of the table.
+        const GIF_MAX_CODES = 4096;
+        const GIF_MAX_SIZE = 65535;
+
+        function createGIFEncoder(baseWidth, baseHeight, scale, palette) {
+            const width = baseWidth * scale;
+            const height = baseHeight * scale;
+            if (width > GIF_MAX_SIZE || height > GIF_MAX_SIZE) {
+                throw new Error('GIF is limited to ' + GIF_MAX_SIZE + ' pixels per side');
+            }
+
+            const tableBits = Math.max(1, Math.ceil(Math.log2(palette.length)));
+            const minCodeSize = Math.max(2, tableBits);
+            const clearCode = 1 << minCodeSize;
+            const endCode = clearCode + 1;
+
+            // Keyed by (prefix, index): sized by the palette, so small
+            // palettes get a small, cache-friendly table
+            const codes = new Int16Array(GIF_MAX_CODES << tableBits);
+            const stamps = new Uint32Array(GIF_MAX_CODES << tableBits);
+            let generation = 1;
+            let nextCode = endCode + 1;
+            let codeSize = minCodeSize + 1;
+            let prefix = -1;
+
+            const parts = [createGIFHeader(width, height, palette, tableBits, minCodeSize)];
+            const block = new Uint8Array(255);
+            let blockLength = 0;
+            let pending = [];
+            let bits = 0;
+            let bitCount = 0;
+
+            function pushByte(byte) {
+                block[blockLength++] = byte;
+                if (blockLength === 255) flushBlock();
+            }
+
+            function flushBlock() {
+                const sub = new Uint8Array(blockLength + 1);
+                sub[0] = blockLength;
+                sub.set(block.subarray(0, blockLength), 1);
+                pending.push(sub);
+                blockLength = 0;
+                if (pending.length >= 256) {
+                    parts.push(new Blob(pending));
+                    pending = [];
+                }
+            }
+
+            function emit(code) {
+                bits |= code << bitCount;
+                bitCount += codeSize;
+                while (bitCount >= 8) {
+                    pushByte(bits & 0xff);
+                    bits >>>= 8;
+                    bitCount -= 8;
+                }
+            }
+
+            // Hot loop: table hits only advance the prefix. Emitting is
+            // rare by comparison and goes through emit().
+            function encode(row) {
+                let i = 0;
+                if (prefix < 0) prefix = row[i++];
+                let current = prefix;
+
+                for (; i < row.length; i++) {
+                    const index = row[i];
+                    const key = (current << tableBits) | index;
+                    if (stamps[key] === generation) {
+                        current = codes[key];
+                        continue;
+                    }
+
+                    emit(current);
+                    if (nextCode === GIF_MAX_CODES) {
+                        emit(clearCode);
+                        generation++;
+                        nextCode = endCode + 1;
+                        codeSize = minCodeSize + 1;
+                    } else {
+                        if (nextCode >= 1 << codeSize) codeSize++;
+                        codes[key] = nextCode++;
+                        stamps[key] = generation;
+                    }
+                    current = index;
+                }
+                prefix = current;
+            }
+
+            emit(clearCode);
+
+            return {
+                scale, width, height,
+
+                async writeRow(baseRow) {
+                    let row = baseRow;
+                    if (scale > 1) {
+                        row = new Uint8Array(width);
+                        for (let x = 0, o = 0; x < baseRow.length; x++) {
+                            const index = baseRow[x];
+                            for (let k = 0; k < scale; k++) row[o++] = index;
+                        }
+                    }
+                    for (let r = 0; r < scale; r++) encode(row);
+                },
+
+                async finish() {
+                    if (prefix >= 0) emit(prefix);
+                    emit(endCode);
+                    if (bitCount > 0) pushByte(bits & 0xff);
+                    if (blockLength > 0) flushBlock();
+                    parts.push(new Blob(pending));
+                    parts.push(new Uint8Array([0, 0x3b]));
+                    return new Blob(parts, { type: 'image/gif' });
+                }
+            };
+        }
+
+        // Header, logical screen, global color table, image descriptor and
+        // the LZW minimum code size
+        function createGIFHeader(width, height, palette, tableBits, minCodeSize) {
+            const tableSize = 1 << tableBits;
+            const header = new Uint8Array(13 + tableSize * 3 + 11);
+            const view = new DataView(header.buffer);
+
+            header.set([71, 73, 70, 56, 57, 97], 0);
+            view.setUint16(6, width, true);
+            view.setUint16(8, height, true);
+            header[10] = 0x80 | (7 << 4) | (tableBits - 1);
+
+            palette.forEach((color, i) => header.set(color, 13 + i * 3));
+
+            const image = 13 + tableSize * 3;
+            header[image] = 0x2c;
+            view.setUint16(image + 5, width, true);
+            view.setUint16(image + 7, height, true);
+            header[image + 10] = minCodeSize;
+            return header;
+        }
+
+        function createPNGChunk(type, data) {
+            const chunk = new Uint8Array(data.length + 12);
+            const view = new DataView(chunk.buffer);
+            view.setUint32(0, data.length);
+            for (let i = 0; i < 4; i++) chunk[4 + i] = type.charCodeAt(i);
+            chunk.set(data, 8);
+            view.setUint32(data.length + 8, crc32(chunk, 4, data.length + 8));
+            return chunk;
+        }
+
+        let crcTable = null;
+
+        function crc32(bytes, start, end) {
+            if (!crcTable) {
+                crcTable = new Uint32Array(256);
+                for (let n = 0; n < 256; n++) {
+                    let c = n;
+                    for (let k = 0; k < 8; k++) c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+                    crcTable[n] = c >>> 0;
+                }
+            }
+
+            let crc = 0xffffffff;
+            for (let i = start; i < end; i++) {
+                crc = crcTable[(crc ^ bytes[i]) & 0xff] ^ (crc >>> 8);
+            }
+            return (crc ^ 0xffffffff) >>> 0;
         }
     `;
 }
\ No newline at end of file
@@ -1,9 +1,18 @@
 // Image processing and worker management
 
 let currentImage = null;
-let processedImageData = null;
-let currentPalette = [];
-let worker = null;
+// Result at processed size: an ImageBitmap from the worker, or a canvas
+let processedImage = null;
+let processedIndices = null;
+// Palette behind processedImage; set only when a result is shown
+let processedPalette = [];
+// Palette of the last finished run and the inputs it was fitted to
+let lastRun = null;
+// Fallback path only: the last source read back on this thread
+let lastReadback = null;
+const READBACK_CACHE_BYTES = 256 * 1024 * 1024;
+// Controller of the run in flight; a new run aborts it
+let activeRun = null;
 
 function displayOriginalImage(img) {
     const originalCanvas = document.getElementById('originalCanvas');
@@ -49,7 +58,6 @@ function updateOutputDimensions(imgWidth, imgHeight, scale) {
 
 function processImage() {
     const processing = document.getElementById('processing');
-    const processBtn = document.getElementById('processBtn');
     const downloadBtn = document.getElementById('downloadBtn');
     const visualizerSection = document.getElementById('visualizerSection');
     const processingText = document.getElementById('processingText');
@@ -60,11 +68,19 @@ function processImage() {
     const processedCtx = processedCanvas.getContext('2d');
     const showViz = document.getElementById('showViz');
 
+    // Superseded runs are cancelled so no CPU goes to stale parameters;
+    // the Process button stays enabled to allow exactly that
+    if (activeRun) activeRun.abort();
+    activeRun = new AbortController();
+    const signal = activeRun.signal;
+    // A new upload may replace (and close) currentImage while this run
+    // waits on the hash or the pool; the run keeps working on its own image
+    const image = currentImage;
+
     // ✅ START END-TO-END UI TIMING
     PerformanceTracker.startUI();
 
     processing.classList.add('active');
-    processBtn.disabled = true;
     downloadBtn.disabled = true;
     visualizerSection.style.display = 'none';
 
@@ -73,31 +89,68 @@ function processImage() {
     const heavyProcessingMode = document.getElementById('heavyProcessingMode').checked;
     
     // Determine the actual processing dimensions
-    let processWidth = Math.floor(currentImage.width * outputScale);
-    let processHeight = Math.floor(currentImage.height * outputScale);
-    
-    // Create a canvas at the processing resolution
-    const processCanvas = document.createElement('canvas');
-    processCanvas.width = processWidth;
-    processCanvas.height = processHeight;
-    const processCtx = processCanvas.getContext('2d');
-    processCtx.drawImage(currentImage, 0, 0, processWidth, processHeight);
+    let processWidth = Math.floor(image.width * outputScale);
+    let processHeight = Math.floor(image.height * outputScale);
     
-    const imageData = processCtx.getImageData(0, 0, processWidth, processHeight);
-
     let numColors = parseInt(document.getElementById('colorCount').value);
-    let blockSize = parseInt(document.getElementById('pixelSize').value);
+    let blockSize = parseFloat(document.getElementById('pixelSize').value);
 
     const totalPixels = processWidth * processHeight;
 
+    const dithering = document.getElementById('ditherAlgo').value;
+    const paletteLookup = document.getElementById('paletteLookup').value;
+    const paletteSearch = document.getElementById('paletteSearch').value;
+    const quantizer = document.getElementById('quantizer').value;
+    const kmeans = document.getElementById('kmeansVariant').value;
+    const sampling = document.getElementById('kmeansSampling').value;
+    const init = document.getElementById('kmeansInit').value;
+    const budgetMs = parseInt(document.getElementById('minibatchBudget').value);
+    const measureQuality = document.getElementById('measureQuality').checked;
+    const outputFormat = document.getElementById('outputFormat').value;
+    const mapWorkersValue = document.getElementById('mapWorkers').value;
+    const mapWorkers = mapWorkersValue === 'auto' ? 'auto' : parseInt(mapWorkersValue);
+    const memoryBudgetValue = document.getElementById('memoryBudget').value;
+    const memoryBudget = memoryBudgetValue === 'off' ? null : parseInt(memoryBudgetValue);
+    const useResultCache = document.getElementById('resultCache').checked;
+    const progressivePreview = document.getElementById('progressivePreview').checked;
+    const latencyBudgetValue = document.getElementById('latencyBudget').value;
+    const latencyBudget = latencyBudgetValue === 'off' ? null : parseInt(latencyBudgetValue);
+
+    const sourceKey = getImageId(image) + ':' + processWidth + 'x' + processHeight;
+
+    // What the latency model needs to know about this run
+    const latencyPlan = {
+        width: processWidth,
+        height: processHeight,
+        dithering: dithering,
+        paletteLookup: paletteLookup,
+        workers: mapWorkers,
+        tiled: memoryBudget !== null,
+        quantizer: quantizer,
+        kmeans: kmeans,
+        sampling: sampling,
+        budgetMs: budgetMs,
+        preview: progressivePreview,
+        sourceReused: lastRun !== null && lastRun.sourceKey === sourceKey
+    };
+
     /*
       ADAPTIVE QUALITY SYSTEM
       -------------------------
+      Latency Budget: Best quality predicted to finish within the target,
+                      from this device's measured stage throughput
       Normal Mode: Conservative limits for smooth performance
       Heavy Mode: Aggressive quality, accepts longer processing
     */
 
-    if (!heavyProcessingMode) {
+    let latencyChoice = null;
+    if (latencyBudget) {
+        // ⏱️ LATENCY BUDGET - The requested block size and colors are the
+        // quality ceiling; the model gives up as little as the budget needs
+        latencyChoice = LatencyModel.choose(latencyBudget, { ...latencyPlan, blockSize, numColors });
+        blockSize = latencyChoice.blockSize;
+        numColors = latencyChoice.numColors;
+    } else if (!heavyProcessingMode) {
         // 🔹 NORMAL MODE - Protect responsiveness
         if (totalPixels > 4_000_000) {
             // Very large images (4K+): strong downsampling
@@ -133,64 +186,134 @@ function processImage() {
     const effectiveHeight = Math.floor(processHeight / blockSize);
     const effectivePixels = effectiveWidth * effectiveHeight;
 
+    // 🚀 Incremental reprocessing: stages whose inputs match the last run
+    // are reused. Same source at the same size: no readback. Same palette
+    // inputs and color count: no quantization. Only the color count
+    // changed: k-means warm-starts from the previous centroids.
+    const paletteInputKey = [
+        sourceKey, blockSize, memoryBudget ? 'tiled' : 'whole',
+        quantizer, kmeans, sampling, init, budgetMs
+    ].join('|');
+    const previousRun = lastRun && lastRun.paletteInputKey === paletteInputKey ? lastRun : null;
+
+    const runPlan = {
+        ...latencyPlan,
+        blockSize: blockSize,
+        numColors: numColors,
+        paletteReused: previousRun !== null && previousRun.numColors === numColors
+    };
+    const prediction = LatencyModel.predict(runPlan);
+
     console.log('┏━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━┓');
     console.log('🎨 PROCESSING CONFIGURATION');
     console.log('┣━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━┫');
     console.log('Mode:', heavyProcessingMode ? '🔥 HEAVY' : '🔹 NORMAL');
-    console.log('Original Image:', `${currentImage.width}x${currentImage.height}`);
+    if (latencyChoice) {
+        console.log('Latency Budget:', latencyBudget + ' ms' +
+            (latencyChoice.fits ? '' : ' (not reachable: using the fastest settings)'));
+    }
+    console.log('Original Image:', `${image.width}x${image.height}`);
     console.log('Processing Size:', `${processWidth}x${processHeight} (${totalPixels.toLocaleString()} pixels)`);
     console.log('Effective Size:', `${effectiveWidth}x${effectiveHeight} (${effectivePixels.toLocaleString()} pixels)`);
     console.log('Block Size:', blockSize + 'x');
     console.log('Colors:', numColors);
     console.log('Compression Ratio:', (totalPixels / effectivePixels).toFixed(2) + 'x');
     console.log('Output Scale:', outputScale * 100 + '%');
+    console.log('Predicted Time:', Math.round(prediction.total) + ' ms');
     console.log('┗━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━┛\n');
 
-    const dithering = document.getElementById('ditherAlgo').value;
+    // Set once the image hash is known; results stored under it on completion
+    let cacheKey = null;
+
+    // Stages timed on this thread (fallback readback)
+    const pageStages = {};
 
-    const workerCode = createWorkerCode();
-    const blob = new Blob([workerCode], { type: 'application/javascript' });
-    worker = new Worker(URL.createObjectURL(blob));
+    // Tiled runs stream the result back strip by strip as palette indices
+    const tiledOutput = memoryBudget
+        ? createTiledOutput(effectiveWidth, effectiveHeight)
+        : null;
+
+    const handleWorkerMessage = function (e) {
+        // A newer run owns the UI now
+        if (signal.aborted) return;
 
-    worker.onmessage = function (e) {
         if (e.data.type === 'progress') {
             progressFill.style.width = e.data.progress + '%';
             processingText.textContent = e.data.text;
         }
 
         else if (e.data.type === 'palette') {
-            currentPalette = e.data.palette;
+            // Strips arrive as indices against this palette
+            if (tiledOutput) tiledOutput.palette = e.data.palette;
         }
 
-        else if (e.data.type === 'complete') {
-            processedImageData = e.data.imageData;
-
-            // Upscale to match the processing canvas dimensions
-            const upscaled = upscaleImageData(
-                processedImageData,
-                processWidth,
-                processHeight
-            );
-
-            // Now scale to preview canvas size (if downscale preview is enabled)
-            const previewCanvas = document.createElement('canvas');
-            previewCanvas.width = processWidth;
-            previewCanvas.height = processHeight;
-            const previewCtx = previewCanvas.getContext('2d');
-            previewCtx.putImageData(upscaled, 0, 0);
-            
-            // Draw to the display canvas
+        else if (e.data.type === 'strip') {
+            receiveResultStrip(e.data, tiledOutput, processedCanvas);
+        }
+
+        else if (e.data.type === 'preview') {
+            // Coarse first pass: shown blocky until the full result lands
+            const preview = e.data.bitmap || imageDataToCanvas(e.data.imageData);
             processedCanvas.width = originalCanvas.width;
             processedCanvas.height = originalCanvas.height;
             processedCtx.imageSmoothingEnabled = false;
-            processedCtx.drawImage(previewCanvas, 0, 0, processedCanvas.width, processedCanvas.height);
+            processedCtx.drawImage(preview, 0, 0, processedCanvas.width, processedCanvas.height);
+            if (e.data.bitmap) e.data.bitmap.close();
+        }
+
+        else if (e.data.type === 'complete') {
+            if (tiledOutput) {
+                // Every strip is drawn already; the indices are the result
+                processedIndices = {
+                    indices: tiledOutput.indices,
+                    palette: e.data.palette,
+                    width: tiledOutput.width,
+                    height: tiledOutput.height
+                };
+                setProcessedImage(null, e.data.palette);
+            } else {
+                // Index output: keep the indices for usage bars and export
+                processedIndices = e.data.indices
+                    ? {
+                        indices: e.data.indices,
+                        palette: e.data.palette,
+                        width: e.data.width,
+                        height: e.data.height
+                    }
+                    : null;
+                setProcessedImage(e.data.bitmap || imageDataToCanvas(e.data.imageData), e.data.palette);
+
+                // Draw the small result once, scaled straight to the display
+                // canvas; tiled runs have already drawn every strip
+                processedCanvas.width = originalCanvas.width;
+                processedCanvas.height = originalCanvas.height;
+                processedCtx.imageSmoothingEnabled = false;
+                processedCtx.drawImage(processedImage, 0, 0, processedCanvas.width, processedCanvas.height);
+            }
 
             processing.classList.remove('active');
-            processBtn.disabled = false;
             downloadBtn.disabled = false;
 
+            lastRun = { paletteInputKey, sourceKey, numColors, palette: e.data.palette };
+
+            // Only index results are cached: they are small and rebuild the
+            // image. A palette carried over from the previous run (reused or
+            // warm-started) depends on that history, not only on the key.
+            const paletteCarried = (e.data.reused || []).some(stage => stage === 'palette' || stage === 'warm start');
+            if (cacheKey && !e.data.cached && !paletteCarried && processedIndices) {
+                ResultCache.put(cacheKey, {
+                    palette: e.data.palette,
+                    indices: processedIndices.indices,
+                    width: processedIndices.width,
+                    height: processedIndices.height,
+                    iterations: e.data.iterations,
+                    psnr: e.data.psnr
+                });
+            }
+
             // CORRECT: Use the actual processed pixels from the downscaled image
-            const actualPixelsProcessed = processedImageData.width * processedImageData.height;
+            const result = processedIndices || processedImage;
+            const actualPixelsProcessed = result.width * result.height;
 
             const perf = PerformanceTracker.endUI({
                 workerTime: e.data.algorithmTime
@@ -199,8 +322,29 @@ function processImage() {
             document.getElementById('statTime').textContent =
                 perf.totalTime + ' ms';
 
+            document.getElementById('statLatency').textContent = e.data.cached
+                ? '—'
+                : `${Math.round(prediction.total)} / ${Math.round(perf.totalTime)} ms`;
+
+            // Calibrate on every run; tiled runs keep rates of their own
+            const stages = e.data.cached ? {} : { ...pageStages, ...e.data.stages };
+            if (!e.data.cached) {
+                LatencyModel.update({
+                    ...runPlan,
+                    sourceReused: e.data.reused.includes('source'),
+                    paletteReused: e.data.reused.includes('palette')
+                }, stages, parseFloat(perf.totalTime));
+            }
+
             document.getElementById('statPerfTime').textContent =
-                e.data.algorithmTime.toFixed(2) + ' ms';
+                e.data.cached ? 'cached' : e.data.algorithmTime.toFixed(2) + ' ms';
+
+            document.getElementById('statPsnr').textContent =
+                e.data.psnr !== null ? e.data.psnr.toFixed(2) + ' dB' : '—';
+
+            const cacheStats = ResultCache.stats();
+            document.getElementById('statCache').textContent =
+                `${cacheStats.hits} / ${cacheStats.misses}`;
 
             console.log('┏━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━┓');
             console.log('⚡ PERFORMANCE METRICS');
@@ -209,7 +353,27 @@ function processImage() {
             console.log('Algorithm Time:', e.data.algorithmTime.toFixed(2) + ' ms');
             console.log('UI Overhead:', perf.uiOverhead + ' ms');
             console.log('Pixels Processed:', actualPixelsProcessed.toLocaleString());
-            console.log('Throughput:', (actualPixelsProcessed / e.data.algorithmTime).toFixed(2) + ' px/ms');
+            console.log('Result Cache:', e.data.cached ? 'hit' : cacheKey ? 'miss' : 'off');
+            if (!e.data.cached) {
+                console.log('Predicted vs Actual:', `${Math.round(prediction.total)} ms vs ${perf.totalTime} ms`);
+                console.log('Stages Run:', Object.keys(stages)
+                    .map(stage => `${stage} ${stages[stage]} ms`)
+                    .join(', '));
+                if (e.data.reused.length > 0) {
+                    console.log('Reused:', e.data.reused.join(', '));
+                }
+                console.log('Throughput:', (actualPixelsProcessed / e.data.algorithmTime).toFixed(2) + ' px/ms');
+                console.log('Parallel Workers:', e.data.workers +
+                    (mapWorkers !== 1 && e.data.workers === 1 && !window.crossOriginIsolated
+                        ? ' (serial fallback: page is not cross-origin isolated)'
+                        : ''));
+            }
+            if (e.data.tiles) {
+                console.log('Tiles:', `${e.data.tiles} strips of ${e.data.stripRows} rows (${memoryBudget} MB budget)`);
+            }
+            if (e.data.converged !== undefined) {
+                console.log('Mini-batch Converged:', e.data.converged ? 'yes' : 'no (budget reached)');
+            }
             console.log('┗━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━┛\n');
 
             if (showViz.checked) {
@@ -217,73 +381,385 @@ function processImage() {
                     e.data.palette,
                     e.data.iterations,
                     actualPixelsProcessed,
-                    perf.totalTime
+                    perf.totalTime,
+                    processedIndices
+                        ? countPaletteUsage(processedIndices.indices, e.data.palette.length)
+                        : null
                 );
             }
-
-            worker.terminate();
         }
     };
 
-    worker.postMessage({
-        imageData: imageData,
+    const settings = {
         numColors: numColors,
         blockSize: blockSize,
-        dithering: dithering
+        dithering: dithering,
+        paletteLookup: paletteLookup,
+        paletteSearch: paletteSearch,
+        quantizer: quantizer,
+        kmeans: kmeans,
+        sampling: sampling,
+        init: init,
+        budgetMs: budgetMs,
+        measureQuality: measureQuality,
+        // A tiled result never exists as full-size pixels, on either side
+        outputFormat: tiledOutput ? 'indices' : outputFormat,
+        workers: mapWorkers,
+        preview: progressivePreview,
+        sourceKey: sourceKey,
+        palette: previousRun && previousRun.numColors === numColors
+            ? previousRun.palette
+            : null,
+        initialPalette: previousRun && previousRun.numColors !== numColors && quantizer === 'kmeans'
+            ? previousRun.palette
+            : null
+    };
+
+    const startJob = () => {
+        if (tiledOutput) {
+            // The worker reads the bitmap back in budget-sized strips, so the
+            // full-resolution pixel buffer is never allocated
+            processedCanvas.width = originalCanvas.width;
+            processedCanvas.height = originalCanvas.height;
+
+            return createImageBitmap(image).then(source => WorkerPool.run({
+                ...settings,
+                source: source,
+                width: processWidth,
+                height: processHeight,
+                memoryBudget: memoryBudget
+            }, {
+                onMessage: handleWorkerMessage,
+                transfer: [source],
+                signal: signal
+            }));
+        } else if (typeof OffscreenCanvas !== 'undefined') {
+            // The worker resizes the bitmap and reads the pixels back itself,
+            // so the page never holds a copy of the frame
+            const run = source => WorkerPool.run({
+                ...settings,
+                source: source,
+                width: processWidth,
+                height: processHeight
+            }, {
+                onMessage: handleWorkerMessage,
+                transfer: source ? [source] : [],
+                signal: signal
+            });
+
+            // A worker still holding these pixels needs no bitmap; should it
+            // drop them before the job starts, send one after all
+            if (!WorkerPool.holdsSource(sourceKey)) return createImageBitmap(image).then(run);
+            return run(null).catch(error => error.name === 'SourceMissing'
+                ? createImageBitmap(image).then(run)
+                : Promise.reject(error));
+        } else {
+            let imageData = lastReadback && lastReadback.key === sourceKey
+                ? lastReadback.imageData
+                : null;
+
+            if (!imageData) {
+                const readStart = Date.now();
+
+                // Create a canvas at the processing resolution
+                const processCanvas = document.createElement('canvas');
+                processCanvas.width = processWidth;
+                processCanvas.height = processHeight;
+                const processCtx = processCanvas.getContext('2d');
+                processCtx.drawImage(image, 0, 0, processWidth, processHeight);
+
+                imageData = processCtx.getImageData(0, 0, processWidth, processHeight);
+                pageStages.readback = Date.now() - readStart;
+                lastReadback = processWidth * processHeight * 4 <= READBACK_CACHE_BYTES
+                    ? { key: sourceKey, imageData: imageData }
+                    : null;
+            }
+
+            return WorkerPool.run({ ...settings, imageData: imageData }, {
+                signal: signal,
+                // A kept readback is sent as a copy for the next rerun;
+                // otherwise hand the pixel buffer over instead of cloning it
+                transfer: lastReadback ? [] : [imageData.data.buffer],
+                onMessage: handleWorkerMessage
+            });
+        }
+    };
+
+    // 🚀 Result cache: the same pixels with the same settings always give
+    // the same output, so a stored index result is drawn without a worker
+    // run. Hashing reads the bitmap in the worker, hence OffscreenCanvas.
+    const job = useResultCache && typeof OffscreenCanvas !== 'undefined'
+        ? getImageHash(image).then(hash => {
+            cacheKey = [
+                hash, numColors, blockSize, dithering, outputScale,
+                heavyProcessingMode ? 'heavy' : 'normal',
+                quantizer, kmeans, sampling, init, budgetMs,
+                paletteLookup, paletteSearch, measureQuality,
+                memoryBudget ? 'tiled' : 'whole'
+            ].join('|');
+            return ResultCache.get(cacheKey);
+        }, error => {
+            console.warn('Image hash failed, result cache skipped:', error);
+            return null;
+        }).then(entry => {
+            if (signal.aborted) return;
+            if (!entry) return startJob();
+
+            if (tiledOutput) {
+                // Drawn in budget-sized bands, like a tiled run's strips
+                tiledOutput.indices = entry.indices;
+                tiledOutput.palette = entry.palette;
+                processedCanvas.width = originalCanvas.width;
+                processedCanvas.height = originalCanvas.height;
+                const bandRows = Math.max(1, Math.floor(memoryBudget * 1024 * 1024 / (entry.width * 4)));
+                for (let y = 0; y < entry.height; y += bandRows) {
+                    drawResultBand(tiledOutput, y, Math.min(bandRows, entry.height - y), processedCanvas);
+                }
+            }
+
+            handleWorkerMessage({
+                data: {
+                    type: 'complete',
+                    cached: true,
+                    palette: entry.palette,
+                    iterations: entry.iterations,
+                    psnr: entry.psnr,
+                    indices: entry.indices,
+                    width: entry.width,
+                    height: entry.height,
+                    imageData: tiledOutput
+                        ? null
+                        : expandPaletteIndices(entry.indices, entry.palette, entry.width, entry.height),
+                    algorithmTime: 0
+                }
+            });
+        })
+        : startJob();
+
+    job.catch(error => {
+        // Cancelled (or failed after being superseded): the newer run owns the UI
+        if (signal.aborted) return;
+
+        console.error('Processing failed:', error);
+        processing.classList.remove('active');
     });
 }
 
-function upscaleImageData(smallData, targetWidth, targetHeight) {
-    const tempCanvas = document.createElement('canvas');
-    tempCanvas.width = smallData.width;
-    tempCanvas.height = smallData.height;
-    const tempCtx = tempCanvas.getContext('2d');
-    tempCtx.putImageData(smallData, 0, 0);
-
-    const outputCanvas = document.createElement('canvas');
-    outputCanvas.width = targetWidth;
-    outputCanvas.height = targetHeight;
-    const outputCtx = outputCanvas.getContext('2d');
-    outputCtx.imageSmoothingEnabled = false;
-    outputCtx.drawImage(
-        tempCanvas,
-        0,
-        0,
-        targetWidth,
-        targetHeight
+// Small per-image id; keys the sources cached for incremental reruns
+const imageIds = new WeakMap();
+let nextImageId = 1;
+
+function getImageId(image) {
+    if (!imageIds.has(image)) imageIds.set(image, nextImageId++);
+    return imageIds.get(image);
+}
+
+// Content hash of an image's decoded pixels, computed once per image
+const imageHashes = new WeakMap();
+
+function getImageHash(image) {
+    if (!imageHashes.has(image)) {
+        const hash = createImageBitmap(image).then(source => WorkerPool.run({
+            source: source,
+            width: image.width,
+            height: image.height,
+            hashPixels: true
+        }, {
+            transfer: [source]
+        })).then(result => result.hash);
+
+        // Let a later run retry after a failure
+        hash.catch(() => imageHashes.delete(image));
+        imageHashes.set(image, hash);
+    }
+    return imageHashes.get(image);
+}
+
+// Result of a tiled run: one palette index per output pixel, filled strip
+// by strip. Export and usage bars read these; no full-size canvas or RGBA
+// copy is made on the page.
+function createTiledOutput(width, height) {
+    return {
+        width,
+        height,
+        palette: null,
+        indices: new Uint8Array(width * height),
+        // Strip-sized scratch canvas the bands are drawn through
+        band: null
+    };
+}
+
+// Keep a finished strip's indices and draw it into the preview straight away
+function receiveResultStrip(strip, output, canvas) {
+    output.indices.set(strip.indices, strip.y * strip.width);
+    drawResultBand(output, strip.y, strip.height, canvas);
+}
+
+// Draw output rows [y, y + rows) into their band of the scaled preview
+// canvas. Only strip-sized RGBA is allocated.
+function drawResultBand(output, y, rows, canvas) {
+    const { width } = output;
+    const pixels = expandPaletteIndices(
+        output.indices.subarray(y * width, (y + rows) * width), output.palette, width, rows
     );
 
-    return outputCtx.getImageData(0, 0, targetWidth, targetHeight);
+    if (!output.band || output.band.height < rows) {
+        output.band = document.createElement('canvas');
+        output.band.width = width;
+        output.band.height = rows;
+    }
+    output.band.getContext('2d').putImageData(pixels, 0, 0);
+
+    // Round band edges to whole canvas rows so strips meet without seams
+    const scaleY = canvas.height / output.height;
+    const top = Math.round(y * scaleY);
+    const bottom = Math.round((y + rows) * scaleY);
+
+    const ctx = canvas.getContext('2d');
+    ctx.imageSmoothingEnabled = false;
+    ctx.drawImage(output.band, 0, 0, width, rows, 0, top, canvas.width, bottom - top);
+}
+
+// Expand a palette-index buffer into RGBA pixels
+function expandPaletteIndices(indices, palette, width, height) {
+    const output = new ImageData(width, height);
+    const data = output.data;
+
+    // Pack each entry once so the loop is a single 32-bit store per pixel
+    const packed = new Uint32Array(palette.length);
+    const bytes = new Uint8Array(packed.buffer);
+    palette.forEach((color, i) => {
+        bytes[i * 4] = color[0];
+        bytes[i * 4 + 1] = color[1];
+        bytes[i * 4 + 2] = color[2];
+        bytes[i * 4 + 3] = 255;
+    });
+
+    const pixels = new Uint32Array(data.buffer);
+    for (let i = 0; i < indices.length; i++) {
+        pixels[i] = packed[indices[i]];
+    }
+
+    return output;
+}
+
+// Number of output pixels mapped to each palette entry
+function countPaletteUsage(indices, paletteSize) {
+    const counts = new Uint32Array(paletteSize);
+    for (let i = 0; i < indices.length; i++) {
+        counts[indices[i]]++;
+    }
+    return counts;
+}
+
+function setProcessedImage(image, palette) {
+    // Bitmaps hold their pixels outside the JS heap until closed
+    if (processedImage && processedImage.close) processedImage.close();
+    processedImage = image;
+    processedPalette = palette;
+}
+
+// Drawable fallback for pixel results (cache hits, no OffscreenCanvas)
+function imageDataToCanvas(imageData) {
+    const canvas = document.createElement('canvas');
+    canvas.width = imageData.width;
+    canvas.height = imageData.height;
+    canvas.getContext('2d').putImageData(imageData, 0, 0);
+    return canvas;
 }
 
 function downloadImage(scale) {
-    if (!processedImageData || !currentImage) return;
-    
-    // Get the output scale setting
+    downloadImages([scale]);
+}
+
+// Export one or more scale multipliers in the chosen format. The worker
+// expands the small result row by row while encoding, all scales in a
+// single pass, so no full-size canvas is created however large the
+// multiplier.
+function downloadImages(scales) {
+    if ((!processedImage && !processedIndices) || !currentImage) return;
+
+    const format = document.getElementById('exportFormat').value;
+    const extension = format === 'gif' ? 'gif' : 'png';
+
+    if (!canExportInWorker(format)) {
+        const { width, height } = getExportBaseSize();
+        scales.forEach(scale => downloadImageViaCanvas(scale, width, height));
+        return;
+    }
+
+    exportProcessedImage(scales, format).then(result => {
+        console.log('💾 Exported', result.files
+            .map(file => `${file.width}×${file.height} (${(file.blob.size / 1024).toFixed(0)} KB)`)
+            .join(', '), 'as', format, 'in', result.exportTime + ' ms');
+
+        for (const file of result.files) {
+            saveBlob(file.blob, `pixel-art-${result.baseWidth}x${result.baseHeight}-${file.scale}x.${extension}`);
+        }
+    }).catch(error => {
+        console.error('Export failed:', error);
+    });
+}
+
+// Resolves with the worker's { files: [{ scale, width, height, blob }] }.
+// Every format reads the index buffer directly when the run kept one (tiled
+// runs always do); otherwise the worker reads the result bitmap back.
+function exportProcessedImage(scales, format) {
+    const { width: baseWidth, height: baseHeight } = getExportBaseSize();
+    const result = processedIndices || processedImage;
+    const message = {
+        width: result.width,
+        height: result.height,
+        // The palette of the result being written, not of a later run
+        palette: processedIndices ? processedIndices.palette : processedPalette,
+        exportWidth: baseWidth,
+        exportHeight: baseHeight,
+        exportScales: scales,
+        exportFormat: format
+    };
+
+    const job = processedIndices
+        ? WorkerPool.run({ ...message, indices: processedIndices.indices })
+        : createImageBitmap(processedImage).then(source => WorkerPool.run(
+            { ...message, source: source },
+            { transfer: [source] }
+        ));
+
+    return job.then(result => ({ ...result, baseWidth, baseHeight }));
+}
+
+function canExportInWorker(format) {
+    const readsBitmap = !processedIndices;
+    return (format === 'gif' || typeof CompressionStream !== 'undefined') &&
+        (!readsBitmap || typeof OffscreenCanvas !== 'undefined');
+}
+
+// Export dimensions before the multiplier: the processing size
+function getExportBaseSize() {
     const outputScale = parseInt(document.getElementById('outputScale').value) / 100;
-    
-    // Determine base output dimensions
-    let baseWidth = Math.floor(currentImage.width * outputScale);
-    let baseHeight = Math.floor(currentImage.height * outputScale);
-    
+    return {
+        width: Math.floor(currentImage.width * outputScale),
+        height: Math.floor(currentImage.height * outputScale)
+    };
+}
+
+// Fallback for browsers without CompressionStream or OffscreenCanvas
+function downloadImageViaCanvas(scale, baseWidth, baseHeight) {
     // Apply the download scale multiplier
     const finalWidth = baseWidth * scale;
     const finalHeight = baseHeight * scale;
     
-    // Create canvas at processed size first
-    const processCanvas = document.createElement('canvas');
-    processCanvas.width = processedImageData.width;
-    processCanvas.height = processedImageData.height;
-    const processCtx = processCanvas.getContext('2d');
-    processCtx.putImageData(processedImageData, 0, 0);
-    
     // Upscale to base resolution
     const baseCanvas = document.createElement('canvas');
     baseCanvas.width = baseWidth;
     baseCanvas.height = baseHeight;
     const baseCtx = baseCanvas.getContext('2d');
     baseCtx.imageSmoothingEnabled = false;
-    baseCtx.drawImage(processCanvas, 0, 0, baseWidth, baseHeight);
+    // A tiled result has no image: expanded here, on these old browsers only
+    const source = processedImage || imageDataToCanvas(expandPaletteIndices(
+        processedIndices.indices, processedIndices.palette, processedIndices.width, processedIndices.height
+    ));
+    baseCtx.drawImage(source, 0, 0, baseWidth, baseHeight);
     
     // Apply scale multiplier
     const finalCanvas = document.createElement('canvas');
@@ -294,11 +770,15 @@ function downloadImage(scale) {
     finalCtx.drawImage(baseCanvas, 0, 0, finalWidth, finalHeight);
 
     finalCanvas.toBlob((blob) => {
-        const url = URL.createObjectURL(blob);
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = `pixel-art-${baseWidth}x${baseHeight}-${scale}x.png`;
-        a.click();
-        URL.revokeObjectURL(url);
+        saveBlob(blob, `pixel-art-${baseWidth}x${baseHeight}-${scale}x.png`);
     });
-}
\ No newline at end of file
+}
+
+function saveBlob(blob, filename) {
+    const url = URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = filename;
+    a.click();
+    URL.revokeObjectURL(url);
+}
@@ -0,0 +1,205 @@
+// latencymodel.js
+// Per-device cost model behind the latency-budget mode. Every pipeline
+// stage costs a learned number of milliseconds per unit of work (source
+// pixels, output pixels, or samples x colors for a sampled k-means fit).
+// Rate names carry the settings that change a stage's speed: mapping is
+// per dithering, lookup and worker count, and tiled runs, which read the
+// source back inside both of their passes, learn rates of their own.
+// Rates start from rough defaults, are refined after every run from the
+// stage times the worker measures, and persist in localStorage, so the
+// chosen parameters follow this machine's speed rather than fixed tiers.
+const LatencyModel = (() => {
+  const STORAGE_KEY = 'pixel-art-latency-model';
+  const SMOOTHING = 0.3;  // weight of the newest measurement
+  const MIN_STAGE_MS = 2; // shorter stages are mostly timer noise
+
+  // Mirror the worker: strided k-means fits at most KMEANS_SAMPLES pixels,
+  // and only runs of PREVIEW_MIN_PIXELS (after blocks) draw a preview
+  const KMEANS_SAMPLES = 5000;
+  const PREVIEW_MIN_PIXELS = 1024 * 1024;
+
+  // Block sizes tried in budget mode, finest first
+  const BLOCK_STEPS = [1, 1.5, 2, 3, 4, 6, 8, 12, 16];
+
+  // ms per unit of work until this device has been measured
+  const DEFAULT_RATES = {
+    readback: 5e-6,
+    preview: 1e-5,
+    downscale: 5e-6,
+    palette: 1e-4,
+    mapping: 2e-5,
+    'mapping:diffusion': 1.5e-4,
+    'palette:tiled': 2e-5, // per source pixel: strips read into a histogram
+    overhead: 30 // ms per run: bitmap copies, messages, drawing
+  };
+
+  const rates = load();
+
+  // Only finite, non-negative numbers are kept: one NaN would spread into
+  // every prediction and, through smoothing, into the rate saved back.
+  // Anything else (corrupt, or written by another version) is dropped.
+  function load() {
+    const loaded = {};
+    try {
+      const parsed = JSON.parse(localStorage.getItem(STORAGE_KEY));
+      if (parsed && typeof parsed === 'object' && !Array.isArray(parsed)) {
+        for (const [key, rate] of Object.entries(parsed)) {
+          if (typeof rate === 'number' && Number.isFinite(rate) && rate >= 0) loaded[key] = rate;
+        }
+      }
+    } catch (error) {
+      // Unreadable: start the calibration over
+    }
+    return loaded;
+  }
+
+  function save() {
+    try {
+      localStorage.setItem(STORAGE_KEY, JSON.stringify(rates));
+    } catch (error) {
+      // Storage full or disabled: keep calibrating for this session only
+    }
+  }
+
+  function tiledSuffix(plan) {
+    return plan.tiled ? ':tiled' : '';
+  }
+
+  function paletteKey(plan) {
+    let key;
+    if (plan.quantizer !== 'kmeans') key = 'palette:' + plan.quantizer;
+    else if (plan.kmeans === 'minibatch') key = 'palette:minibatch';
+    else key = plan.sampling === 'histogram' ? 'palette:kmeans-histogram' : 'palette:kmeans';
+    return key + tiledSuffix(plan);
+  }
+
+  // e.g. 'mapping:floyd:lut:w4', or 'mapping:none:direct:wauto:tiled'
+  function mappingKey(plan) {
+    return ['mapping', plan.dithering, plan.paletteLookup, 'w' + plan.workers].join(':') + tiledSuffix(plan);
+  }
+
+  function rateFor(key) {
+    if (key in rates) return rates[key];
+    if (key in DEFAULT_RATES) return DEFAULT_RATES[key];
+
+    const [stage, variant] = key.split(':');
+    const tiled = key.endsWith(':tiled');
+    if (stage === 'overhead') return DEFAULT_RATES.overhead;
+    if (stage === 'mapping') {
+      const rate = variant === 'none' || variant === 'ordered' || variant === 'bluenoise'
+        ? DEFAULT_RATES.mapping
+        : DEFAULT_RATES['mapping:diffusion'];
+      // A tiled mapping pass reads its strips back as it goes
+      return tiled ? rate + DEFAULT_RATES.readback : rate;
+    }
+    return tiled ? DEFAULT_RATES['palette:tiled'] : DEFAULT_RATES.palette;
+  }
+
+  // Work per stage the run will execute, keyed by rate name. Stages the
+  // incremental path will reuse are left out, as the worker skips them.
+  function stageWork(plan) {
+    const { width, height, blockSize, numColors } = plan;
+    const sourcePixels = width * height;
+    const pixels = Math.floor(width / blockSize) * Math.floor(height / blockSize);
+    const work = {};
+
+    // Tiled: a palette pass and a mapping pass, each over every source strip
+    if (plan.tiled) {
+      if (!plan.paletteReused) work[paletteKey(plan)] = sourcePixels;
+      work[mappingKey(plan)] = sourcePixels;
+      return work;
+    }
+
+    if (!plan.sourceReused) work.readback = sourcePixels;
+    if (plan.preview && sourcePixels / (blockSize * blockSize) >= PREVIEW_MIN_PIXELS) {
+      work.preview = sourcePixels;
+    }
+    if (blockSize > 1) work.downscale = sourcePixels;
+    if (!plan.paletteReused) {
+      const key = paletteKey(plan);
+      work[key] = key === 'palette:kmeans'
+        ? numColors * Math.min(pixels, KMEANS_SAMPLES)
+        : pixels;
+    }
+    work[mappingKey(plan)] = pixels;
+    return work;
+  }
+
+  // Measured stage name -> rate name
+  function rateKey(stage, plan) {
+    if (stage === 'palette') return paletteKey(plan);
+    if (stage === 'mapping') return mappingKey(plan);
+    return stage;
+  }
+
+  return {
+    // plan: { width, height, blockSize, numColors, dithering, paletteLookup,
+    // workers, tiled, quantizer, kmeans, sampling, budgetMs, preview,
+    // sourceReused, paletteReused }
+    predict(plan) {
+      const stages = {};
+      let total = rateFor('overhead' + tiledSuffix(plan));
+      for (const [key, work] of Object.entries(stageWork(plan))) {
+        // Mini-batch k-means runs for its time budget, whatever the size
+        const ms = key === 'palette:minibatch' ? plan.budgetMs : rateFor(key) * work;
+        stages[key] = ms;
+        total += ms;
+      }
+      return { stages, total };
+    },
+
+    // Highest quality that fits targetMs, starting from the requested
+    // block size and color count. Resolution gives way first: each color
+    // count down to half the request is tried at every block size, finest
+    // first, before the next color count. Only if none of those fit do
+    // colors drop below half, at the finest block size that then fits.
+    // Returns the fastest candidate if nothing fits.
+    choose(targetMs, plan) {
+      const blocks = [plan.blockSize, ...BLOCK_STEPS.filter(b => b > plan.blockSize)];
+      const colors = [];
+      for (let k = plan.numColors; k >= 2; k = Math.floor(k * 3 / 4)) colors.push(k);
+      const enough = colors.filter(k => k * 2 >= plan.numColors);
+      const fewer = colors.filter(k => k * 2 < plan.numColors);
+
+      const candidates = [];
+      for (const numColors of enough) {
+        for (const blockSize of blocks) candidates.push({ ...plan, blockSize, numColors });
+      }
+      for (const blockSize of blocks) {
+        for (const numColors of fewer) candidates.push({ ...plan, blockSize, numColors });
+      }
+
+      let fastest = null;
+      for (const candidate of candidates) {
+        const predicted = this.predict(candidate).total;
+        if (predicted <= targetMs) return { ...candidate, predicted, fits: true };
+        if (!fastest || predicted < fastest.predicted) fastest = { ...candidate, predicted, fits: false };
+      }
+      return fastest;
+    },
+
+    // Fold a finished run into the rates. stages: measured ms per stage
+    // (worker and page); totalMs: end-to-end time, the rest is overhead.
+    update(plan, stages, totalMs) {
+      const work = stageWork(plan);
+      let stageTotal = 0;
+
+      for (const [stage, ms] of Object.entries(stages)) {
+        stageTotal += ms;
+        const key = rateKey(stage, plan);
+        if (ms < MIN_STAGE_MS || !work[key] || key === 'palette:minibatch') continue;
+
+        const rate = ms / work[key];
+        rates[key] = key in rates ? rates[key] + (rate - rates[key]) * SMOOTHING : rate;
+      }
+
+      const overhead = Math.max(0, totalMs - stageTotal);
+      const overheadKey = 'overhead' + tiledSuffix(plan);
+      rates[overheadKey] = overheadKey in rates
+        ? rates[overheadKey] + (overhead - rates[overheadKey]) * SMOOTHING
+        : overhead;
+
+      save();
+    }
+  };
+})();
@@ -5,6 +5,9 @@ document.addEventListener('DOMContentLoaded', () => {
     initializeComparison();
 });
 
+// Release pooled workers and their blob URL when the page goes away
+window.addEventListener('pagehide', () => WorkerPool.shutdown());
+
 function initializeEventListeners() {
     const imageUpload = document.getElementById('imageUpload');
     const colorCount = document.getElementById('colorCount');
@@ -115,48 +118,56 @@ function initializeEventListeners() {
         const file = e.target.files[0];
         if (!file) return;
 
-        const reader = new FileReader();
-        reader.onload = (event) => {
-            const img = new Image();
-            img.onload = () => {
-                currentImage = img;
-                displayOriginalImage(img);
-                processBtn.disabled = false;
-                downloadBtn.disabled = true;
-                exportOptions.classList.remove('active');
-                
-                // Show image info
-                const pixels = img.width * img.height;
-                const megapixels = (pixels / 1_000_000).toFixed(1);
-                imageInfo.textContent = `${img.width}×${img.height} (${megapixels}MP)`;
-                imageInfo.style.color = '#10b981';
-                
-                // Update dimension displays
-                updateScaleDisplays();
-                
-                console.log('Image loaded:', {
-                    dimensions: `${img.width}×${img.height}`,
-                    totalPixels: pixels.toLocaleString(),
-                    megapixels: megapixels
-                });
-                
-                // Suggest heavy mode for large images
-                if (pixels > 2_000_000 && !heavyMode.checked) {
-                    colorHint.textContent = '💡 Large image detected - consider Heavy Mode for best quality';
-                    colorHint.style.color = '#10b981';
-                    pixelHint.textContent = '💡 Heavy mode recommended for this image size';
-                    pixelHint.style.color = '#10b981';
-                }
-                
-                // Suggest lower output scale for very large images
-                if (pixels > 4_000_000 && outputScale.value === '100') {
-                    outputScaleHint.textContent = '💡 Very large image - consider reducing output scale (e.g., 50-75%) for faster processing';
-                    outputScaleHint.style.color = '#10b981';
-                }
-            };
-            img.src = event.target.result;
-        };
-        reader.readAsDataURL(file);
+        // Decode straight from the file: no base64 data URL or <img> in
+        // between, and the browser can decode off the main thread
+        createImageBitmap(file).then(img => {
+            // A run still working on the old image is stale: stop it before
+            // the bitmap it reads from goes away
+            if (activeRun) activeRun.abort();
+            // Bitmaps hold decoded pixels outside the JS heap: free the old one
+            // and the copies read back from it for reruns
+            if (currentImage) currentImage.close();
+            lastReadback = null;
+            WorkerPool.evictSources();
+            currentImage = img;
+            displayOriginalImage(img);
+            processBtn.disabled = false;
+            downloadBtn.disabled = true;
+            exportOptions.classList.remove('active');
+
+            // Show image info
+            const pixels = img.width * img.height;
+            const megapixels = (pixels / 1_000_000).toFixed(1);
+            imageInfo.textContent = `${img.width}×${img.height} (${megapixels}MP)`;
+            imageInfo.style.color = '#10b981';
+
+            // Update dimension displays
+            updateScaleDisplays();
+
+            console.log('Image loaded:', {
+                dimensions: `${img.width}×${img.height}`,
+                totalPixels: pixels.toLocaleString(),
+                megapixels: megapixels
+            });
+
+            // Suggest heavy mode for large images
+            if (pixels > 2_000_000 && !heavyMode.checked) {
+                colorHint.textContent = '💡 Large image detected - consider Heavy Mode for best quality';
+                colorHint.style.color = '#10b981';
+                pixelHint.textContent = '💡 Heavy mode recommended for this image size';
+                pixelHint.style.color = '#10b981';
+            }
+
+            // Suggest lower output scale for very large images
+            if (pixels > 4_000_000 && outputScale.value === '100') {
+                outputScaleHint.textContent = '💡 Very large image - consider reducing output scale (e.g., 50-75%) for faster processing';
+                outputScaleHint.style.color = '#10b981';
+            }
+        }).catch(error => {
+            console.error('Image decode failed:', error);
+            imageInfo.textContent = '⚠️ Could not decode this image';
+            imageInfo.style.color = '#f59e0b';
+        });
     });
 
     // Process button
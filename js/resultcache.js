@@ -0,0 +1,111 @@
+// resultcache.js
+// Content-addressed cache of finished results in IndexedDB. An entry holds
+// the palette and the palette-index buffer of one run, keyed by a hash of
+// the decoded pixels plus every setting that changes the output. Least
+// recently used entries are evicted once stored entries exceed MAX_BYTES.
+const ResultCache = (() => {
+  const DB_NAME = 'pixel-art-results';
+  const RESULTS = 'results'; // key -> { key, palette, indices, ... }
+  const USAGE = 'usage';     // key -> { key, size, lastUsed }, small, for LRU
+  const MAX_BYTES = 256 * 1024 * 1024;
+
+  let dbPromise = null;
+  let hits = 0;
+  let misses = 0;
+
+  function openDB() {
+    if (!dbPromise) {
+      dbPromise = new Promise((resolve, reject) => {
+        const request = indexedDB.open(DB_NAME, 1);
+        request.onupgradeneeded = () => {
+          const db = request.result;
+          db.createObjectStore(RESULTS, { keyPath: 'key' });
+          db.createObjectStore(USAGE, { keyPath: 'key' }).createIndex('lastUsed', 'lastUsed');
+        };
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => {
+          dbPromise = null;
+          reject(request.error);
+        };
+      });
+    }
+    return dbPromise;
+  }
+
+  // Run body(tx, setResult) in one transaction over both stores; resolves
+  // with the result once the transaction has committed
+  function transact(mode, body) {
+    return openDB().then(db => new Promise((resolve, reject) => {
+      const tx = db.transaction([RESULTS, USAGE], mode);
+      let result = null;
+      body(tx, value => { result = value; });
+      tx.oncomplete = () => resolve(result);
+      tx.onerror = () => reject(tx.error);
+      tx.onabort = () => reject(tx.error);
+    }));
+  }
+
+  // Walk usage oldest first, dropping entries until the rest fit the cap
+  function evict(tx) {
+    const entries = [];
+    let total = 0;
+    const cursor = tx.objectStore(USAGE).index('lastUsed').openCursor();
+
+    cursor.onsuccess = () => {
+      const c = cursor.result;
+      if (c) {
+        entries.push(c.value);
+        total += c.value.size;
+        c.continue();
+        return;
+      }
+
+      for (const entry of entries) {
+        if (total <= MAX_BYTES) break;
+        tx.objectStore(RESULTS).delete(entry.key);
+        tx.objectStore(USAGE).delete(entry.key);
+        total -= entry.size;
+      }
+    };
+  }
+
+  return {
+    // Resolves with the cached entry or null; counts the hit or miss.
+    // An unavailable database (e.g. private browsing) behaves as a miss.
+    get(key) {
+      return transact('readwrite', (tx, setResult) => {
+        const request = tx.objectStore(RESULTS).get(key);
+        request.onsuccess = () => {
+          const entry = request.result || null;
+          if (entry) {
+            tx.objectStore(USAGE).put({ key, size: entry.size, lastUsed: Date.now() });
+          }
+          setResult(entry);
+        };
+      }).catch(error => {
+        console.warn('Result cache unavailable:', error);
+        return null;
+      }).then(entry => {
+        if (entry) hits++;
+        else misses++;
+        return entry;
+      });
+    },
+
+    // Store { palette, indices, width, height, ... } under key
+    put(key, result) {
+      const size = result.indices.byteLength + result.palette.length * 3;
+      return transact('readwrite', tx => {
+        tx.objectStore(RESULTS).put({ ...result, key, size });
+        tx.objectStore(USAGE).put({ key, size, lastUsed: Date.now() });
+        evict(tx);
+      }).catch(error => {
+        console.warn('Result not cached:', error);
+      });
+    },
+
+    stats() {
+      return { hits, misses };
+    }
+  };
+})();
@@ -1,23 +1,36 @@
 // Visualization functions for color palette and clustering
 
-function visualizeAlgorithm(palette, iterations, pixels, time) {
+function visualizeAlgorithm(palette, iterations, pixels, time, usage = null) {
     const visualizerSection = document.getElementById('visualizerSection');
     visualizerSection.style.display = 'block';
     
-    visualizeColorPalette(palette);
+    visualizeColorPalette(palette, usage);
     visualizeColorSpace(palette);
     updateStats(palette.length, iterations, pixels, time);
 }
 
-function visualizeColorPalette(palette) {
+function visualizeColorPalette(palette, usage = null) {
     const colorPaletteViz = document.getElementById('colorPaletteViz');
     colorPaletteViz.innerHTML = '';
+
+    // usage[i] = pixels mapped to palette[i] (only with index output)
+    const totalUsage = usage ? usage.reduce((sum, count) => sum + count, 0) : 0;
     
-    palette.forEach(color => {
+    palette.forEach((color, i) => {
         const swatch = document.createElement('div');
         swatch.className = 'color-swatch';
         swatch.style.background = `rgb(${color[0]}, ${color[1]}, ${color[2]})`;
         swatch.title = `RGB(${color[0]}, ${color[1]}, ${color[2]})`;
+
+        if (totalUsage > 0) {
+            const share = (usage[i] / totalUsage) * 100;
+            swatch.title += ` · ${share.toFixed(1)}% of pixels`;
+
+            const bar = document.createElement('span');
+            bar.className = 'color-usage';
+            bar.style.width = Math.max(share, 1) + '%';
+            swatch.appendChild(bar);
+        }
         
         const code = document.createElement('span');
         code.className = 'color-code';
@@ -0,0 +1,306 @@
+// workerpool.js
+// Long-lived image-processing workers. The worker source is compiled into a
+// single blob URL and workers stay alive between jobs, so repeated runs reuse
+// already parsed and JIT-warmed code instead of spawning a fresh worker.
+const WorkerPool = (() => {
+  const size = Math.max(1, navigator.hardwareConcurrency || 4);
+  const slots = [];       // { worker, job, sourceKey }
+  const queue = [];       // jobs waiting for a free worker
+  const jobs = new Map(); // jobId -> job
+  let blobUrl = null;
+  let nextJobId = 1;
+
+  function getBlobUrl() {
+    if (!blobUrl) {
+      const blob = new Blob([createWorkerCode()], { type: 'application/javascript' });
+      blobUrl = URL.createObjectURL(blob);
+    }
+    return blobUrl;
+  }
+
+  function createSlot() {
+    const slot = { worker: new Worker(getBlobUrl()), job: null, sourceKey: null };
+    slot.worker.onmessage = (e) => handleMessage(e);
+    slot.worker.onerror = (e) => {
+      e.preventDefault();
+      replaceSlot(slot, new Error(e.message || 'Worker failed'));
+    };
+    slots.push(slot);
+    return slot;
+  }
+
+  // Prefer the lowest-index idle worker: it has run the most jobs and is
+  // the warmest. Workers are only spawned when every existing one is busy.
+  function acquireSlot() {
+    const idle = slots.find(slot => !slot.job);
+    if (idle) return idle;
+    return slots.length < size ? createSlot() : null;
+  }
+
+  // Start queued jobs in order while workers are free. A rerun sent
+  // without its bitmap waits for the worker caching its source; jobs
+  // behind it go ahead on other workers meanwhile.
+  function dispatch() {
+    let i = 0;
+    while (i < queue.length) {
+      const job = queue[i];
+      let slot;
+      if (job.sourceKey) {
+        slot = slots.find(candidate => candidate.sourceKey === job.sourceKey);
+        if (!slot) {
+          queue.splice(i, 1);
+          jobs.delete(job.id);
+          settle(job, sourceMissingError());
+          continue;
+        }
+        if (slot.job) {
+          i++;
+          continue;
+        }
+      } else {
+        slot = acquireSlot();
+        if (!slot) return;
+      }
+
+      queue.splice(i, 1);
+      slot.job = job;
+      job.slot = slot;
+      slot.worker.postMessage({ ...job.message, jobId: job.id, cancelFlag: job.cancelFlag }, job.transfer);
+    }
+  }
+
+  function handleMessage(e) {
+    // A worker asking for helper tasks (e.g. parallel band mapping). They
+    // jump the queue: the requesting worker is already part-way through.
+    if (e.data.type === 'spawn') {
+      // A cancelled job is about to stop; helpers would be wasted
+      const parent = jobs.get(e.data.jobId);
+      if (!parent || parent.cancelled) return;
+      for (const task of e.data.tasks) {
+        enqueue(task, { priority: true, parent: e.data.jobId })
+          .catch(error => failParent(e.data.jobId, error));
+      }
+      return;
+    }
+
+    const job = jobs.get(e.data.jobId);
+    if (!job) return;
+
+    if (job.cancelled) {
+      // The caller has moved on; free what it would have drawn
+      if (e.data.bitmap) e.data.bitmap.close();
+    } else if (job.onMessage) {
+      job.onMessage(e);
+    }
+
+    // Whatever the outcome, record what the worker now caches
+    if ('sourceCached' in e.data && job.slot) holdSource(job.slot, e.data.sourceCached);
+
+    if (e.data.type === 'complete') {
+      finish(job, null, e.data);
+    } else if (e.data.type === 'error') {
+      const error = new Error(e.data.message);
+      if (e.data.name) error.name = e.data.name;
+      finish(job, error);
+    } else if (e.data.type === 'cancelled') {
+      // Helpers stop on their parent's flag and resolve like dropped ones
+      finish(job, job.parent ? null : cancelledError());
+    }
+  }
+
+  // Resolve or reject the caller once. Helpers that never got a worker
+  // have nothing left to do.
+  function settle(job, error, result) {
+    if (job.settled) return;
+    job.settled = true;
+
+    for (let i = queue.length - 1; i >= 0; i--) {
+      if (queue[i].parent !== job.id) continue;
+      const helper = queue.splice(i, 1)[0];
+      jobs.delete(helper.id);
+      helper.settled = true;
+      helper.resolve(null);
+    }
+
+    if (error) job.reject(error);
+    else job.resolve(result);
+  }
+
+  function finish(job, error, result) {
+    jobs.delete(job.id);
+    if (job.slot) {
+      job.slot.job = null;
+      job.slot = null;
+    }
+
+    settle(job, error, result);
+    dispatch();
+  }
+
+  // A source read back by one worker replaces any other worker's: at most
+  // one full-size copy stays cached across the pool
+  function holdSource(slot, key) {
+    slot.sourceKey = key;
+    if (key) evictSources(slot);
+  }
+
+  function evictSources(keep = null) {
+    for (const slot of slots) {
+      if (slot === keep || !slot.sourceKey) continue;
+      slot.worker.postMessage({ evictSource: true });
+      slot.sourceKey = null;
+    }
+  }
+
+  function sourceMissingError() {
+    const error = new Error('Cached source is gone');
+    error.name = 'SourceMissing';
+    return error;
+  }
+
+  // An uncaught error may leave the worker in an unknown state: drop it and
+  // let the next dispatch spawn a replacement.
+  function replaceSlot(slot, error) {
+    slot.worker.terminate();
+    slots.splice(slots.indexOf(slot), 1);
+
+    if (slot.job) finish(slot.job, error);
+    else dispatch();
+  }
+
+  // A helper that failed may have claimed rows it never finished, and its
+  // parent would wait for them forever: stop the parent and reject it with
+  // the helper's error. Its flag stops the other helpers too. Helpers only
+  // exist where memory can be shared, so the flag is there; should it not
+  // be, the parent's worker is terminated.
+  function failParent(parentId, error) {
+    const parent = jobs.get(parentId);
+    if (!parent || parent.cancelled) return;
+
+    if (parent.cancelFlag) {
+      Atomics.store(parent.cancelFlag, 0, 1);
+      parent.cancelled = true;
+      settle(parent, error);
+    } else if (parent.slot) {
+      replaceSlot(parent.slot, error);
+    }
+  }
+
+  // A job that never reaches a worker still owns its bitmap (decoded while
+  // the run was being aborted, say): free it rather than wait for GC
+  function closeSource(message) {
+    if (message.source) message.source.close();
+  }
+
+  function cancelledError() {
+    const error = new Error('Job cancelled');
+    error.name = 'AbortError';
+    return error;
+  }
+
+  // Settle a superseded job right away. A queued job never starts. A
+  // running one sees its shared flag at the worker's next checkpoint and
+  // stops; its worker stays busy until it acknowledges, so the next job
+  // never queues behind the abandoned one inside the same worker. Without
+  // shared memory there is no flag, so the worker is terminated instead.
+  function cancel(job) {
+    if (!jobs.has(job.id) || job.cancelled) return;
+
+    if (!job.slot) {
+      queue.splice(queue.indexOf(job), 1);
+      closeSource(job.message);
+      finish(job, cancelledError());
+    } else if (job.cancelFlag) {
+      Atomics.store(job.cancelFlag, 0, 1);
+      job.cancelled = true;
+      settle(job, cancelledError());
+    } else {
+      replaceSlot(job.slot, cancelledError());
+    }
+  }
+
+  function canShareMemory() {
+    return typeof SharedArrayBuffer !== 'undefined' && window.crossOriginIsolated === true;
+  }
+
+  function enqueue(message, { onMessage = null, transfer = [], priority = false, parent = null, signal = null } = {}) {
+    return new Promise((resolve, reject) => {
+      if (signal && signal.aborted) {
+        closeSource(message);
+        reject(cancelledError());
+        return;
+      }
+
+      // Helpers share their parent's flag and stop together with it
+      const parentJob = parent ? jobs.get(parent) : null;
+      const job = {
+        id: nextJobId++,
+        message, onMessage, transfer, parent,
+        resolve, reject,
+        slot: null,
+        cancelled: false,
+        settled: false,
+        // Set when the job relies on a worker's cached source
+        sourceKey: message.source || message.imageData ? null : message.sourceKey || null,
+        // Every job gets a flag where memory can be shared, signal or not:
+        // a failing helper stops its parent and siblings through it
+        cancelFlag: parentJob ? parentJob.cancelFlag
+          : canShareMemory() ? new Int32Array(new SharedArrayBuffer(4)) : null
+      };
+      jobs.set(job.id, job);
+      if (signal) signal.addEventListener('abort', () => cancel(job), { once: true });
+      if (priority) queue.unshift(job);
+      else queue.push(job);
+      dispatch();
+    });
+  }
+
+  return {
+    // Queue a job. onMessage receives every worker event for this job; the
+    // promise resolves with the 'complete' message or rejects on 'error'.
+    // Aborting options.signal cancels the job (rejects with an AbortError).
+    // A message with a sourceKey but no source or imageData runs on the
+    // worker caching that source, or rejects with a SourceMissing error.
+    run(message, options) {
+      return enqueue(message, options);
+    },
+
+    // Whether a worker holds the source read back under this key
+    holdsSource(key) {
+      return slots.some(slot => slot.sourceKey === key);
+    },
+
+    // Drop every cached source, e.g. once the image is replaced
+    evictSources() {
+      evictSources();
+    },
+
+    stats() {
+      return {
+        size,
+        workers: slots.length,
+        busy: slots.filter(slot => slot.job).length,
+        queued: queue.length
+      };
+    },
+
+    // Terminate every worker, reject outstanding jobs and release the blob
+    // URL. The pool starts again lazily on the next run().
+    shutdown() {
+      for (const slot of slots) slot.worker.terminate();
+      slots.length = 0;
+      queue.length = 0;
+
+      for (const job of jobs.values()) {
+        if (job.parent) job.resolve(null);
+        else job.reject(new Error('Worker pool shut down'));
+      }
+      jobs.clear();
+
+      if (blobUrl) {
+        URL.revokeObjectURL(blobUrl);
+        blobUrl = null;
+      }
+    }
+  };
+})();